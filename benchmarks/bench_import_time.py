@@ -0,0 +1,74 @@
+"""
+콜드 스타트(import) 시간 벤치마크.
+새 파이썬 프로세스에서 `python -X importtime -c "import <모듈>"`을 여러 번 실행해 누적 import 시간의 중앙값을 구하고,
+예산(ms)을 넘거나 무거운 의존성(numpy, pandas, requests, pytz 등)이 import 시점에 로드되면 실패(종료 코드 1)합니다.
+
+    python benchmarks/bench_import_time.py [모듈 이름] [예산(ms)] [반복 횟수]
+
+기본값은 sajumentor / SAJU_IMPORT_BUDGET_MS 환경 변수(없으면 80ms) / 5회입니다.
+첫 실행은 .pyc 생성 비용이 섞이지 않도록 결과에서 제외합니다. (PYTHONDONTWRITEBYTECODE가 설정된 환경에서는 매번 컴파일 시간이 포함됩니다.)
+"""
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MODULE = "sajumentor"
+DEFAULT_BUDGET_MS = float(os.environ.get("SAJU_IMPORT_BUDGET_MS", "80"))
+# 해당 모듈의 import 시점에 로드되면 안 되는 무거운 의존성 (필요한 코드 경로에서만 지연 로드해야 합니다)
+FORBIDDEN_EAGER_IMPORTS = {
+    "sajumentor": ["numpy", "pandas", "requests", "pytz", "httpx"],
+    "saju_batch": ["numpy", "pandas", "requests", "pytz", "httpx"],
+    "sajumentor_async": ["numpy", "pandas", "requests", "pytz", "httpx"],
+}
+
+
+def run_importtime(module_name):
+    """새 프로세스에서 모듈을 import하고 (누적 import 시간 ms, 로드된 최상위 모듈 이름 집합)을 반환합니다."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module_name}"],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True,
+    )
+    cumulative_us, loaded = None, set()
+    # 형식: "import time: self [us] | cumulative | imported package"
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        name = parts[2].strip()
+        if not parts[1].strip().isdigit():
+            continue # 머리글 줄
+        loaded.add(name.split(".")[0])
+        if name == module_name:
+            cumulative_us = int(parts[1].strip())
+    if cumulative_us is None:
+        raise RuntimeError(f"'{module_name}'의 import 시간을 찾지 못했습니다.")
+    return cumulative_us / 1000.0, loaded
+
+
+def main():
+    module_name = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_MODULE
+    budget_ms = float(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_BUDGET_MS
+    repeat = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+
+    run_importtime(module_name) # .pyc 생성 등 첫 실행 비용 제외
+    samples, loaded = [], set()
+    for _ in range(repeat):
+        elapsed_ms, loaded = run_importtime(module_name)
+        samples.append(elapsed_ms)
+    median_ms = statistics.median(samples)
+
+    eager_heavy = sorted(name for name in FORBIDDEN_EAGER_IMPORTS.get(module_name, []) if name in loaded)
+    print(f"{module_name}: import 중앙값 {median_ms:.1f}ms (최소 {min(samples):.1f}ms, 최대 {max(samples):.1f}ms, {repeat}회) / 예산 {budget_ms:.0f}ms")
+    if eager_heavy:
+        print(f"  import 시점에 로드된 무거운 의존성: {', '.join(eager_heavy)}")
+
+    failed = median_ms > budget_ms or bool(eager_heavy)
+    print("  결과: " + ("실패 (콜드 스타트 회귀)" if failed else "통과"))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
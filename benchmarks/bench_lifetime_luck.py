@@ -0,0 +1,82 @@
+"""
+평생 운세(lifetime_luck_trend) 후처리 마이크로벤치마크.
+예전 pandas 구현(DataFrame + rolling + iterrows)과 현재 순수 파이썬 구현의 소요 시간을 비교하고,
+두 구현의 결과가 같은지도 함께 확인합니다.
+
+    python benchmarks/bench_lifetime_luck.py [반복 횟수]
+
+pandas가 설치되어 있지 않으면 현재 구현의 시간만 출력합니다.
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sajumentor import run_saju_engine, calculate_centered_rolling_mean, _to_float_or_nan
+
+
+def lifetime_luck_pandas(yearly_luck_raw_data, start_year):
+    """예전 get_saju_analysis_for_api의 pandas 기반 후처리 (비교용)"""
+    import pandas as pd
+    lifetime_luck_data = []
+    df = pd.DataFrame(yearly_luck_raw_data)
+    df['행운강도'] = pd.to_numeric(df['행운강도'], errors='coerce')
+    df['momentum'] = df['행운강도'].rolling(window=3, center=True).mean()
+    df_filtered = df[(df['연도'] >= start_year) & (df['연도'] <= start_year + 100)].copy()
+    for _, row in df_filtered.iterrows():
+        momentum = round(row['momentum'], 2) if pd.notna(row['momentum']) else None
+        if momentum is not None and momentum == -0.0:
+            momentum = 0.0
+        lifetime_luck_data.append({
+            "year": int(row['연도']), "age": int(row['나이']),
+            "daewoon": f"{row.get('대운천간', '')}{row.get('대운지지', '')}",
+            "yeonun": f"{row.get('연운천간', '')}{row.get('연운지지', '')}",
+            "luck_value": round(row['행운강도'], 2), "luck_momentum": momentum
+        })
+    return lifetime_luck_data
+
+
+def lifetime_luck_plain(yearly_luck_raw_data, start_year):
+    """현재 get_saju_analysis_for_api의 순수 파이썬 후처리"""
+    lifetime_luck_data = []
+    luck_values = [_to_float_or_nan(row['행운강도']) for row in yearly_luck_raw_data]
+    momentum_values = calculate_centered_rolling_mean(luck_values, window=3)
+    for row, luck_value, raw_momentum in zip(yearly_luck_raw_data, luck_values, momentum_values):
+        if not (start_year <= row['연도'] <= start_year + 100):
+            continue
+        momentum = round(raw_momentum, 2) if raw_momentum is not None else None
+        if momentum is not None and momentum == -0.0:
+            momentum = 0.0
+        lifetime_luck_data.append({
+            "year": int(row['연도']), "age": int(row['나이']),
+            "daewoon": f"{row.get('대운천간', '')}{row.get('대운지지', '')}",
+            "yeonun": f"{row.get('연운천간', '')}{row.get('연운지지', '')}",
+            "luck_value": round(luck_value, 2), "luck_momentum": momentum
+        })
+    return lifetime_luck_data
+
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    engine_results = run_saju_engine('양', '19900515', '1430', '남', False, False, False)
+    raw_data = engine_results["yearly_luck_raw_data"]
+    start_year = engine_results["raw_inputs"]["year_val_initial_input"]
+
+    plain_ms = timeit.timeit(lambda: lifetime_luck_plain(raw_data, start_year), number=number) / number * 1000
+    print(f"순수 파이썬 : {plain_ms:8.3f} ms/회")
+
+    try:
+        import pandas  # noqa: F401
+    except ImportError:
+        print("pandas가 설치되어 있지 않아 비교를 건너뜁니다.")
+        return
+
+    assert lifetime_luck_pandas(raw_data, start_year) == lifetime_luck_plain(raw_data, start_year), "두 구현의 결과가 다릅니다."
+    pandas_ms = timeit.timeit(lambda: lifetime_luck_pandas(raw_data, start_year), number=number) / number * 1000
+    print(f"pandas      : {pandas_ms:8.3f} ms/회")
+    print(f"속도 향상    : {pandas_ms / plain_ms:8.1f} 배")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+100년치 행운강도 곡선(calculate_yearly_luck_final) 마이크로벤치마크.
+예전 구현(해마다 get_yearly_gapja, 대운 목록 선형 탐색, Counter 기반 합 조정, 점수 클로저)과
+현재 구현(대운 기간 단위로 캐시된 행운강도 구간을 이어 붙이고, 출생 연도·대운 목록별 행 틀을 복사)의 소요 시간을 비교하고,
+결과가 같은지도 확인합니다. 현재 구현은 표/틀 캐시가 빈 상태(첫 회)와 채워진 상태를 따로 잽니다.
+
+    python benchmarks/bench_luck_curve.py [사주 개수]
+"""
+import os
+import random
+import sys
+import timeit
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sajumentor import (
+    CHEONGAN, JIJI, PILLAR_POSITIONS, COMPLEX_INTERACTION_TABLE, LUCK_WEIGHTS_FACTOR, saju_reverse_element_mapping,
+    SajuChart, analyze_static_pillars, calculate_yearly_luck_chart, get_base_value_for_score, get_theoretical_extremes,
+    get_yearly_daewoon_list, get_yearly_gapja, keyword_branch_code, clear_luck_row_templates, yearly_luck_strength_slice,
+)
+
+
+def adjust_needed_elements_for_haps_reference(saju_8_chars, keyword_char, original_pne_list, daewoon_ji, yeonwoon_ji):
+    """예전 adjust_needed_elements_for_haps (비교용)"""
+    pne1, pne2, pne3 = (original_pne_list[k][0] if len(original_pne_list) > k else None for k in range(3))
+    if keyword_char not in ["인", "신", "사", "해", "진", "술", "축", "미"]:
+        return pne1, pne2, False
+    if daewoon_ji not in ["자", "오", "묘", "유"] and yeonwoon_ji not in ["자", "오", "묘", "유"]:
+        return pne1, pne2, False
+    hap_combos = [
+        ((("인", "술"), "오"), ["인", "술"]), ((("인", "진"), "묘"), ["인", "진"]),
+        ((("사", "축"), "유"), ["사", "축"]), ((("사", "미"), "오"), ["사", "미"]),
+        ((("신", "진"), "자"), ["신", "진"]), ((("신", "술"), "유"), ["신", "술"]),
+        ((("해", "미"), "묘"), ["해", "미"]), ((("해", "축"), "자"), ["해", "축"]),
+    ]
+    adjacent_pairs = [(saju_8_chars.get("연지"), saju_8_chars.get("월지")), (saju_8_chars.get("월지"), saju_8_chars.get("일지")), (saju_8_chars.get("일지"), saju_8_chars.get("시지"))]
+    for (natal_pair, luck_char), hap_members in hap_combos:
+        if daewoon_ji == luck_char or yeonwoon_ji == luck_char:
+            for pair in adjacent_pairs:
+                if Counter(pair) == Counter(natal_pair) and keyword_char in hap_members:
+                    return pne2, pne3, True
+    return pne1, pne2, False
+
+
+def calculate_yearly_luck_reference(birth_year_solar, saju_8_chars, keyword_char, sorted_needed_elements, auto_luck_amount, daewoon_list_val):
+    """예전 calculate_yearly_luck_final (비교용)"""
+    original_primary_el = sorted_needed_elements[0][0] if len(sorted_needed_elements) >= 1 else None
+    original_secondary_el = sorted_needed_elements[1][0] if len(sorted_needed_elements) >= 2 else None
+    if not original_primary_el or original_primary_el not in COMPLEX_INTERACTION_TABLE:
+        return [], 0.0, 0.0
+    max_effect, min_effect = get_theoretical_extremes(original_primary_el, original_secondary_el)
+    results = []
+    for age in range(101):
+        year = birth_year_solar + age
+        y_gan, y_ji = get_yearly_gapja(year)
+        daewoon = next((d for d in daewoon_list_val if d['start'] <= year <= d['end']), None)
+        if not daewoon: continue
+        effective_pne1, effective_pne2, was_adjusted = adjust_needed_elements_for_haps_reference(
+            saju_8_chars, keyword_char, sorted_needed_elements, daewoon['ji'], y_ji
+        )
+
+        def score_yearly_final_inner(ch_yearly, pos_key_yearly):
+            el_yearly = saju_reverse_element_mapping.get(ch_yearly)
+            if not el_yearly: return 0
+            base_yearly = get_base_value_for_score(ch_yearly, pos_key_yearly, el_yearly, effective_pne1, 12.0, effective_pne2, 10.0)
+            inter_yearly = COMPLEX_INTERACTION_TABLE.get(effective_pne1, {}).get(el_yearly, 0.0)
+            return base_yearly * inter_yearly * LUCK_WEIGHTS_FACTOR[pos_key_yearly]
+
+        total_score_for_year = sum([score_yearly_final_inner(daewoon['gan'], '대운_천간'), score_yearly_final_inner(daewoon['ji'], '대운_지지'), score_yearly_final_inner(y_gan, '연운_천간'), score_yearly_final_inner(y_ji, '연운_지지')])
+        effective_score = 0.0
+        if total_score_for_year > 0 and max_effect != 0:
+            effective_score = total_score_for_year / max_effect
+        elif total_score_for_year < 0 and min_effect != 0:
+            effective_score = total_score_for_year / abs(min_effect)
+        intermediate_luck_strength = (effective_score * auto_luck_amount) / 10.0
+        final_luck_strength = intermediate_luck_strength / 10.0 if was_adjusted else intermediate_luck_strength
+        results.append({"나이": age, "연도": year, "행운강도": round(final_luck_strength, 3), "대운천간": daewoon['gan'], "대운지지": daewoon['ji'], "연운천간": y_gan, "연운지지": y_ji, "대운시작": daewoon['start'], "대운종료": daewoon['end']})
+    return results, max_effect, min_effect
+
+
+def make_cases(count, seed=0):
+    rng = random.Random(seed)
+    cases = []
+    for _ in range(count):
+        pillar_key = tuple(rng.choice(JIJI) if p % 2 else rng.choice(CHEONGAN) for p in range(8))
+        static_results = analyze_static_pillars(pillar_key)
+        birth_year = rng.randint(1900, 2050)
+        daewoon_list_val = get_yearly_daewoon_list(birth_year, pillar_key[2], pillar_key[3], rng.randint(1, 10), rng.random() < 0.5)
+        reference_args = (birth_year, dict(zip(PILLAR_POSITIONS, pillar_key)), static_results["keyword_char"], static_results["sorted_elements"], static_results["auto_luck_amount"], daewoon_list_val)
+        current_args = (birth_year, SajuChart.from_key(pillar_key), keyword_branch_code(static_results["keyword_char"]), static_results["sorted_element_codes"], static_results["auto_luck_amount"], daewoon_list_val)
+        cases.append((reference_args, current_args))
+    return cases
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    cases = make_cases(count)
+    for reference_args, current_args in cases:
+        assert calculate_yearly_luck_reference(*reference_args) == calculate_yearly_luck_chart(*current_args), reference_args[:2]
+
+    t_reference = min(timeit.repeat(lambda: [calculate_yearly_luck_reference(*r) for r, _ in cases], number=1, repeat=3)) / count
+    yearly_luck_strength_slice.cache_clear()
+    clear_luck_row_templates()
+    t_cold = timeit.timeit(lambda: [calculate_yearly_luck_chart(*c) for _, c in cases], number=1) / count
+    t_current = min(timeit.repeat(lambda: [calculate_yearly_luck_chart(*c) for _, c in cases], number=1, repeat=3)) / count
+    print(f"예전 구현: {t_reference * 1e6:.1f}us/사주")
+    print(f"현재 구현: {t_current * 1e6:.1f}us/사주 (x{t_reference / t_current:.1f}), 캐시가 빈 첫 회: {t_cold * 1e6:.1f}us/사주 (x{t_reference / t_cold:.1f})")
+    print(f"결과 일치: {count}건")
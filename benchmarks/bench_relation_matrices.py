@@ -0,0 +1,30 @@
+"""
+관계 행렬(십성/지지 관계) 조회표 마이크로벤치마크.
+예전의 딕셔너리·분기 기반 구현(tests/test_relation_matrices.py의 비교용 구현)과 현재 조회표 구현의 소요 시간을 비교합니다.
+두 구현의 결과가 같은지는 pytest로 전수 비교합니다. (python -m pytest tests/test_relation_matrices.py)
+
+    python benchmarks/bench_relation_matrices.py [반복 횟수]
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sajumentor import CHEONGAN, JIJI, find_all_jiji_interactions, get_sipseong
+from tests.test_relation_matrices import chart_with, find_all_jiji_interactions_reference, get_sipseong_reference
+
+
+if __name__ == "__main__":
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    chart = chart_with(stems=("경", "을", "병", "신"), branches=("인", "오", "술", "자"))
+    pairs = [(a, b) for a in CHEONGAN for b in JIJI]
+    cases = [
+        ("get_sipseong (120쌍)", lambda: [get_sipseong_reference(a, b) for a, b in pairs], lambda: [get_sipseong(a, b) for a, b in pairs]),
+        ("find_all_jiji_interactions", lambda: find_all_jiji_interactions_reference(chart), lambda: find_all_jiji_interactions(chart)),
+    ]
+    for name, reference_fn, current_fn in cases:
+        t_ref = min(timeit.repeat(reference_fn, number=repeat // 100 or 1, repeat=3))
+        t_cur = min(timeit.repeat(current_fn, number=repeat // 100 or 1, repeat=3))
+        print(f"{name}: 예전 {t_ref * 1e6 / (repeat // 100 or 1):.1f}us / 현재 {t_cur * 1e6 / (repeat // 100 or 1):.1f}us")
@@ -0,0 +1,235 @@
+"""
+분석 핵심 경로 벤치마크 모음 (오프라인, 재현 가능).
+외부 API(24절기, 음력->양력)는 benchmarks/fixtures의 기록된 응답으로 대신하고, 아래 항목마다
+초당 처리 수(ops/sec), 지연 시간 p50/p99(us), 호출 한 번의 최대 메모리 할당량(tracemalloc peak, KB)을 잽니다.
+
+- pillars: get_year_pillar + get_month_pillar
+- luck_curve: calculate_yearly_luck_final (100년치 행운강도)
+- sinsal: get_all_sinsal_and_hapchung
+- analysis_warm / analysis_cold: get_saju_analysis_for_api 전체 경로 (사주팔자 캐시가 찬 상태 / 매번 비운 상태)
+- http_load: main.app에 /analysis 요청을 동시에 보내는 부하 시나리오 (ASGI, 네트워크 없음)
+
+    python benchmarks/bench_suite.py [--quick] [--only 이름,...] [--save-baseline] [--compare] [--tolerance 0.25]
+
+--save-baseline은 결과를 benchmarks/baselines/bench_suite.json에 저장하고, --compare는 그 기준값과 비교해
+ops/sec가 tolerance보다 많이 떨어지거나 p99/메모리 할당량이 tolerance의 두 배보다 많이 늘어난 항목이 있으면 종료 코드 1로 끝납니다.
+기준값은 같은 기계에서 만든 것과 비교해야 의미가 있습니다.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from offline_fixtures import MISSING_FIXTURES, install_offline_fixtures
+
+from sajumentor import (
+    analyze_static_pillars, calculate_four_pillars, calculate_yearly_luck_final, clear_engine_caches,
+    get_all_sinsal_and_hapchung, get_daewoon_direction, get_daewoon_su, get_month_pillar, get_saju_analysis_for_api,
+    get_year_pillar, get_yearly_daewoon_list, pillars_to_key, prepare_engine_inputs,
+)
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "bench_suite.json")
+
+# 벤치마크 입력: fixture(benchmarks/fixtures/solar_term_api.json)에 있는 연도(출생 연도 ±1)만 사용합니다.
+BENCH_BIRTH_YEARS = [1955, 1968, 1975, 1984, 1990, 1999, 2003, 2012]
+BENCH_BIRTHS = [
+    {"birth": f"{year}{month:02d}{day:02d}", "time": f"{hour:02d}{minute:02d}", "gender": gender, "cal_type": cal_type}
+    for k, year in enumerate(BENCH_BIRTH_YEARS)
+    for month, day, hour, minute, gender, cal_type in [
+        (1 + (k * 5) % 12, 1 + (k * 7) % 28, (k * 3) % 24, (k * 13) % 60, "남", "양"),
+        (1 + (k * 5 + 4) % 12, 1 + (k * 11) % 28, (k * 7 + 5) % 24, (k * 17) % 60, "여", "양"),
+        (1 + (k * 5 + 8) % 12, 1 + (k * 3) % 28, (k * 5 + 11) % 24, (k * 29) % 60, "여" if k % 2 else "남", "음"),
+    ]
+]
+
+HTTP_CONCURRENCY = 16
+
+
+def engine_args(birth):
+    return dict(cal_type=birth["cal_type"], date_str=birth["birth"], time_str=birth["time"], gender_input=birth["gender"],
+                is_leap_input=False, is_time_unknown=False, is_overseas=False, city_name="")
+
+
+def build_cases():
+    """각 벤치마크가 쓸 입력을 미리 계산해 둡니다."""
+    cases = []
+    for birth in BENCH_BIRTHS:
+        engine_inputs = prepare_engine_inputs(**engine_args(birth))
+        datetime_lmt = engine_inputs["datetime_lmt"]
+        saju_8_chars, astro_year, month_period_idx = calculate_four_pillars(datetime_lmt)
+        static_results = analyze_static_pillars(pillars_to_key(saju_8_chars))
+        direction = get_daewoon_direction(saju_8_chars["연간"], birth["gender"])
+        daewoon_su = get_daewoon_su(datetime_lmt, direction, astro_year, month_period_idx)
+        birth_year = engine_inputs["calc_target_solar_year"]
+        cases.append({
+            "birth": birth, "datetime_lmt": datetime_lmt, "saju_8_chars": saju_8_chars,
+            "luck_args": (birth_year, saju_8_chars, static_results["keyword_char"], static_results["sorted_elements"], static_results["auto_luck_amount"],
+                          get_yearly_daewoon_list(birth_year, saju_8_chars["월간"], saju_8_chars["월지"], daewoon_su, direction == "순행")),
+        })
+    return cases
+
+
+def make_benchmarks(cases):
+    """이름 -> (호출 한 번을 수행하는 함수(i), 호출 전에 시간 측정 없이 할 준비 함수(i) 또는 None)"""
+    def pillars(i):
+        dt = cases[i % len(cases)]["datetime_lmt"]
+        _, _, year_gan_idx, astro_year = get_year_pillar(dt)
+        get_month_pillar(dt, year_gan_idx, astro_year)
+
+    def luck_curve(i):
+        calculate_yearly_luck_final(*cases[i % len(cases)]["luck_args"])
+
+    def sinsal(i):
+        get_all_sinsal_and_hapchung(cases[i % len(cases)]["saju_8_chars"])
+
+    def analysis(i):
+        get_saju_analysis_for_api(**engine_args(cases[i % len(cases)]["birth"]))
+
+    return {
+        "pillars": (pillars, None),
+        "luck_curve": (luck_curve, None),
+        "sinsal": (sinsal, None),
+        "analysis_warm": (analysis, None),
+        "analysis_cold": (analysis, lambda i: clear_engine_caches()),
+    }
+
+
+def summarize(latencies_ns, wall_seconds, alloc_peaks=None):
+    latencies_us = sorted(ns / 1000 for ns in latencies_ns)
+    return {
+        "iterations": len(latencies_us),
+        "ops_per_sec": round(len(latencies_us) / wall_seconds, 1),
+        "p50_us": round(statistics.median(latencies_us), 2),
+        "p99_us": round(latencies_us[min(len(latencies_us) - 1, int(len(latencies_us) * 0.99))], 2),
+        "alloc_peak_kb": round(statistics.mean(alloc_peaks) / 1024, 2) if alloc_peaks else None,
+    }
+
+
+def run_benchmark(op, prepare, iterations, alloc_iterations):
+    for i in range(min(iterations, 50)): # 준비 운동 (캐시, 지연 로드)
+        if prepare: prepare(i)
+        op(i)
+    latencies = []
+    for i in range(iterations):
+        if prepare: prepare(i)
+        started = time.perf_counter_ns()
+        op(i)
+        latencies.append(time.perf_counter_ns() - started)
+    wall_seconds = sum(latencies) / 1e9
+
+    alloc_peaks = []
+    tracemalloc.start()
+    try:
+        for i in range(alloc_iterations):
+            if prepare: prepare(i)
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            op(i)
+            alloc_peaks.append(tracemalloc.get_traced_memory()[1] - before)
+    finally:
+        tracemalloc.stop()
+    return summarize(latencies, wall_seconds, alloc_peaks)
+
+
+def run_http_load(total_requests, concurrency=HTTP_CONCURRENCY):
+    """main.app에 /analysis 요청을 concurrency개씩 동시에 보내고 요청별 지연 시간으로 요약합니다."""
+    import httpx
+    import main
+
+    async def scenario():
+        latencies = []
+        queue = asyncio.Queue()
+        for i in range(total_requests):
+            queue.put_nowait(BENCH_BIRTHS[i % len(BENCH_BIRTHS)])
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            async def worker():
+                while not queue.empty():
+                    birth = queue.get_nowait()
+                    started = time.perf_counter_ns()
+                    response = await client.get("/analysis", params=birth)
+                    latencies.append(time.perf_counter_ns() - started)
+                    if response.status_code != 200:
+                        raise RuntimeError(f"/analysis {response.status_code}: {response.text[:200]}")
+                    # 응답 캐시 적중은 한 번도 양보하지 않고 끝나므로, 양보하지 않으면 한 작업자가 큐를 다 비울 때까지
+                    # 스레드에서 계산 중인 요청이 기다리게 됩니다. (실제 서버에서는 클라이언트마다 따로 I/O를 기다립니다)
+                    await asyncio.sleep(0)
+            await client.get("/analysis", params=BENCH_BIRTHS[0]) # 준비 운동
+            started = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+            return latencies, time.perf_counter() - started
+
+    latencies, wall_seconds = asyncio.run(scenario())
+    return summarize(latencies, wall_seconds)
+
+
+def compare_to_baseline(results, baseline, tolerance):
+    """기준값 대비 회귀한 항목의 설명 목록을 반환합니다."""
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get("results", {}).get(name)
+        if not base:
+            continue
+        if current["ops_per_sec"] < base["ops_per_sec"] * (1 - tolerance):
+            regressions.append(f"{name}: ops/sec {base['ops_per_sec']} -> {current['ops_per_sec']}")
+        if current["p99_us"] > base["p99_us"] * (1 + 2 * tolerance):
+            regressions.append(f"{name}: p99 {base['p99_us']}us -> {current['p99_us']}us")
+        if current["alloc_peak_kb"] and base.get("alloc_peak_kb") and current["alloc_peak_kb"] > base["alloc_peak_kb"] * (1 + 2 * tolerance):
+            regressions.append(f"{name}: alloc {base['alloc_peak_kb']}KB -> {current['alloc_peak_kb']}KB")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="분석 핵심 경로 벤치마크 (오프라인)")
+    parser.add_argument("--quick", action="store_true", help="반복 횟수를 줄여 빠르게 실행합니다.")
+    parser.add_argument("--only", default="", help="실행할 항목 이름 (쉼표로 구분)")
+    parser.add_argument("--save-baseline", action="store_true", help=f"결과를 기준값({BASELINE_PATH})으로 저장합니다.")
+    parser.add_argument("--compare", action="store_true", help="기준값과 비교해 회귀가 있으면 실패합니다.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="허용 오차 비율 (기본 0.25)")
+    args = parser.parse_args()
+
+    iterations, alloc_iterations, http_requests = (300, 30, 200) if args.quick else (3000, 200, 1000)
+    only = set(filter(None, args.only.split(",")))
+
+    install_offline_fixtures()
+    cases = build_cases()
+    results = {}
+    for name, (op, prepare) in make_benchmarks(cases).items():
+        if only and name not in only:
+            continue
+        results[name] = run_benchmark(op, prepare, iterations, alloc_iterations)
+    if not only or "http_load" in only:
+        results["http_load"] = run_http_load(http_requests)
+    if MISSING_FIXTURES:
+        print(f"fixture에 없는 외부 API 요청이 있습니다: {sorted(set(MISSING_FIXTURES))}")
+        return 1
+
+    print(f"{'항목':<16}{'ops/sec':>12}{'p50(us)':>12}{'p99(us)':>12}{'alloc(KB)':>12}")
+    for name, r in results.items():
+        alloc = "-" if r["alloc_peak_kb"] is None else r["alloc_peak_kb"]
+        print(f"{name:<16}{r['ops_per_sec']:>12}{r['p50_us']:>12}{r['p99_us']:>12}{alloc:>12}")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(BASELINE_PATH), exist_ok=True)
+        with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+            json.dump({"python": platform.python_version(), "machine": platform.machine(), "quick": args.quick, "results": results}, f, ensure_ascii=False, indent=2)
+        print(f"기준값을 저장했습니다: {BASELINE_PATH}")
+    if args.compare:
+        with open(BASELINE_PATH, encoding="utf-8") as f:
+            regressions = compare_to_baseline(results, json.load(f), args.tolerance)
+        if regressions:
+            print("회귀:\n  " + "\n  ".join(regressions))
+            return 1
+        print("기준값 대비 회귀 없음")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
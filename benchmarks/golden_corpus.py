@@ -0,0 +1,226 @@
+"""
+골든 출력 회귀 코퍼스 (성능 개선 전후 결과가 바뀌지 않았는지 확인용).
+get_saju_analysis_for_api를 1920~2030년의 모든 날짜 x 12시진 x 남/여 x 양력/음력 격자에 돌려 결과를 저장하고,
+다른 엔진 구현(같은 시그니처의 함수)이 같은 결과를 내는지 여러 코어에서 병렬로 비교합니다.
+
+    python benchmarks/golden_corpus.py generate [--start-year 1920] [--end-year 2030] [--workers N] [--store digest|full] [--out 디렉터리]
+    python benchmarks/golden_corpus.py check [--engine 모듈:함수] [--workers N] [--years 1990,1991] [--out 디렉터리]
+
+- 외부 API(음력->양력, 24절기)는 benchmarks/fixtures로 대신하고, 절기는 운영 기본값과 같은 내장 천문 계산을 씁니다.
+- 응답의 '작년/올해/내년' 한난조습은 실행 연도에 따라 바뀌므로 기준 연도를 manifest에 기록해 두고 검사 때 같은 값으로 고정합니다.
+- 합/충 목록은 정렬해 돌려주므로 출력은 PYTHONHASHSEED와 무관합니다.
+- 격자 전체는 약 195만 건이라 기본(digest)은 출력의 압축 JSON 대신 128비트 해시만 연도별 gzip NDJSON 파일로 저장합니다.
+  --store full이면 압축 JSON 출력도 함께 저장해 불일치가 난 필드 경로까지 보여 줍니다. (연도당 약 8MB, 전체 약 1GB)
+- 음력 입력은 같은 양력 날짜를 음력(윤달 포함)으로 바꾼 값이라, 격자의 모든 날짜가 두 달력 입력 경로로 한 번씩 검사됩니다.
+"""
+import argparse
+import concurrent.futures
+import contextlib
+import datetime
+import gzip
+import hashlib
+import importlib
+import io
+import json
+import os
+import platform
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden_corpus")
+MANIFEST_NAME = "manifest.json"
+DEFAULT_ENGINE = "sajumentor:get_saju_analysis_for_api"
+
+GOLDEN_START_YEAR = 1920
+GOLDEN_END_YEAR = 2030
+# 각 시진의 가운데 (KST 기준, LMT로는 00:00, 02:00, ... 22:00)
+GOLDEN_TIMES = [f"{hour:02d}30" for hour in range(0, 24, 2)]
+GOLDEN_GENDERS = ["남", "여"]
+GOLDEN_CAL_TYPES = ["양", "음"]
+# 불일치가 난 연도마다 보고할 최대 건수
+MAX_REPORTED_MISMATCHES = 20
+
+# 작업 프로세스 상태 (_init_worker에서 채움)
+_engine_func = None
+
+
+def load_engine(engine_spec):
+    """'모듈:함수' 문자열에서 get_saju_analysis_for_api와 같은 시그니처의 함수를 불러옵니다."""
+    module_name, _, func_name = engine_spec.partition(":")
+    return getattr(importlib.import_module(module_name), func_name or "get_saju_analysis_for_api")
+
+
+def _init_worker(engine_spec, reference_year):
+    global _engine_func
+    import sajumentor
+    from offline_fixtures import install_offline_fixtures
+    install_offline_fixtures(solar_term_source="local")
+    sajumentor.get_reference_year = lambda: reference_year
+    _engine_func = load_engine(engine_spec)
+
+
+def iter_grid_inputs(year):
+    """한 해(양력)의 격자 입력을 (키, 엔진 인자) 순서대로 만듭니다."""
+    import sajumentor
+    day = datetime.date(year, 1, 1)
+    while day.year == year:
+        lunar = sajumentor.convert_solar_to_lunar(day)
+        for cal_type in GOLDEN_CAL_TYPES:
+            if cal_type == "양":
+                date_str, is_leap = day.strftime("%Y%m%d"), False
+            else:
+                l_year, l_month, l_day, is_leap = lunar
+                date_str = f"{l_year:04d}{l_month:02d}{l_day:02d}"
+            for time_str in GOLDEN_TIMES:
+                for gender in GOLDEN_GENDERS:
+                    key = f"{cal_type}|{date_str}|{'윤' if is_leap else '평'}|{time_str}|{gender}"
+                    yield key, (cal_type, date_str, time_str, gender, is_leap, False, False, "")
+        day += datetime.timedelta(days=1)
+
+
+def canonical_output(result):
+    """비교할 압축 JSON 문자열. 오류 응답의 traceback(파일 경로/줄 번호)은 구현마다 다르므로 뺍니다."""
+    if isinstance(result, dict) and "traceback" in result:
+        result = {key: value for key, value in result.items() if key != "traceback"}
+    return json.dumps(result, ensure_ascii=False, separators=(",", ":"))
+
+
+def output_digest(text):
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _run_engine(args):
+    with contextlib.redirect_stdout(io.StringIO()): # 엔진의 진행 로그는 버립니다.
+        return canonical_output(_engine_func(*args))
+
+
+def shard_path(out_dir, year):
+    return os.path.join(out_dir, f"{year}.ndjson.gz")
+
+
+def generate_year(year, out_dir, store_full):
+    """한 해치 격자를 계산해 연도별 파일에 쓰고 (연도, 건수, 소요 시간)을 반환합니다."""
+    started = time.perf_counter()
+    path = shard_path(out_dir, year)
+    count = 0
+    with gzip.open(path + ".tmp", "wt", encoding="utf-8") as f:
+        for key, args in iter_grid_inputs(year):
+            text = _run_engine(args)
+            entry = {"k": key, "h": output_digest(text)}
+            if store_full:
+                entry["o"] = text
+            f.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+            count += 1
+    os.replace(path + ".tmp", path)
+    return year, count, time.perf_counter() - started
+
+
+def first_difference(expected, actual, path=""):
+    """두 JSON 값이 처음 달라지는 경로와 (기대값, 실제값)을 반환합니다."""
+    if type(expected) is not type(actual):
+        return path or "/", expected, actual
+    if isinstance(expected, dict):
+        for key in list(expected) + [k for k in actual if k not in expected]:
+            if key not in expected or key not in actual or expected[key] != actual[key]:
+                return first_difference(expected.get(key), actual.get(key), f"{path}/{key}")
+    elif isinstance(expected, list):
+        for i, (a, b) in enumerate(zip(expected, actual)):
+            if a != b:
+                return first_difference(a, b, f"{path}/{i}")
+        if len(expected) != len(actual):
+            return f"{path}/길이", len(expected), len(actual)
+    return path or "/", expected, actual
+
+
+def check_year(year, out_dir):
+    """한 해치 코퍼스를 다시 계산해 비교하고 (연도, 검사 건수, 불일치 건수, 보고할 불일치 목록)을 반환합니다."""
+    count, mismatch_count, mismatches = 0, 0, []
+    with gzip.open(shard_path(out_dir, year), "rt", encoding="utf-8") as f:
+        for line in f:
+            entry = json.loads(line)
+            cal_type, date_str, leap, time_str, gender = entry["k"].split("|")
+            text = _run_engine((cal_type, date_str, time_str, gender, leap == "윤", False, False, ""))
+            count += 1
+            if output_digest(text) == entry["h"]:
+                continue
+            mismatch_count += 1
+            if len(mismatches) < MAX_REPORTED_MISMATCHES:
+                report = {"key": entry["k"]}
+                if "o" in entry:
+                    report["path"], report["expected"], report["actual"] = first_difference(json.loads(entry["o"]), json.loads(text))
+                mismatches.append(report)
+    return year, count, mismatch_count, mismatches
+
+
+def _run_parallel(task, years, workers, engine_spec, reference_year, task_args):
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(engine_spec, reference_year)) as executor:
+        futures = [executor.submit(task, year, *task_args) for year in years]
+        for future in concurrent.futures.as_completed(futures):
+            yield future.result()
+
+
+def generate(args):
+    os.makedirs(args.out, exist_ok=True)
+    years = list(range(args.start_year, args.end_year + 1))
+    reference_year = args.reference_year or datetime.date.today().year
+    started = time.perf_counter()
+    total = 0
+    for year, count, elapsed in _run_parallel(generate_year, years, args.workers, args.engine, reference_year, (args.out, args.store == "full")):
+        total += count
+        print(f"  {year}년: {count}건 {elapsed:.1f}초")
+    manifest = {
+        "engine": args.engine, "start_year": args.start_year, "end_year": args.end_year, "reference_year": reference_year,
+        "times": GOLDEN_TIMES, "genders": GOLDEN_GENDERS, "cal_types": GOLDEN_CAL_TYPES, "store": args.store, "cases": total,
+        "python": platform.python_version(), "created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+    }
+    with open(os.path.join(args.out, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    print(f"코퍼스 생성: {total}건, {time.perf_counter() - started:.1f}초 -> {args.out}")
+    return 0
+
+
+def check(args):
+    with open(os.path.join(args.out, MANIFEST_NAME), encoding="utf-8") as f:
+        manifest = json.load(f)
+    if args.years:
+        years = [int(y) for y in args.years.split(",")]
+    else:
+        years = list(range(manifest["start_year"], manifest["end_year"] + 1))
+    started = time.perf_counter()
+    total, failed_total = 0, 0
+    for year, count, mismatch_count, mismatches in _run_parallel(check_year, years, args.workers, args.engine, manifest["reference_year"], (args.out,)):
+        total += count
+        failed_total += mismatch_count
+        if mismatch_count:
+            print(f"  {year}년: {count}건 중 {mismatch_count}건 불일치")
+            for report in mismatches:
+                detail = f" {report['path']}: {json.dumps(report['expected'], ensure_ascii=False)[:200]} -> {json.dumps(report['actual'], ensure_ascii=False)[:200]}" if "path" in report else ""
+                print(f"    {report['key']}{detail}")
+    print(f"{args.engine}: {total}건 검사, 불일치 {failed_total}건, {time.perf_counter() - started:.1f}초")
+    return 1 if failed_total else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="골든 출력 회귀 코퍼스 생성/검사")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for name in ("generate", "check"):
+        sub = subparsers.add_parser(name)
+        sub.add_argument("--engine", default=DEFAULT_ENGINE, help=f"'모듈:함수' 형식의 엔진 (기본 {DEFAULT_ENGINE})")
+        sub.add_argument("--workers", type=int, default=os.cpu_count(), help="작업 프로세스 수 (기본: CPU 코어 수)")
+        sub.add_argument("--out", default=CORPUS_DIR, help=f"코퍼스 디렉터리 (기본 {CORPUS_DIR})")
+    gen = subparsers.choices["generate"]
+    gen.add_argument("--start-year", type=int, default=GOLDEN_START_YEAR)
+    gen.add_argument("--end-year", type=int, default=GOLDEN_END_YEAR)
+    gen.add_argument("--store", choices=("digest", "full"), default="digest", help="digest: 해시만, full: 압축 JSON 출력도 저장")
+    gen.add_argument("--reference-year", type=int, default=0, help="'올해'로 고정할 연도 (기본: 실행 연도)")
+    subparsers.choices["check"].add_argument("--years", default="", help="검사할 연도 (쉼표로 구분, 기본: 전체)")
+    args = parser.parse_args()
+    if args.command == "generate" and args.start_year > args.end_year:
+        parser.error("시작 연도가 끝 연도보다 클 수 없습니다.")
+    return generate(args) if args.command == "generate" else check(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
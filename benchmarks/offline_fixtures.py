@@ -0,0 +1,124 @@
+"""
+오프라인 실행용 외부 API 응답 fixture.
+benchmarks/fixtures/에 저장된 공공데이터 API 응답(24절기, 음력->양력)을 requests / 비동기 httpx 경로 대신 돌려주어,
+벤치마크와 회귀 검사가 네트워크 없이 항상 같은 입력으로 돌게 합니다.
+
+    python benchmarks/offline_fixtures.py 시작연도 끝연도 [--live]
+
+위처럼 직접 실행하면 절기 fixture를 (다시) 기록합니다. 기본은 내장 천문 계산 결과를 API 응답 형식으로 저장하고,
+--live이면 실제 API를 호출해 응답을 그대로 저장합니다. (음력->양력 응답은 --live로만 기록할 수 있습니다.)
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sajumentor
+import sajumentor_async
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+SOLAR_TERM_FIXTURE_PATH = os.path.join(FIXTURE_DIR, "solar_term_api.json")
+LUNAR_FIXTURE_PATH = os.path.join(FIXTURE_DIR, "lunar_api.json")
+
+# fixture에 없어서 응답하지 못한 요청 (실행이 끝난 뒤 비어 있어야 오프라인 실행이 완전했던 것입니다)
+MISSING_FIXTURES = []
+
+
+def _load_json(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _lunar_key(params):
+    return f"{params['lunYear']}-{params['lunMonth']}-{params['lunDay']}"
+
+
+class _FixtureResponse:
+    """requests.Response 중 엔진이 쓰는 부분만 흉내 냅니다."""
+
+    def __init__(self, data):
+        self._data = data
+        self.text = json.dumps(data, ensure_ascii=False) if data is not None else ""
+
+    def raise_for_status(self):
+        if self._data is None:
+            import requests
+            raise requests.exceptions.HTTPError("fixture 없음 (오프라인 실행)")
+
+    def json(self):
+        return self._data
+
+
+def install_offline_fixtures(solar_term_source="api"):
+    """
+    절기 출처를 solar_term_source("api" 또는 운영 기본값인 "local")로 바꾸고, 외부 API 호출을 fixture 조회로 바꿔 끼웁니다.
+    캐시는 비운 상태에서 시작합니다. fixture에 없는 요청은 실패 응답으로 처리하고 MISSING_FIXTURES에 남깁니다.
+    """
+    import requests
+    solar_term_responses = _load_json(SOLAR_TERM_FIXTURE_PATH)
+    lunar_responses = _load_json(LUNAR_FIXTURE_PATH)
+
+    def lookup(url, params):
+        if url == sajumentor.SOLAR_TERM_API_URL:
+            key, table = str(params["solYear"]), solar_term_responses
+        elif url == sajumentor.LUNAR_API_URL:
+            key, table = _lunar_key(params), lunar_responses
+        else:
+            key, table = url, {}
+        if key not in table:
+            MISSING_FIXTURES.append((url, key))
+            return None
+        return table[key]
+
+    def fake_get(url, params=None, **kwargs):
+        return _FixtureResponse(lookup(url, params or {}))
+
+    async def fake_get_json_async(url, params, api):
+        return lookup(url, params)
+
+    requests.get = fake_get
+    sajumentor_async._get_json_async = fake_get_json_async
+    sajumentor.SOLAR_TERM_SOURCE = solar_term_source
+    sajumentor.SOLAR_TERM_STORE.source = solar_term_source
+    sajumentor.SOLAR_TERM_STORE.db_path = None # 호스트 공용 디스크 캐시와 섞이지 않도록
+    sajumentor.SOLAR_TERM_STORE.clear()
+    sajumentor.LUNAR_API_CACHE.clear()
+    sajumentor.clear_engine_caches()
+
+
+def solar_terms_to_api_response(terms):
+    """{절기 이름: KST datetime}을 24절기 API(get24DivisionsInfo)의 응답 형식으로 바꿉니다."""
+    items = [{"dateName": name, "locdate": int(dt.strftime("%Y%m%d")), "kst": dt.strftime("%H%M")} for name, dt in sorted(terms.items(), key=lambda item: item[1])]
+    return {"response": {"header": {"resultCode": "00", "resultMsg": "NORMAL SERVICE."}, "body": {"items": {"item": items}, "totalCount": len(items)}}}
+
+
+def record_solar_term_fixtures(start_year, end_year, live=False):
+    """start_year ~ end_year의 절기 응답을 fixture 파일에 기록(기존 항목에 덮어쓰기)하고 기록한 연도 수를 반환합니다."""
+    responses = _load_json(SOLAR_TERM_FIXTURE_PATH)
+    for year in range(start_year, end_year + 1):
+        if live:
+            import requests
+            response = requests.get(sajumentor.SOLAR_TERM_API_URL, params=sajumentor.build_solar_term_api_params(year, sajumentor.SERVICE_KEY_DECODED), timeout=10)
+            response.raise_for_status()
+            responses[str(year)] = response.json()
+        else:
+            responses[str(year)] = solar_terms_to_api_response(sajumentor.calculate_solar_terms_for_year(year))
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    # 연도별 한 줄씩 저장하여 diff를 읽기 쉽게 합니다.
+    with open(SOLAR_TERM_FIXTURE_PATH, "w", encoding="utf-8") as f:
+        f.write("{\n" + ",\n".join(f"{json.dumps(y)}: {json.dumps(responses[y], ensure_ascii=False, separators=(',', ':'))}" for y in sorted(responses)) + "\n}\n")
+    return end_year - start_year + 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="24절기 API 응답 fixture를 기록합니다.")
+    parser.add_argument("start_year", type=int)
+    parser.add_argument("end_year", type=int)
+    parser.add_argument("--live", action="store_true", help="실제 API 응답을 기록합니다. (네트워크 필요)")
+    args = parser.parse_args()
+    count = record_solar_term_fixtures(args.start_year, args.end_year, args.live)
+    print(f"{count}개 연도의 절기 응답을 {SOLAR_TERM_FIXTURE_PATH}에 기록했습니다.")
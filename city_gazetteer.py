@@ -0,0 +1,223 @@
+import collections
+import difflib
+import functools
+import mmap
+import os
+import sys
+import threading
+import unicodedata
+
+# ==============================================================================
+# 도시 지명 사전 (출생 도시 -> 시간대, 위도/경도)
+# 도시의 여러 이름(영문, 한글, 현지 표기)을 정규화한 키로 정렬한 색인 파일(gazetteer/cities.idx)을
+# 메모리 맵(mmap)으로 열어 이진 탐색합니다. 파일을 읽어 들이지 않으므로 여는 비용이 거의 없고,
+# 여러 작업 프로세스가 같은 페이지를 공유합니다. 정확히 일치하는 이름이 없으면 첫 글자가 같은 키들 중에서
+# 가장 비슷한 이름(오타 허용)을 찾습니다.
+#
+# 색인은 gazetteer/cities.tsv(직접 관리하는 주요 도시 목록) 또는 GeoNames의 cities*.txt 덤프로 만듭니다.
+#     python city_gazetteer.py build gazetteer/cities.tsv
+#     python city_gazetteer.py build cities15000.txt --geonames [-o 출력.idx] [--min-population N]
+#     python city_gazetteer.py lookup 뉴욕
+# ==============================================================================
+
+GAZETTEER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gazetteer")
+# 다른 색인 파일(예: GeoNames 전체 목록으로 만든 것)을 쓰려면 SAJU_GAZETTEER_PATH로 지정합니다.
+GAZETTEER_PATH = os.environ.get("SAJU_GAZETTEER_PATH", "") or os.path.join(GAZETTEER_DIR, "cities.idx")
+GAZETTEER_HEADER = "# city_gazetteer v1\tkey\tname\tcountry\tlatitude\tlongitude\ttimezone\tpopulation"
+
+# 오타 허용 검색에서 받아들일 최소 유사도 (difflib 비율, 0~1)
+FUZZY_MIN_RATIO = 0.85
+CITY_LOOKUP_CACHE_SIZE = 4096
+
+City = collections.namedtuple("City", ["name", "country", "latitude", "longitude", "timezone", "population"])
+
+def normalize_city_name(name):
+    """검색 키: 대소문자, 발음 구별 기호, 공백, 문장부호를 없앤 이름 ("São Paulo" -> "saopaulo", "뉴 욕" -> "뉴욕")"""
+    decomposed = unicodedata.normalize("NFKD", name)
+    stripped = unicodedata.normalize("NFC", "".join(ch for ch in decomposed if not unicodedata.combining(ch)))
+    return "".join(ch for ch in stripped.casefold() if ch.isalnum())
+
+class CityGazetteer:
+    """
+    색인 파일 한 줄 = 키 하나: "키\\t이름\\t국가\\t위도\\t경도\\t시간대\\t인구".
+    줄은 (키 UTF-8 바이트, 인구 내림차순)으로 정렬되어 있어, 같은 키의 첫 줄이 가장 큰 도시입니다.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._start = self._mm.find(b"\n") + 1 # 머리글 다음 줄부터
+        self._end = len(self._mm)
+
+    def _line_end(self, pos):
+        end = self._mm.find(b"\n", pos)
+        return self._end if end < 0 else end
+
+    def _key_at(self, pos):
+        return self._mm[pos:self._mm.find(b"\t", pos)]
+
+    def _lower_bound(self, key_bytes):
+        """키가 key_bytes 이상인 첫 줄의 시작 위치"""
+        lo, hi = self._start, self._end
+        while lo < hi:
+            mid = (lo + hi) // 2
+            newline = self._mm.rfind(b"\n", lo, mid)
+            line_start = newline + 1 if newline >= 0 else lo
+            if self._key_at(line_start) < key_bytes:
+                lo = self._line_end(line_start) + 1
+            else:
+                hi = line_start
+        return lo
+
+    def _iter_lines(self, pos, stop=None):
+        """pos부터 (키, City)를 차례로 만들어 냅니다."""
+        stop = self._end if stop is None else stop
+        while pos < stop:
+            end = self._line_end(pos)
+            key, name, country, latitude, longitude, tz_name, population = self._mm[pos:end].decode("utf-8").split("\t")
+            yield key, City(name, country, float(latitude), float(longitude), tz_name, int(population))
+            pos = end + 1
+
+    def lookup(self, key):
+        """정규화된 키와 정확히 일치하는 도시 목록 (인구 내림차순)"""
+        cities = []
+        for line_key, city in self._iter_lines(self._lower_bound(key.encode("utf-8"))):
+            if line_key != key:
+                break
+            cities.append(city)
+        return cities
+
+    def prefix(self, key_prefix, limit=10):
+        """키가 key_prefix로 시작하는 도시 목록 (키 순서, 같은 도시는 한 번만)"""
+        cities = []
+        for line_key, city in self._iter_lines(self._lower_bound(key_prefix.encode("utf-8"))):
+            if not line_key.startswith(key_prefix) or len(cities) >= limit:
+                break
+            if city not in cities:
+                cities.append(city)
+        return cities
+
+    def fuzzy(self, key, min_ratio=FUZZY_MIN_RATIO):
+        """첫 글자가 같은 키들 중 유사도가 min_ratio 이상인 도시 목록 (유사도, 인구 내림차순)"""
+        first = key[0]
+        start = self._lower_bound(first.encode("utf-8"))
+        stop = self._lower_bound(chr(ord(first) + 1).encode("utf-8"))
+        matcher = difflib.SequenceMatcher(b=key, autojunk=False)
+        scored = {}
+        for line_key, city in self._iter_lines(start, stop):
+            matcher.set_seq1(line_key)
+            if matcher.real_quick_ratio() < min_ratio or matcher.quick_ratio() < min_ratio:
+                continue
+            ratio = matcher.ratio()
+            if ratio >= min_ratio and ratio > scored.get(city, 0):
+                scored[city] = ratio
+        return sorted(scored, key=lambda city: (-scored[city], -city.population))
+
+    def __len__(self):
+        return self._mm[self._start:].count(b"\n")
+
+_gazetteer = None
+_gazetteer_lock = threading.Lock()
+
+def get_gazetteer():
+    """GAZETTEER_PATH의 색인을 엽니다. (처음 호출될 때 한 번)"""
+    global _gazetteer
+    if _gazetteer is None:
+        with _gazetteer_lock:
+            if _gazetteer is None:
+                _gazetteer = CityGazetteer(GAZETTEER_PATH)
+    return _gazetteer
+
+@functools.lru_cache(maxsize=CITY_LOOKUP_CACHE_SIZE)
+def find_city(query):
+    """
+    도시 이름으로 City를 찾습니다. 못 찾으면 None.
+    "도시, 국가코드"(예: "Portland, US", "Birmingham, GB") 형식이면 같은 이름의 도시 중 그 나라 도시를 고르고,
+    그 나라에 그런 도시가 없으면 (다른 나라 도시로 잘못 계산하지 않도록) None을 반환합니다.
+    정확히 일치하는 이름이 없으면 오타를 허용해 가장 비슷한 이름을 찾습니다.
+    """
+    gazetteer = get_gazetteer()
+    name, _, qualifier = query.partition(",")
+    qualifier = qualifier.strip().upper()
+    # 두 글자 영문이면 국가코드로 보고, 그 밖의 덧붙임("Seoul, Korea" 등)은 도시를 고르는 데 쓰지 않습니다.
+    country = qualifier if len(qualifier) == 2 and qualifier.isascii() and qualifier.isalpha() else ""
+    for key in dict.fromkeys((normalize_city_name(query), normalize_city_name(name))):
+        if not key:
+            continue
+        if country:
+            cities = [city for city in gazetteer.lookup(key) if city.country == country] or [city for city in gazetteer.fuzzy(key) if city.country == country]
+        else:
+            cities = gazetteer.lookup(key) or gazetteer.fuzzy(key)
+        if cities:
+            return cities[0]
+    return None
+
+def search_cities(query_prefix, limit=10):
+    """입력 중인 도시 이름의 자동 완성 후보 목록"""
+    key = normalize_city_name(query_prefix)
+    return get_gazetteer().prefix(key, limit) if key else []
+
+# --- 색인 만들기 ---
+def read_city_source(path):
+    """gazetteer/cities.tsv 형식(이름, 국가, 위도, 경도, 시간대, 인구, 다른 이름들)의 도시 목록을 읽습니다."""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip() or line.startswith("#"):
+                continue
+            name, country, latitude, longitude, tz_name, population, alternate_names = line.rstrip("\n").split("\t")
+            yield City(name, country, float(latitude), float(longitude), tz_name, int(population)), alternate_names.split(",")
+
+def read_geonames_cities(path, min_population=0):
+    """GeoNames cities*.txt 덤프(탭 구분 19열)를 읽습니다. alternatenames 열의 한글 등 다른 표기도 모두 키로 씁니다."""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            columns = line.rstrip("\n").split("\t")
+            population = int(columns[14] or 0)
+            if population < min_population or not columns[17]:
+                continue
+            city = City(columns[1], columns[8], float(columns[4]), float(columns[5]), columns[17], population)
+            yield city, [columns[2]] + columns[3].split(",")
+
+def build_gazetteer_index(cities_with_names, out_path):
+    """(City, 다른 이름 목록)들로 정렬된 색인 파일을 만들고 (도시 수, 키 수)를 반환합니다. 알 수 없는 시간대면 ValueError."""
+    import pytz
+    lines, city_count = [], 0
+    for city, alternate_names in cities_with_names:
+        if city.timezone not in pytz.all_timezones_set:
+            raise ValueError(f"{city.name}: 알 수 없는 시간대 {city.timezone}")
+        city_count += 1
+        fields = f"{city.name}\t{city.country}\t{city.latitude:.4f}\t{city.longitude:.4f}\t{city.timezone}\t{city.population}"
+        keys = {normalize_city_name(n) for n in [city.name] + alternate_names}
+        lines.extend((key.encode("utf-8"), -city.population, f"{key}\t{fields}") for key in keys if key)
+    lines.sort()
+    with open(out_path + ".tmp", "w", encoding="utf-8", newline="\n") as f:
+        f.write(GAZETTEER_HEADER + "\n")
+        f.writelines(line + "\n" for _, _, line in lines)
+    os.replace(out_path + ".tmp", out_path)
+    return city_count, len(lines)
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="도시 지명 사전 색인 만들기/조회")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build = subparsers.add_parser("build", help="도시 목록으로 색인 파일을 만듭니다.")
+    build.add_argument("source", help="gazetteer/cities.tsv 형식 파일 또는 GeoNames cities*.txt (--geonames)")
+    build.add_argument("-o", "--output", default=os.path.join(GAZETTEER_DIR, "cities.idx"))
+    build.add_argument("--geonames", action="store_true", help="GeoNames 덤프 형식으로 읽습니다.")
+    build.add_argument("--min-population", type=int, default=0, help="(GeoNames) 이 인구보다 작은 도시는 뺍니다.")
+    lookup = subparsers.add_parser("lookup", help="도시를 찾아 출력합니다.")
+    lookup.add_argument("name")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        source = read_geonames_cities(args.source, args.min_population) if args.geonames else read_city_source(args.source)
+        city_count, key_count = build_gazetteer_index(source, args.output)
+        print(f"도시 {city_count}개, 키 {key_count}개를 {args.output}에 저장했습니다.")
+        return 0
+    city = find_city(args.name)
+    print(city if city else f"'{args.name}' 도시를 찾을 수 없습니다.")
+    return 0 if city else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,213 @@
+import datetime
+import math
+
+# ==============================================================================
+# 절기(24절기) 천문 계산 모듈
+# 공공데이터 API 없이 태양의 시황경(apparent longitude)을 직접 계산하여 절기 시각(KST)을 구합니다.
+# (Jean Meeus, "Astronomical Algorithms" 25장/32장의 VSOP87 축약 급수를 사용, 오차 약 1분 이내)
+# ==============================================================================
+
+# 절기 이름별 태양 황경(도). 소한(285°)부터 동지(270°)까지 양력 한 해의 순서입니다.
+SOLAR_TERM_LONGITUDES = [
+    ("소한", 285), ("대한", 300), ("입춘", 315), ("우수", 330), ("경칩", 345), ("춘분", 0),
+    ("청명", 15), ("곡우", 30), ("입하", 45), ("소만", 60), ("망종", 75), ("하지", 90),
+    ("소서", 105), ("대서", 120), ("입추", 135), ("처서", 150), ("백로", 165), ("추분", 180),
+    ("한로", 195), ("상강", 210), ("입동", 225), ("소설", 240), ("대설", 255), ("동지", 270),
+]
+
+KST_OFFSET = datetime.timedelta(hours=9)
+J2000_JD = 2451545.0
+UNIX_EPOCH_JD = 2440587.5
+
+# 지구 일심 황경 VSOP87 급수 (진폭 1e-8 rad, 위상 rad, 주기 rad/천년)
+VSOP87_EARTH_L0 = [
+    (175347046, 0.0, 0.0), (3341656, 4.6692568, 6283.07585), (34894, 4.6261, 12566.1517),
+    (3497, 2.7441, 5753.3849), (3418, 2.8289, 3.5231), (3136, 3.6277, 77713.7715),
+    (2676, 4.4181, 7860.4194), (2343, 6.1352, 3930.2097), (1324, 0.7425, 11506.7698),
+    (1273, 2.0371, 529.691), (1199, 1.1096, 1577.3435), (990, 5.233, 5884.927),
+    (902, 2.045, 26.298), (857, 3.508, 398.149), (780, 1.179, 5223.694),
+    (753, 2.533, 5507.553), (505, 4.583, 18849.228), (492, 4.205, 775.523),
+    (357, 2.92, 0.067), (317, 5.849, 11790.629), (284, 1.899, 796.298),
+    (271, 0.315, 10977.079), (243, 0.345, 5486.778), (206, 4.806, 2544.314),
+    (205, 1.869, 5573.143), (202, 2.458, 6069.777), (156, 0.833, 213.299),
+    (132, 3.411, 2942.463), (126, 1.083, 20.775), (115, 0.645, 0.98),
+    (103, 0.636, 4694.003), (102, 0.976, 15720.839), (102, 4.267, 7.114),
+    (99, 6.21, 2146.17), (98, 0.68, 155.42), (86, 5.98, 161000.69),
+    (85, 1.3, 6275.96), (85, 3.67, 71430.7), (80, 1.81, 17260.15),
+    (79, 3.04, 12036.46), (75, 1.76, 5088.63), (74, 3.5, 3154.69),
+    (74, 4.68, 801.82), (70, 0.83, 9437.76), (62, 3.98, 8827.39),
+    (61, 1.82, 7084.9), (57, 2.78, 6286.6), (56, 4.39, 14143.5),
+    (56, 3.47, 6279.55), (52, 0.19, 12139.55), (52, 1.33, 1748.02),
+    (51, 0.28, 5856.48), (49, 0.49, 1194.45), (41, 5.37, 8429.24),
+    (41, 2.4, 19651.05), (39, 6.17, 10447.39), (37, 6.04, 10213.29),
+    (37, 2.57, 1059.38), (36, 1.71, 2352.87), (36, 1.78, 6812.77),
+    (33, 0.59, 17789.85), (30, 0.44, 83996.85), (30, 2.74, 1349.87),
+    (25, 3.16, 4690.48),
+]
+VSOP87_EARTH_L1 = [
+    (628331966747, 0.0, 0.0), (206059, 2.678235, 6283.07585), (4303, 2.6351, 12566.1517),
+    (425, 1.59, 3.523), (119, 5.796, 26.298), (109, 2.966, 1577.344),
+    (93, 2.59, 18849.23), (72, 1.14, 529.69), (68, 1.87, 398.15),
+    (67, 4.41, 5507.55), (59, 2.89, 5223.69), (56, 2.17, 155.42),
+    (45, 0.4, 796.3), (36, 0.47, 775.52), (29, 2.65, 7.11),
+    (21, 5.34, 0.98), (19, 1.85, 5486.78), (19, 4.97, 213.3),
+    (17, 2.99, 6275.96), (16, 0.03, 2544.31), (16, 1.43, 2146.17),
+    (15, 1.21, 10977.08), (12, 2.83, 1748.02), (12, 3.26, 5088.63),
+    (12, 5.27, 1194.45), (12, 2.08, 4694.0), (11, 0.77, 553.57),
+    (10, 1.3, 6286.6), (10, 4.24, 1349.87), (9, 2.7, 242.73),
+    (9, 5.64, 951.72), (8, 5.3, 2352.87), (6, 2.65, 9437.76),
+    (6, 4.67, 4690.48),
+]
+VSOP87_EARTH_L2 = [
+    (52919, 0.0, 0.0), (8720, 1.0721, 6283.0758), (309, 0.867, 12566.152),
+    (27, 0.05, 3.52), (16, 5.19, 26.3), (16, 3.68, 155.42),
+    (10, 0.76, 18849.23), (9, 2.06, 77713.77), (7, 0.83, 775.52),
+    (5, 4.66, 1577.34), (4, 1.03, 7.11), (4, 3.44, 5573.14),
+    (3, 5.14, 796.3), (3, 6.05, 5507.55), (3, 1.19, 242.73),
+    (3, 6.12, 529.69), (3, 0.31, 398.15), (3, 2.28, 553.57),
+    (2, 4.38, 5223.69), (2, 3.75, 0.98),
+]
+VSOP87_EARTH_L3 = [
+    (289, 5.844, 6283.076), (35, 0.0, 0.0), (17, 5.49, 12566.15),
+    (3, 5.2, 155.42), (1, 4.72, 3.52), (1, 5.3, 18849.23), (1, 5.97, 242.73),
+]
+VSOP87_EARTH_L4 = [(114, 3.142, 0.0), (8, 4.13, 6283.08), (1, 3.84, 12566.15)]
+VSOP87_EARTH_L5 = [(1, 3.14, 0.0)]
+VSOP87_EARTH_L = [VSOP87_EARTH_L0, VSOP87_EARTH_L1, VSOP87_EARTH_L2, VSOP87_EARTH_L3, VSOP87_EARTH_L4, VSOP87_EARTH_L5]
+
+# 태양-지구 거리(광행차 보정용)에 필요한 주요 항만 사용합니다.
+VSOP87_EARTH_R0 = [
+    (100013989, 0.0, 0.0), (1670700, 3.0984635, 6283.07585), (13956, 3.05525, 12566.1517),
+    (3084, 5.1985, 77713.7715), (1628, 1.1739, 5753.3849), (1576, 2.8469, 7860.4194),
+    (925, 5.453, 11506.77), (542, 4.564, 3930.21), (472, 3.661, 5884.927),
+]
+VSOP87_EARTH_R1 = [(103019, 1.10749, 6283.07585), (1721, 1.0644, 12566.1517), (702, 3.142, 0.0)]
+VSOP87_EARTH_R2 = [(4359, 5.7846, 6283.0758), (124, 5.579, 12566.152)]
+VSOP87_EARTH_R = [VSOP87_EARTH_R0, VSOP87_EARTH_R1, VSOP87_EARTH_R2]
+
+
+def _sum_vsop_series(series_list, tau):
+    """VSOP87 급수(L0, L1, ...)를 tau(율리우스 천년)의 거듭제곱으로 합산합니다."""
+    total = 0.0
+    for power, series in enumerate(series_list):
+        total += sum(a * math.cos(b + c * tau) for a, b, c in series) * tau ** power
+    return total / 1e8
+
+
+def delta_t_seconds(year_float):
+    """역학시(TT)와 세계시(UT)의 차이(ΔT, 초)를 Espenak-Meeus 다항식으로 근사합니다."""
+    y = year_float
+    if y < 1900:
+        t = y - 1860
+        return 7.62 + 0.5737 * t - 0.251754 * t**2 + 0.01680668 * t**3 - 0.0004473624 * t**4 + t**5 / 233174
+    if y < 1920:
+        t = y - 1900
+        return -2.79 + 1.494119 * t - 0.0598939 * t**2 + 0.0061966 * t**3 - 0.000197 * t**4
+    if y < 1941:
+        t = y - 1920
+        return 21.20 + 0.84493 * t - 0.076100 * t**2 + 0.0020936 * t**3
+    if y < 1961:
+        t = y - 1950
+        return 29.07 + 0.407 * t - t**2 / 233 + t**3 / 2547
+    if y < 1986:
+        t = y - 1975
+        return 45.45 + 1.067 * t - t**2 / 260 - t**3 / 718
+    if y < 2005:
+        t = y - 2000
+        return 63.86 + 0.3345 * t - 0.060374 * t**2 + 0.0017275 * t**3 + 0.000651814 * t**4 + 0.00002373599 * t**5
+    if y < 2050:
+        t = y - 2000
+        return 62.92 + 0.32217 * t + 0.005589 * t**2
+    if y < 2150:
+        return -20 + 32 * ((y - 1820) / 100) ** 2 - 0.5628 * (2150 - y)
+    return -20 + 32 * ((y - 1820) / 100) ** 2
+
+
+def apparent_solar_longitude(jde):
+    """역학시 율리우스일(JDE)에 대한 태양의 시황경(도, 0~360)을 계산합니다."""
+    tau = (jde - J2000_JD) / 365250.0
+    t = tau * 10.0
+
+    helio_longitude = math.degrees(_sum_vsop_series(VSOP87_EARTH_L, tau))
+    radius = _sum_vsop_series(VSOP87_EARTH_R, tau)
+
+    # 일심 → 지심 황경, FK5 좌표계 보정(-0.09033")
+    geo_longitude = helio_longitude + 180.0 - 0.09033 / 3600.0
+
+    # 장동(황경 방향) 주요 항
+    omega = math.radians(125.04452 - 1934.136261 * t)
+    sun_mean = math.radians(280.4665 + 36000.7698 * t)
+    moon_mean = math.radians(218.3165 + 481267.8813 * t)
+    nutation = (-17.20 * math.sin(omega) - 1.32 * math.sin(2 * sun_mean)
+                - 0.23 * math.sin(2 * moon_mean) + 0.21 * math.sin(2 * omega)) / 3600.0
+
+    # 광행차
+    aberration = -20.4898 / 3600.0 / radius
+
+    return (geo_longitude + nutation + aberration) % 360.0
+
+
+def _datetime_utc_to_jd(dt_utc):
+    """(tzinfo 없는) UTC datetime을 율리우스일로 변환합니다."""
+    return UNIX_EPOCH_JD + (dt_utc - datetime.datetime(1970, 1, 1)).total_seconds() / 86400.0
+
+
+def _jd_to_datetime_utc(jd):
+    """율리우스일을 (tzinfo 없는) UTC datetime으로 변환합니다."""
+    return datetime.datetime(1970, 1, 1) + datetime.timedelta(days=jd - UNIX_EPOCH_JD)
+
+
+def find_solar_longitude_time_utc(year, target_longitude):
+    """지정된 양력 연도에 태양 시황경이 target_longitude(도)가 되는 시각을 UTC datetime으로 반환합니다."""
+    # 춘분(3월 20일경)을 기준으로 하루 약 0.9856도씩 움직인다고 보고 초기값을 잡습니다.
+    # 동지(270°, 12월) 이후의 황경(소한~경칩)은 같은 해 1~3월이므로 춘분 이전으로 잡습니다.
+    days_from_equinox = (target_longitude % 360) / 360.0 * 365.2422
+    if target_longitude % 360 > 270:
+        days_from_equinox -= 365.2422
+    guess_utc = datetime.datetime(year, 3, 20, 12) + datetime.timedelta(days=days_from_equinox)
+
+    jd_ut = _datetime_utc_to_jd(guess_utc)
+    delta_t_days = delta_t_seconds(year + (guess_utc.timetuple().tm_yday - 0.5) / 365.25) / 86400.0
+
+    # 뉴턴 반복법 (태양의 평균 각속도 360/365.2422도/일 사용)
+    for _ in range(20):
+        diff = (target_longitude - apparent_solar_longitude(jd_ut + delta_t_days) + 180.0) % 360.0 - 180.0
+        jd_ut += diff * 365.2422 / 360.0
+        if abs(diff) < 1e-7:
+            break
+    return _jd_to_datetime_utc(jd_ut)
+
+
+def calculate_solar_terms_for_year(year):
+    """
+    지정된 양력 연도의 24절기 시각을 계산하여 {절기 이름: KST datetime} 형태로 반환합니다.
+    get_solar_terms_from_api()와 같은 형태이며, API와 마찬가지로 분 단위(반올림)까지만 사용합니다.
+    """
+    solar_terms_for_year = {}
+    for term_name, longitude in SOLAR_TERM_LONGITUDES:
+        term_kst = find_solar_longitude_time_utc(year, longitude) + KST_OFFSET
+        solar_terms_for_year[term_name] = (term_kst + datetime.timedelta(seconds=30)).replace(second=0, microsecond=0)
+    return solar_terms_for_year
+
+
+# ==============================================================================
+# 균시차(equation of time) 표: 진태양시 - 평균태양시
+# 태양의 남중 시각은 지구 궤도의 이심률과 자전축 기울기 때문에 평균태양시보다 최대 약 +16분/-14분 어긋납니다.
+# 이 차이는 해마다 거의 같으므로(수십 년 동안 30초 이내로 변함) 날짜(1월 1일부터의 순번)별로 한 번만 계산해 둡니다.
+# (Spencer 1971 푸리에 급수, 각 날짜의 정오 기준, 오차 약 30초 이내)
+# ==============================================================================
+
+def _equation_of_time_minutes(day_of_year):
+    """해당 날짜(1~366) 정오의 균시차(분)"""
+    gamma = 2.0 * math.pi * (day_of_year - 1) / 365.0
+    return 229.18 * (0.000075 + 0.001868 * math.cos(gamma) - 0.032077 * math.sin(gamma)
+                     - 0.014615 * math.cos(2 * gamma) - 0.040849 * math.sin(2 * gamma))
+
+
+# EQUATION_OF_TIME_SECONDS[날짜 순번 - 1] = 균시차(초, 반올림)
+EQUATION_OF_TIME_SECONDS = tuple(round(_equation_of_time_minutes(day_of_year) * 60) for day_of_year in range(1, 367))
+
+
+def equation_of_time_seconds(date_value):
+    """해당 날짜(date 또는 datetime)의 균시차(초). 평균태양시에 더하면 진태양시가 됩니다."""
+    return EQUATION_OF_TIME_SECONDS[date_value.timetuple().tm_yday - 1]
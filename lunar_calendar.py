@@ -0,0 +1,115 @@
+import bisect
+import datetime
+
+# ==============================================================================
+# 음력(한국 음양력) 달력 인덱스 모듈
+# 1900~2100년 음력 연도별 월 길이, 윤달, 설날(음력 1월 1일) 위치를 정수 하나씩으로 압축해 담고 있어
+# 공공데이터 API 없이 음력 <-> 양력 변환을 메모리 내 조회만으로 수행합니다.
+# (1900~2049년은 한국천문연구원(KASI) 음양력 자료, 2050년 이후는 같은 규칙(KST 기준 삭·중기)으로 천문 계산한 값)
+# ==============================================================================
+
+LUNAR_TABLE_START_YEAR = 1900
+LUNAR_TABLE_END_YEAR = 2100
+
+# 연도별 정보 비트 구성
+#   0~12비트 : 해당 해의 n번째 달(윤달 포함 순서)이 30일(큰달)이면 1, 29일(작은달)이면 0
+#   13~16비트: 윤달이 드는 달 (0이면 윤달 없음)
+#   17~22비트: 설날의 양력 1월 1일 기준 일수 오프셋
+LUNAR_YEAR_INFO = (
+    0x3d16d2, 0x620752, 0x4c0ea5, 0x38b64a, 0x5c064b, 0x440a9b, 0x309556, 0x56056a, 0x400b59, 0x2a5752,  # 1900-1909
+    0x500752, 0x3adb25, 0x600b25, 0x480a4b, 0x32b29b, 0x580aad, 0x44056a, 0x2c4b69, 0x520ba9, 0x3efb52,  # 1910-1919
+    0x640d92, 0x4c0d25, 0x36ba4d, 0x5c0956, 0x4602b5, 0x2e95ad, 0x5606d4, 0x400da9, 0x2c5d92, 0x500e92,  # 1920-1929
+    0x3acd26, 0x5e0527, 0x480a57, 0x32b2b6, 0x580ada, 0x4406d4, 0x2e6ea9, 0x520749, 0x3cf693, 0x620a93,  # 1930-1939
+    0x4c052b, 0x34ca5b, 0x5a096d, 0x460b6a, 0x329b54, 0x560ba4, 0x400b49, 0x2a5a93, 0x500a95, 0x38f52b,  # 1940-1949
+    0x5e052d, 0x480aad, 0x34b56a, 0x580db2, 0x440da4, 0x2e7d49, 0x540d4a, 0x3d1a95, 0x620a96, 0x4c0556,  # 1950-1959
+    0x36cab5, 0x5a0ad5, 0x4606d2, 0x308ea5, 0x560ea5, 0x400e4a, 0x2a6c96, 0x4e0a9b, 0x3af556, 0x5e056a,  # 1960-1969
+    0x480b59, 0x34b752, 0x5a0752, 0x420725, 0x2c964b, 0x520a4b, 0x3d12ab, 0x6002ad, 0x4a056b, 0x36cb69,  # 1970-1979
+    0x5c0da9, 0x460d92, 0x309b25, 0x560d25, 0x415a4d, 0x640a56, 0x4e02b6, 0x38d5ad, 0x6006d4, 0x480da9,  # 1980-1989
+    0x34bd92, 0x5a0e92, 0x440d26, 0x2c6a56, 0x500a57, 0x3d12b6, 0x620b5a, 0x4c06d4, 0x36aec9, 0x5c0749,  # 1990-1999
+    0x460693, 0x2e9527, 0x54052b, 0x3e0a5b, 0x2a555a, 0x4e036a, 0x38fb55, 0x600ba4, 0x4a0b49, 0x32ba93,  # 2000-2009
+    0x580a95, 0x42052d, 0x2c6a5d, 0x500aad, 0x3d35aa, 0x6205d2, 0x4c0da5, 0x36bd4a, 0x5c0d4a, 0x460a95,  # 2010-2019
+    0x30952d, 0x540556, 0x3e0ab5, 0x2a55aa, 0x5006d2, 0x38cea5, 0x5e0ea5, 0x4a0e4a, 0x34ac96, 0x560c9b,  # 2020-2029
+    0x42055a, 0x2c6ad5, 0x520b69, 0x3d7752, 0x620752, 0x4c0b25, 0x36d64b, 0x5a0a4b, 0x4404ab, 0x2ea55b,  # 2030-2039
+    0x54056d, 0x3e0b69, 0x2a5b52, 0x500d92, 0x3afd25, 0x5e0d25, 0x480a4d, 0x32b4ad, 0x5802b6, 0x4005b5,  # 2040-2049
+    0x2c6da9, 0x520ea9, 0x3f1d92, 0x620e92, 0x4c0d26, 0x36ca56, 0x5a0a57, 0x4404d6, 0x2e86b5, 0x5406d5,  # 2050-2059
+    0x400ec9, 0x2a6e92, 0x4e0693, 0x38f52b, 0x5e052b, 0x460a5b, 0x32b55a, 0x58056a, 0x420b55, 0x2c9749,  # 2060-2069
+    0x520b49, 0x3d1a93, 0x620a95, 0x4a052d, 0x34caad, 0x5a0ab5, 0x4605aa, 0x2e8ba5, 0x540da5, 0x400d4a,  # 2070-2079
+    0x2a7a95, 0x4e0c95, 0x38f52e, 0x5e0556, 0x480ab5, 0x32b5b2, 0x5806d2, 0x420ea5, 0x2e9e4a, 0x52064a,  # 2080-2089
+    0x3b0c97, 0x600cab, 0x4c055a, 0x34cad5, 0x5a0b69, 0x460752, 0x3096a5, 0x540b25, 0x3e064b, 0x287497,  # 2090-2099
+    0x4e04ab,  # 2100-2100
+)
+
+# 빠른 조회를 위해 모듈 로드 시 한 번만 만드는 인덱스
+LUNAR_NEW_YEAR_ORDINALS = []  # 연도별 설날의 양력 서수(date.toordinal())
+LUNAR_MONTH_OFFSETS = []      # 연도별 각 달(윤달 포함 순서) 1일의 설날 기준 일수, 마지막 값은 그 해의 총 일수
+LUNAR_LEAP_MONTHS = []        # 연도별 윤달 (0이면 없음)
+
+def _build_lunar_index():
+    """LUNAR_YEAR_INFO를 풀어 연도별 설날 서수와 월별 누적 일수 배열을 만듭니다."""
+    for offset, info in enumerate(LUNAR_YEAR_INFO):
+        year = LUNAR_TABLE_START_YEAR + offset
+        leap_month = (info >> 13) & 0xF
+        month_count = 13 if leap_month else 12
+        new_year_ordinal = datetime.date(year, 1, 1).toordinal() + (info >> 17)
+
+        month_offsets = [0]
+        for month_idx in range(month_count):
+            month_offsets.append(month_offsets[-1] + (30 if info & (1 << month_idx) else 29))
+
+        LUNAR_NEW_YEAR_ORDINALS.append(new_year_ordinal)
+        LUNAR_MONTH_OFFSETS.append(month_offsets)
+        LUNAR_LEAP_MONTHS.append(leap_month)
+
+_build_lunar_index()
+
+def is_lunar_year_supported(l_year):
+    """내장 음력 표가 해당 음력 연도를 포함하는지 반환합니다."""
+    return LUNAR_TABLE_START_YEAR <= l_year <= LUNAR_TABLE_END_YEAR
+
+def lunar_to_solar(l_year, l_month, l_day, is_leap_month=False):
+    """
+    음력 날짜를 양력 datetime.date로 변환합니다.
+    표 범위를 벗어나거나 존재하지 않는 날짜(윤달이 없는 달의 윤달, 작은달의 30일 등)이면 None을 반환합니다.
+    """
+    if not is_lunar_year_supported(l_year) or not (1 <= l_month <= 12) or not (1 <= l_day <= 30):
+        return None
+
+    year_idx = l_year - LUNAR_TABLE_START_YEAR
+    leap_month = LUNAR_LEAP_MONTHS[year_idx]
+    if is_leap_month:
+        if l_month != leap_month:
+            return None
+        month_idx = l_month
+    else:
+        month_idx = l_month - 1 if (not leap_month or l_month <= leap_month) else l_month
+
+    month_offsets = LUNAR_MONTH_OFFSETS[year_idx]
+    month_length = month_offsets[month_idx + 1] - month_offsets[month_idx]
+    if l_day > month_length:
+        return None
+
+    return datetime.date.fromordinal(LUNAR_NEW_YEAR_ORDINALS[year_idx] + month_offsets[month_idx] + l_day - 1)
+
+def solar_to_lunar(solar_date):
+    """
+    양력 날짜를 음력으로 변환하여 (음력 연, 월, 일, 윤달 여부) 튜플로 반환합니다.
+    표 범위를 벗어나면 None을 반환합니다.
+    """
+    ordinal = solar_date.toordinal()
+    year_idx = bisect.bisect_right(LUNAR_NEW_YEAR_ORDINALS, ordinal) - 1
+    if year_idx < 0:
+        return None
+
+    days_from_new_year = ordinal - LUNAR_NEW_YEAR_ORDINALS[year_idx]
+    month_offsets = LUNAR_MONTH_OFFSETS[year_idx]
+    if days_from_new_year >= month_offsets[-1]:
+        return None # 2100년 음력 마지막 날 이후
+
+    month_idx = bisect.bisect_right(month_offsets, days_from_new_year) - 1
+    l_day = days_from_new_year - month_offsets[month_idx] + 1
+
+    leap_month = LUNAR_LEAP_MONTHS[year_idx]
+    if leap_month and month_idx == leap_month:
+        return LUNAR_TABLE_START_YEAR + year_idx, leap_month, l_day, True
+    l_month = month_idx if (leap_month and month_idx > leap_month) else month_idx + 1
+    return LUNAR_TABLE_START_YEAR + year_idx, l_month, l_day, False
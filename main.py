@@ -1,31 +1,198 @@
+import io
 import json
-from fastapi import FastAPI, Response
-from fastapi.responses import JSONResponse
+import os
+import tempfile
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 
-# 이제 저희가 만든 단 하나의 통합 함수만 가져옵니다.
-from sajumentor import get_saju_analysis_for_api
+# 이제 저희가 만든 단 하나의 통합 함수만 가져옵니다. (외부 I/O를 막지 않는 비동기 버전)
+from sajumentor_async import get_saju_analysis_for_api_async, close_async_http_client
+from saju_batch import (
+    BATCH_BACKEND, BATCH_PROCESS_MIN_RECORDS, get_batch_process_pool, get_saju_analysis_batch, get_saju_analysis_batch_parallel, shutdown_batch_process_pool,
+)
+from saju_compatibility import get_compatibility_analysis_async
+from saju_calendar_luck import get_calendar_luck_for_api_async
+from saju_time_unknown import get_saju_hour_candidates_for_api_async
+from saju_http_cache import ANALYSIS_RESPONSE_CACHE, analysis_cache_control, analysis_etag, etag_matches, normalize_analysis_params
+from city_gazetteer import search_cities
+from saju_export import iter_luck_trend_export
+from saju_response import RESPONSE_FORMATS, encode_response
+from saju_metrics import HttpMetricsMiddleware, render_prometheus
+from sajumentor import SOLAR_TERM_STORE, warm_up
 
 app = FastAPI()
+# 요청 처리 시간을 라우트별 히스토그램으로 기록합니다. (/metrics)
+app.add_middleware(HttpMetricsMiddleware)
+
+# SAJU_SOLAR_TERM_PRELOAD에 절기 파일(SolarTermStore.export_to_file 형식)을 지정하면 시작할 때 절기 캐시를 채웁니다.
+# SAJU_WARMUP=1 이면 서버가 요청을 받기 전에 조회용 테이블(절기, 이론적 최대/최소 점수)을 미리 만듭니다.
+@app.on_event("startup")
+async def warm_up_engine():
+    preload_path = os.environ.get("SAJU_SOLAR_TERM_PRELOAD", "")
+    if preload_path:
+        loaded_years = await run_in_threadpool(SOLAR_TERM_STORE.preload_from_file, preload_path)
+        print(f"절기 캐시 미리 채움: {loaded_years}개 연도 ({preload_path})")
+    if os.environ.get("SAJU_WARMUP", "0") == "1":
+        stats = await run_in_threadpool(warm_up)
+        print(f"엔진 워밍업 완료: {stats}")
+    if BATCH_BACKEND == "process":
+        # 일괄 분석용 작업 프로세스를 미리 띄워 절기 캐시와 조회용 테이블을 채워 둡니다.
+        await run_in_threadpool(get_batch_process_pool)
+
+@app.on_event("shutdown")
+async def shutdown_http_client():
+    await close_async_http_client()
+    await run_in_threadpool(shutdown_batch_process_pool)
+
+def _json_response(result, endpoint, response_format="pretty", short_keys=False):
+    """결과를 요청한 형식으로 인코딩하고, 응답 크기와 인코딩 시간을 X-Response-Bytes / X-Encode-Ms 헤더에 담아 반환합니다."""
+    body, headers = encode_response(result, response_format, short_keys, endpoint)
+    status_code = 400 if "error" in result else 200
+    return Response(content=body, status_code=status_code, media_type="application/json; charset=utf-8", headers=headers)
+
+def _invalid_format_error(response_format):
+    return {"error": "입력값 오류", "details": f"format은 {', '.join(RESPONSE_FORMATS)} 중 하나여야 합니다. (입력: {response_format})"}
 
 # --- 이 API가 모든 데이터를 반환하도록 합니다. ---
+# format=compact 이면 들여쓰기 없이 빠른 인코더로, short_keys=true 이면 반복되는 필드 이름을 짧게 줄여 응답합니다.
+# true_solar_time=true 이면 일주/시주를 출생지 경도와 균시차를 반영한 진태양시로 계산합니다. (일괄 분석은 같은 이름의 필드)
+# is_time_unknown=true 와 all_hours=true 를 함께 주면 12시 30분을 가정하는 대신 가능한 시주 12개를 모두 분석해 후보별 결과와 일치도를 반환합니다.
 @app.get("/analysis")
-def analysis(birth: str, gender: str, cal_type: str = '양', time: str = '1230', is_leap: bool = False, is_time_unknown: bool = False, is_overseas: bool = False, city: str = ""):
-    # 저희가 새로 만든 통합 함수를 호출합니다.
-    result = get_saju_analysis_for_api(
+async def analysis(request: Request, birth: str, gender: str, cal_type: str = '양', time: str = '1230', is_leap: bool = False, is_time_unknown: bool = False, is_overseas: bool = False, city: str = "", true_solar_time: bool = False, all_hours: bool = False, format: str = "pretty", short_keys: bool = False):
+    if format not in RESPONSE_FORMATS:
+        return _json_response(_invalid_format_error(format), "/analysis")
+
+    # 같은 입력의 응답은 기준 연도가 바뀌기 전까지 같으므로, 클라이언트/CDN이 가진 것과 같으면 304, 최근 응답이면 캐시된 본문을 그대로 보냅니다.
+    etag = analysis_etag(normalize_analysis_params(birth, gender, cal_type, time, is_leap, is_time_unknown, is_overseas, city, true_solar_time, all_hours, format, short_keys))
+    cache_headers = {"ETag": etag, "Cache-Control": analysis_cache_control()}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        ANALYSIS_RESPONSE_CACHE.record_not_modified()
+        return Response(status_code=304, headers=cache_headers)
+    cached_body = ANALYSIS_RESPONSE_CACHE.get(etag)
+    if cached_body is not None:
+        return Response(content=cached_body, media_type="application/json; charset=utf-8", headers={**cache_headers, "X-Response-Bytes": str(len(cached_body)), "X-Encode-Ms": "0.000", "X-Response-Cache": "hit"}) # 인코딩하지 않았으므로 0
+
+    if is_time_unknown and all_hours:
+        result = await get_saju_hour_candidates_for_api_async(
+            cal_type=cal_type, date_str=birth, gender_input=gender, is_leap_input=is_leap,
+            is_overseas=is_overseas, city_name=city, true_solar_time=true_solar_time
+        )
+    else:
+        # 저희가 새로 만든 통합 함수를 호출합니다.
+        result = await get_saju_analysis_for_api_async(
+            cal_type=cal_type, date_str=birth, time_str=time, gender_input=gender,
+            is_leap_input=is_leap, is_time_unknown=is_time_unknown,
+            is_overseas=is_overseas, city_name=city, true_solar_time=true_solar_time
+        )
+    # 응답 인코딩도 CPU 작업이므로 이벤트 루프 밖에서 합니다.
+    response = await run_in_threadpool(_json_response, result, "/analysis", format, short_keys)
+    if response.status_code == 200: # 오류 응답은 캐시하지 않습니다.
+        ANALYSIS_RESPONSE_CACHE.put(etag, response.body)
+        response.headers.update({**cache_headers, "X-Response-Cache": "miss"})
+    return response
+
+
+# --- 일괄 분석 API: 요청 본문은 JSON Lines (한 줄에 /analysis 파라미터와 같은 필드를 가진 JSON 객체 하나) ---
+@app.post("/analysis/batch")
+async def analysis_batch(request: Request):
+    body = (await request.body()).decode("utf-8")
+    records, parse_errors = [], {}
+    for line in body.splitlines():
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            parse_errors[len(records)] = str(e)
+            records.append({})
+            continue
+        if not isinstance(record, dict): # saju_export.iter_birth_records와 같은 규칙
+            parse_errors[len(records)] = "한 줄에 JSON 객체 하나가 있어야 합니다."
+            record = {}
+        records.append(record)
+
+    # CPU 위주 작업이므로 이벤트 루프를 막지 않도록 스레드풀에서 실행합니다.
+    # SAJU_BATCH_BACKEND=process이면 건수가 많은 요청은 여러 프로세스에 나눠 처리합니다.
+    if BATCH_BACKEND == "process" and len(records) >= BATCH_PROCESS_MIN_RECORDS:
+        batch = await run_in_threadpool(get_saju_analysis_batch_parallel, records)
+        lines = batch["lines"]
+    else:
+        batch = await run_in_threadpool(get_saju_analysis_batch, records)
+        lines = [json.dumps(r, ensure_ascii=False) for r in batch["results"]]
+    for idx, message in parse_errors.items():
+        lines[idx] = json.dumps({"error": "JSON 파싱 오류", "details": message}, ensure_ascii=False)
+
+    # 결과도 입력 순서대로 한 줄에 하나씩 JSON Lines로 반환합니다.
+    ndjson_body = "\n".join(lines)
+    stats = batch["stats"]
+    headers = {"X-Batch-Count": str(stats["count"]), "X-Batch-Errors": str(stats["errors"]), "X-Batch-Records-Per-Second": str(stats["records_per_second"])}
+    return Response(content=ndjson_body, media_type="application/x-ndjson; charset=utf-8", headers=headers)
+
+
+# --- 평생 운세 내보내기 API: 요청 본문은 /analysis/batch와 같은 JSON Lines, 응답은 한 사람당 한 줄씩 스트리밍 ---
+# 요청 본문은 일정 크기가 넘으면 디스크로 넘어가는 임시 파일에 받아 두고, 결과는 한 줄씩 만들어 보내므로
+# 입력 크기와 관계없이 메모리 사용량이 일정합니다.
+EXPORT_SPOOL_MAX_BYTES = 4 * 1024 * 1024
+
+def _iter_export_lines(spooled_body, columnar):
+    try:
+        yield from iter_luck_trend_export(io.TextIOWrapper(spooled_body, encoding="utf-8"), columnar)
+    finally:
+        spooled_body.close()
+
+@app.post("/export/luck-trend")
+async def export_luck_trend(request: Request, columnar: bool = False):
+    spooled_body = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_MAX_BYTES)
+    async for chunk in request.stream():
+        spooled_body.write(chunk)
+    spooled_body.seek(0)
+    # 동기 제너레이터이므로 스트리밍 중의 계산은 스레드풀에서 실행됩니다.
+    return StreamingResponse(_iter_export_lines(spooled_body, columnar), media_type="application/x-ndjson; charset=utf-8")
+
+
+# --- 궁합 API: 요청 본문은 {"people": [/analysis 파라미터와 같은 필드를 가진 객체, ...]} (2명 이상) ---
+@app.post("/compatibility")
+async def compatibility(request: Request, format: str = "pretty", short_keys: bool = False):
+    if format not in RESPONSE_FORMATS:
+        return _json_response(_invalid_format_error(format), "/compatibility")
+    try:
+        payload = json.loads((await request.body()).decode("utf-8"))
+        people = payload.get("people") if isinstance(payload, dict) else None
+        result = await get_compatibility_analysis_async(people)
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        result = {"error": "JSON 파싱 오류", "details": str(e)}
+    return _json_response(result, "/compatibility", format, short_keys)
+
+
+# --- 월운/일운 달력 API: start(YYYYMMDD, 기본 오늘)가 속한 절기 달부터 months개월의 달별/날짜별 행운강도 ---
+@app.get("/luck/calendar")
+async def luck_calendar(birth: str, gender: str, cal_type: str = '양', time: str = '1230', is_leap: bool = False, is_time_unknown: bool = False, is_overseas: bool = False, city: str = "", true_solar_time: bool = False, start: str = "", months: int = 12, format: str = "pretty", short_keys: bool = False):
+    if format not in RESPONSE_FORMATS:
+        return _json_response(_invalid_format_error(format), "/luck/calendar")
+    result = await get_calendar_luck_for_api_async(
         cal_type=cal_type, date_str=birth, time_str=time, gender_input=gender,
         is_leap_input=is_leap, is_time_unknown=is_time_unknown,
-        is_overseas=is_overseas, city_name=city
+        is_overseas=is_overseas, city_name=city, true_solar_time=true_solar_time, start_date_str=start, months=months
     )
-    
-    json_string = json.dumps(result, ensure_ascii=False, indent=4)
-    status_code = 400 if "error" in result else 200
-    
-    return Response(content=json_string, status_code=status_code, media_type="application/json; charset=utf-8")
+    return _json_response(result, "/luck/calendar", format, short_keys)
+
+
+# --- 출생 도시 자동 완성: 내장 도시 지명 사전에서 이름이 q로 시작하는 도시 (해외 출생 입력의 city 값으로 씁니다) ---
+@app.get("/cities")
+def cities(q: str, limit: int = 10):
+    return {"cities": [city._asdict() for city in search_cities(q, max(1, min(limit, 50)))]}
 
 
 # --- 더 이상 필요 없는 /lifetime-luck API는 삭제되었습니다. ---
 
 
+# --- 운영 지표: 엔진 단계별/HTTP 요청 소요 시간 히스토그램, 외부 API 호출, 캐시 적중/실패 (Prometheus 텍스트 형식) ---
+@app.get("/metrics")
+def metrics():
+    return Response(content=render_prometheus(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 # --- 루트 경로는 그대로 둡니다. ---
 @app.get("/")
 def read_root():
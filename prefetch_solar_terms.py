@@ -0,0 +1,37 @@
+"""
+절기 캐시 일괄 사전 조회.
+배치 작업 전이나 배포 시점에 실행해 연도 범위의 절기 정보를 미리 채우고, 근사값(MONTH_PILLAR_BORDERS)으로
+대체될 연도(빠진 절기)가 있는지 보고합니다. 빠진 연도가 있으면 종료 코드 1로 끝납니다.
+
+    python prefetch_solar_terms.py 시작연도 끝연도 [--workers N] [--retries N] [--export 파일]
+
+SAJU_SOLAR_TERM_DB가 설정되어 있으면 결과는 호스트 공용 sqlite 캐시에도 저장되고,
+--export로 저장한 파일은 서버 시작 시 SAJU_SOLAR_TERM_PRELOAD로 불러올 수 있습니다.
+"""
+import argparse
+import sys
+
+from sajumentor import PREFETCH_SOLAR_TERM_RETRIES, PREFETCH_SOLAR_TERM_WORKERS, SOLAR_TERM_STORE, SOLAR_TERM_SOURCE, prefetch_solar_terms
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="연도 범위의 절기 정보를 미리 가져와 캐시를 채우고 빠진 연도를 보고합니다.")
+    parser.add_argument("start_year", type=int)
+    parser.add_argument("end_year", type=int)
+    parser.add_argument("--workers", type=int, default=PREFETCH_SOLAR_TERM_WORKERS, help="동시에 가져올 연도 수")
+    parser.add_argument("--retries", type=int, default=PREFETCH_SOLAR_TERM_RETRIES, help="빠진 절기가 있는 연도의 재시도 횟수")
+    parser.add_argument("--export", default="", help="채운 절기 정보를 저장할 JSON 파일 (SAJU_SOLAR_TERM_PRELOAD 형식)")
+    args = parser.parse_args(argv)
+    if args.start_year > args.end_year:
+        parser.error("시작 연도가 끝 연도보다 클 수 없습니다.")
+
+    report = prefetch_solar_terms(args.start_year, args.end_year, max_workers=args.workers, retries=args.retries)
+    print(f"절기 사전 조회 ({SOLAR_TERM_SOURCE}): {report['start_year']}~{report['end_year']}년 {report['years']}개 중 {report['covered']}개 완료, {report['elapsed_seconds']}초")
+    for gap in report["gaps"]:
+        print(f"  {gap['year']}년: 근사값 사용 - {', '.join(gap['missing_terms'])}")
+    if args.export:
+        exported_years = SOLAR_TERM_STORE.export_to_file(args.export)
+        print(f"  {exported_years}개 연도를 {args.export}에 저장했습니다.")
+    return 1 if report["gaps"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
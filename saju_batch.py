@@ -0,0 +1,365 @@
+import concurrent.futures
+import datetime
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import traceback
+
+import sajumentor
+from saju_metrics import stage_timer
+from sajumentor import (
+    CHEONGAN, JIJI, SOLAR_MONTH_ORDER_TO_JIJI_IDX,
+    calculate_four_pillars, get_precise_jeolgi_datetime_lmt, prefetch_solar_terms, prepare_engine_inputs, run_saju_engine_from_pillars, build_saju_analysis_response,
+)
+
+# ==============================================================================
+# 일괄(batch) 분석
+# 여러 명의 출생 정보를 한 번에 받아 사주팔자(연/월/일/시주)는 NumPy 배열 연산으로 한꺼번에 계산하고,
+# 나머지 분석(대운, 필요오행, 행운강도 등)은 기존 엔진(run_saju_engine_from_pillars)으로 처리합니다.
+# ==============================================================================
+
+# date.toordinal() 기준 1970-01-01의 서수 (datetime64[D] 값에 더하면 서수가 됩니다)
+EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+# 시(0~23)별 시주 지지 인덱스 (23시·0시 자시, 1~2시 축시, ...)
+# (NumPy는 일괄 계산에서만 쓰므로 모듈 로드 시점이 아니라 함수 안에서 가져옵니다.)
+HOUR_TO_JIJI_IDX = [((h + 1) // 2) % 12 for h in range(24)]
+PERIOD_TO_JIJI_IDX = SOLAR_MONTH_ORDER_TO_JIJI_IDX
+# 일괄 계산은 앞뒤 연도의 절기 경계까지 만들어야 하므로 datetime 범위의 양 끝 연도는 건별 계산(calculate_four_pillars)으로 처리합니다. (select_vectorizable_years)
+VECTORIZED_MIN_YEAR = datetime.MINYEAR + 1
+VECTORIZED_MAX_YEAR = datetime.MAXYEAR - 1
+
+# /analysis 쿼리 파라미터 이름 -> 엔진 인자 이름 및 기본값
+BATCH_RECORD_FIELDS = {
+    "birth": ("date_str", None), "gender": ("gender_input", None), "cal_type": ("cal_type", "양"),
+    "time": ("time_str", "1230"), "is_leap": ("is_leap_input", False), "is_time_unknown": ("is_time_unknown", False),
+    "is_overseas": ("is_overseas", False), "city": ("city_name", ""), "true_solar_time": ("true_solar_time", False),
+}
+
+def record_to_engine_args(record):
+    """일괄 입력 한 건(/analysis와 같은 필드 이름)을 엔진 인자 딕셔너리로 변환합니다."""
+    engine_args = {}
+    for field_name, (arg_name, default) in BATCH_RECORD_FIELDS.items():
+        value = record.get(field_name, default)
+        if value is None:
+            raise ValueError(f"'{field_name}' 값이 필요합니다.")
+        engine_args[arg_name] = value
+    return engine_args
+
+def _contiguous_year_runs(years):
+    """정렬된 연도 목록을 연속한 구간 [(시작, 끝), ...]으로 묶습니다."""
+    runs = []
+    for year in years:
+        if runs and year == runs[-1][1] + 1:
+            runs[-1][1] = year
+        else:
+            runs.append([year, year])
+    return runs
+
+def _prefetch_jeolgi_years(astro_years):
+    """(API 모드) 연도마다 차례로 API를 부르지 않도록 필요한 연도(각 천문학적 연도의 소한은 다음 해 1월)를 먼저 동시에 가져옵니다."""
+    if sajumentor.SOLAR_TERM_SOURCE == "api":
+        for start_year, end_year in _contiguous_year_runs(sorted({y + d for y in astro_years for d in (0, 1)})):
+            prefetch_solar_terms(start_year, end_year)
+
+def select_vectorizable_years(calendar_years):
+    """
+    일괄 계산(절기 경계 배열 + searchsorted)으로 처리할 수 있는 양력 연도의 집합을 반환합니다.
+    datetime 범위의 양 끝 연도와, 전년·당해 절기 경계가 시간순이 아닌 연도(천문 계산의 유효 범위를 벗어난 먼 과거 등)는 빠지며,
+    그 연도의 출생은 건별 계산(calculate_four_pillars)으로 처리합니다.
+    """
+    candidates = sorted(y for y in set(calendar_years) if VECTORIZED_MIN_YEAR <= y <= VECTORIZED_MAX_YEAR)
+    _prefetch_jeolgi_years({y + d for y in candidates for d in (-1, 0)})
+    selected = set()
+    for calendar_year in candidates:
+        times = [get_precise_jeolgi_datetime_lmt(astro_year, period_idx) for astro_year in (calendar_year - 1, calendar_year) for period_idx in range(12)]
+        if all(a < b for a, b in zip(times, times[1:])):
+            selected.add(calendar_year)
+    return selected
+
+def _build_jeolgi_boundaries(astro_years):
+    """정렬된 천문학적 연도 목록의 절기(월 경계) 배열을 만듭니다. 연도 사이가 비어 있어도 시간순으로 정렬된 채입니다."""
+    import numpy as np
+    _prefetch_jeolgi_years(astro_years)
+    boundary_times, boundary_astro_years, boundary_periods = [], [], []
+    for astro_year in astro_years:
+        for period_idx in range(12):
+            boundary_times.append(get_precise_jeolgi_datetime_lmt(astro_year, period_idx))
+            boundary_astro_years.append(astro_year)
+            boundary_periods.append(period_idx)
+    return np.array(boundary_times, dtype="datetime64[s]"), np.array(boundary_astro_years), np.array(boundary_periods)
+
+def build_jeolgi_boundary_arrays(min_calendar_year, max_calendar_year):
+    """
+    주어진 양력 연도 범위를 덮는 절기(월 경계) 시각 배열을 만듭니다.
+    (LMT 시각 배열, 각 경계의 천문학적 연도 배열, 각 경계의 절기 월 순번 배열)을 시간순으로 반환합니다.
+    """
+    return _build_jeolgi_boundaries(list(range(min_calendar_year - 1, max_calendar_year + 1)))
+
+def build_jeolgi_boundary_arrays_for_years(calendar_years):
+    """
+    build_jeolgi_boundary_arrays와 같지만, 최소~최대 연도 전체가 아니라 주어진 양력 연도들(과 각 전년)만 덮습니다.
+    1990년과 2990년처럼 멀리 떨어진 연도가 섞여도 그 사이 천 년의 절기를 계산하지 않습니다.
+    """
+    return _build_jeolgi_boundaries(sorted({y + d for y in calendar_years for d in (-1, 0)}))
+
+def calculate_pillar_indices_vectorized(datetimes_lmt, datetimes_jeolgi_lmt=None):
+    """
+    LMT 시각 목록의 사주팔자를 한 번에 계산하여 천간/지지 인덱스 배열 딕셔너리로 반환합니다.
+    get_year_pillar / get_month_pillar / get_day_pillar / get_hour_pillar와 같은 결과를 냅니다.
+    datetimes_jeolgi_lmt를 주면 calculate_four_pillars처럼 연주/월주는 그 시각으로 계산합니다.
+    """
+    import numpy as np
+    dt = np.asarray(datetimes_lmt, dtype="datetime64[s]")
+    jeolgi_dt = dt if datetimes_jeolgi_lmt is None else np.asarray(datetimes_jeolgi_lmt, dtype="datetime64[s]")
+    calendar_years = jeolgi_dt.astype("datetime64[Y]").astype(np.int64) + 1970
+
+    # 연주·월주: 시간순으로 정렬된 절기 경계 중 출생 시각 직전(같은 시각 포함)의 경계를 찾습니다.
+    boundary_times, boundary_astro_years, boundary_periods = build_jeolgi_boundary_arrays_for_years(np.unique(calendar_years).tolist())
+    boundary_pos = np.searchsorted(boundary_times, jeolgi_dt, side="right") - 1
+    astro_year = boundary_astro_years[boundary_pos]
+    month_period = boundary_periods[boundary_pos]
+    year_gan = (astro_year - 4) % 10
+    year_ji = (astro_year - 4) % 12
+    month_gan = ((year_gan % 5) * 2 + 2 + month_period) % 10 # 월두법
+    month_ji = np.asarray(PERIOD_TO_JIJI_IDX)[month_period]
+
+    # 일주: 날짜 서수의 나머지 연산
+    day_start = dt.astype("datetime64[D]")
+    ordinal = day_start.astype(np.int64) + EPOCH_ORDINAL
+    day_gan = (ordinal + 4) % 10
+    day_ji = (ordinal + 2) % 12
+
+    # 시주: 시(hour) 조회표 + 시두법 (23시는 다음 날 일간 기준)
+    hours = ((dt - day_start).astype(np.int64) // 3600)
+    hour_ji = np.asarray(HOUR_TO_JIJI_IDX)[hours]
+    effective_day_gan = np.where(hours == 23, (day_gan + 1) % 10, day_gan)
+    hour_gan = ((effective_day_gan % 5) * 2 + hour_ji) % 10
+
+    return {
+        "year_gan": year_gan, "year_ji": year_ji, "month_gan": month_gan, "month_ji": month_ji,
+        "day_gan": day_gan, "day_ji": day_ji, "hour_gan": hour_gan, "hour_ji": hour_ji,
+        "astro_year": astro_year, "month_period": month_period,
+    }
+
+def pillar_indices_to_saju_dict(pillar_indices, i):
+    """calculate_pillar_indices_vectorized 결과의 i번째 항목을 사주팔자 딕셔너리로 변환합니다."""
+    return {
+        "연간": CHEONGAN[pillar_indices["year_gan"][i]], "연지": JIJI[pillar_indices["year_ji"][i]],
+        "월간": CHEONGAN[pillar_indices["month_gan"][i]], "월지": JIJI[pillar_indices["month_ji"][i]],
+        "일간": CHEONGAN[pillar_indices["day_gan"][i]], "일지": JIJI[pillar_indices["day_ji"][i]],
+        "시간": CHEONGAN[pillar_indices["hour_gan"][i]], "시지": JIJI[pillar_indices["hour_ji"][i]],
+    }
+
+def _engine_error(e):
+    return {"error": "엔진 실행 중 에러", "details": str(e), "traceback": traceback.format_exc()}
+
+def get_saju_analysis_batch(records):
+    """
+    여러 건의 출생 정보를 일괄 분석합니다. 각 결과는 get_saju_analysis_for_api와 같은 구조입니다.
+    {"results": [...입력 순서대로...], "stats": {건수, 오류 건수, 소요 시간, 초당 처리 건수}}를 반환합니다.
+    """
+    started = time.perf_counter()
+    records = list(records)
+    results = [None] * len(records)
+
+    # 1. 입력값 검증 및 LMT 변환 (건별)
+    prepared = []
+    for i, record in enumerate(records):
+        try:
+            with stage_timer("input_preparation"):
+                prepared.append((i, prepare_engine_inputs(**record_to_engine_args(record))))
+        except Exception as e:
+            results[i] = _engine_error(e)
+
+    # 2. 사주팔자 일괄 계산 후 나머지 분석 (건별)
+    #    일괄 계산할 수 없는 연도의 건은 배치 전체를 실패시키지 않도록 건별로 계산하며, 단건 경로와 같은 결과(또는 오류)를 냅니다.
+    vectorizable_years = select_vectorizable_years(engine_inputs["datetime_jeolgi_lmt"].year for _, engine_inputs in prepared)
+    vectorized = [(i, engine_inputs) for i, engine_inputs in prepared if engine_inputs["datetime_jeolgi_lmt"].year in vectorizable_years]
+    pillar_indices = None
+    if vectorized:
+        with stage_timer("four_pillars_vectorized"):
+            pillar_indices = calculate_pillar_indices_vectorized(
+                [engine_inputs["datetime_lmt"] for _, engine_inputs in vectorized], [engine_inputs["datetime_jeolgi_lmt"] for _, engine_inputs in vectorized]
+            )
+    vectorized_pos = {i: k for k, (i, _) in enumerate(vectorized)}
+    for i, engine_inputs in prepared:
+        try:
+            k = vectorized_pos.get(i)
+            if k is None:
+                with stage_timer("four_pillars"):
+                    saju_8_chars, astro_year, month_period_idx = calculate_four_pillars(engine_inputs["datetime_lmt"], engine_inputs["datetime_jeolgi_lmt"])
+            else:
+                saju_8_chars = pillar_indices_to_saju_dict(pillar_indices, k)
+                astro_year, month_period_idx = int(pillar_indices["astro_year"][k]), int(pillar_indices["month_period"][k])
+            engine_results = run_saju_engine_from_pillars(engine_inputs, saju_8_chars, astro_year, month_period_idx)
+        except Exception as e:
+            engine_results = _engine_error(e)
+        with stage_timer("response_build"):
+            results[i] = build_saju_analysis_response(engine_results)
+
+    elapsed = time.perf_counter() - started
+    return {
+        "results": results,
+        "stats": {
+            "count": len(records),
+            "errors": sum(1 for r in results if "error" in r),
+            "elapsed_seconds": round(elapsed, 4),
+            "records_per_second": round(len(records) / elapsed, 1) if elapsed > 0 else None,
+        },
+    }
+
+# ==============================================================================
+# 프로세스 풀 일괄 분석
+# 사주팔자 이후의 분석(필요오행 점수, 합충 판정, 100년치 행운강도)은 순수 파이썬 계산이라 GIL 때문에 스레드로는
+# 코어 하나만 씁니다. 입력을 덩어리(chunk)로 나눠 여러 프로세스에서 get_saju_analysis_batch를 돌리고,
+# 결과는 건별 딕셔너리 대신 JSON 문자열 목록으로 돌려받아 프로세스 간 전송(pickle) 비용을 줄입니다.
+# 작업 프로세스는 시작할 때 부모의 절기 캐시 사본과 조회용 테이블(warm_up)을 미리 채워 두므로
+# 절기를 다시 계산하거나 외부 API를 부르지 않습니다.
+# ==============================================================================
+
+# 작업 프로세스 수 (0이면 CPU 코어 수)
+BATCH_PROCESS_WORKERS = int(os.environ.get("SAJU_BATCH_WORKERS", "0")) or os.cpu_count() or 1
+# 작업 하나에 담을 건수
+BATCH_CHUNK_SIZE = int(os.environ.get("SAJU_BATCH_CHUNK_SIZE", "256"))
+# "process"이면 /analysis/batch가 BATCH_PROCESS_MIN_RECORDS건 이상인 요청을 프로세스 풀로 처리합니다. (기본: 현재 프로세스)
+BATCH_BACKEND = os.environ.get("SAJU_BATCH_BACKEND", "thread")
+BATCH_PROCESS_MIN_RECORDS = int(os.environ.get("SAJU_BATCH_PROCESS_MIN_RECORDS", "512"))
+
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+def _init_batch_worker(solar_terms_snapshot, solar_term_source):
+    """작업 프로세스 초기화: 부모와 같은 절기 출처와 절기 캐시, 조회용 테이블을 준비합니다."""
+    sajumentor.SOLAR_TERM_SOURCE = solar_term_source
+    sajumentor.SOLAR_TERM_STORE.source = solar_term_source
+    sajumentor.SOLAR_TERM_STORE.restore(solar_terms_snapshot)
+    sajumentor.warm_up(solar_term_years=())
+
+def _worker_ready(_):
+    return os.getpid()
+
+def _analyze_chunk(records):
+    """작업 프로세스에서 한 덩어리를 분석해 (건별 JSON 문자열 목록, 오류 건수)를 반환합니다."""
+    batch = get_saju_analysis_batch(records)
+    return [json.dumps(r, ensure_ascii=False) for r in batch["results"]], batch["stats"]["errors"]
+
+def create_batch_process_pool(max_workers=BATCH_PROCESS_WORKERS, prestart=True):
+    """
+    미리 데워진 작업 프로세스 풀을 만듭니다. 현재 프로세스의 절기 캐시가 비어 있으면 먼저 warm_up으로 채워 사본을 넘깁니다.
+    서버 안의 스레드와 섞이지 않도록 fork 대신 spawn으로 프로세스를 띄우며, prestart이면 모든 작업 프로세스가 초기화를 마칠 때까지 기다립니다.
+    """
+    if not len(sajumentor.SOLAR_TERM_STORE):
+        sajumentor.warm_up()
+    executor = concurrent.futures.ProcessPoolExecutor(
+        max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_batch_worker, initargs=(sajumentor.SOLAR_TERM_STORE.snapshot(), sajumentor.SOLAR_TERM_SOURCE),
+    )
+    if prestart:
+        list(executor.map(_worker_ready, range(max_workers)))
+    return executor
+
+def get_batch_process_pool():
+    """서버에서 함께 쓰는 프로세스 풀 (처음 호출될 때 만듭니다)"""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            _process_pool = create_batch_process_pool()
+        return _process_pool
+
+def shutdown_batch_process_pool():
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=True, cancel_futures=True)
+            _process_pool = None
+
+def iter_analysis_chunks_parallel(records, executor, max_workers=BATCH_PROCESS_WORKERS, chunk_size=BATCH_CHUNK_SIZE):
+    """
+    records(이터러블)를 chunk_size건씩 나눠 executor에서 분석하고 (건별 JSON 문자열 목록, 오류 건수)를 입력 순서대로 만들어 냅니다.
+    진행 중인 덩어리는 작업 프로세스 수의 두 배까지만 두므로, 입력이 아주 커도 메모리 사용량이 일정합니다.
+    """
+    records = iter(records)
+    pending = []
+    while True:
+        while len(pending) < 2 * max_workers:
+            chunk = list(itertools.islice(records, chunk_size))
+            if not chunk:
+                break
+            pending.append(executor.submit(_analyze_chunk, chunk))
+        if not pending:
+            return
+        yield pending.pop(0).result()
+
+def get_saju_analysis_batch_parallel(records, chunk_size=BATCH_CHUNK_SIZE):
+    """
+    get_saju_analysis_batch와 같은 분석을 서버 공용 프로세스 풀에서 수행합니다.
+    결과는 건별 JSON 문자열(json.dumps(결과, ensure_ascii=False))로 {"lines": [...입력 순서대로...], "stats": {...}}를 반환합니다.
+    """
+    started = time.perf_counter()
+    records = list(records)
+    lines, errors = [], 0
+    for chunk_lines, chunk_errors in iter_analysis_chunks_parallel(records, get_batch_process_pool(), chunk_size=chunk_size):
+        lines.extend(chunk_lines)
+        errors += chunk_errors
+    elapsed = time.perf_counter() - started
+    return {
+        "lines": lines,
+        "stats": {
+            "count": len(records),
+            "errors": errors,
+            "elapsed_seconds": round(elapsed, 4),
+            "records_per_second": round(len(records) / elapsed, 1) if elapsed > 0 else None,
+        },
+    }
+
+def main(argv=None):
+    """
+    전체 사용자 재분석용 명령행 도구:
+        python saju_batch.py 입력.ndjson [-o 출력.ndjson] [--workers N] [--chunk-size N]
+    입력은 /analysis/batch와 같은 JSON Lines이고, 결과도 입력 순서대로 한 줄에 하나씩 씁니다. 처리 통계는 표준 오류로 출력합니다.
+    """
+    import argparse
+    from saju_export import iter_birth_records
+    parser = argparse.ArgumentParser(description="출생 정보 JSON Lines를 여러 프로세스에서 일괄 분석합니다.")
+    parser.add_argument("input", nargs="?", default="-", help="입력 JSON Lines 파일 (기본값: 표준 입력)")
+    parser.add_argument("-o", "--output", default="-", help="출력 JSON Lines 파일 (기본값: 표준 출력)")
+    parser.add_argument("--workers", type=int, default=BATCH_PROCESS_WORKERS, help="작업 프로세스 수 (기본: CPU 코어 수)")
+    parser.add_argument("--chunk-size", type=int, default=BATCH_CHUNK_SIZE, help="작업 하나에 담을 건수")
+    args = parser.parse_args(argv)
+
+    input_file = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    output_file = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    parse_errors = {}
+
+    def iter_records():
+        for i, (_, record) in enumerate(iter_birth_records(input_file)):
+            if isinstance(record, str):
+                parse_errors[i] = record
+                record = {}
+            yield record
+
+    started = time.perf_counter()
+    count, errors = 0, 0
+    executor = create_batch_process_pool(args.workers)
+    try:
+        for chunk_lines, chunk_errors in iter_analysis_chunks_parallel(iter_records(), executor, args.workers, args.chunk_size):
+            for line in chunk_lines:
+                if count in parse_errors:
+                    line = json.dumps({"error": "JSON 파싱 오류", "details": parse_errors.pop(count)}, ensure_ascii=False)
+                output_file.write(line + "\n")
+                count += 1
+            errors += chunk_errors
+    finally:
+        executor.shutdown(cancel_futures=True)
+        if input_file is not sys.stdin: input_file.close()
+        if output_file is not sys.stdout: output_file.close()
+    elapsed = time.perf_counter() - started
+    print(f"{count}건 분석 (오류 {errors}건), 작업 프로세스 {args.workers}개, {elapsed:.1f}초, 초당 {count / max(elapsed, 1e-9):.1f}건", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,191 @@
+import asyncio
+import datetime
+import functools
+import os
+import traceback
+
+from sajumentor import (
+    CHEONGAN, JIJI, ELEMENTS, PERIOD_IDX_TO_SOLAR_TERM_NAME, LUCK_CHAR_SCORE_TABLES, YEONWOON_SCORE_TABLES,
+    SajuChart, analyze_static_pillars, get_month_pillar, get_theoretical_extremes, get_year_pillar, get_yearly_daewoon_list,
+    hap_adjust_triggers_chart, keyword_branch_code, luck_char_score_chart, pillars_to_key, run_saju_engine,
+)
+from saju_batch import EPOCH_ORDINAL, build_jeolgi_boundary_arrays
+
+# ==============================================================================
+# 월운(月運) / 일운(日運) 달력
+# 연도별 행운강도(calculate_yearly_luck_chart)와 같은 점수 모형에 월운·일운 글자를 층으로 더해,
+# 시작 날짜가 속한 절기 달부터 몇 달 동안의 달별·날짜별 행운강도를 만듭니다.
+# - 달의 경계는 절기 저장소의 절입 시각(LMT), 일운은 날짜 서수의 나머지 연산으로 구합니다.
+# - 기간 전체를 NumPy 배열 연산 한 번으로 계산하고, (사주팔자, 대운, 시작 달, 달 수) 단위로 캐시합니다.
+# ==============================================================================
+
+CALENDAR_LUCK_MONTHS = 12
+CALENDAR_LUCK_MAX_MONTHS = 24
+CALENDAR_LUCK_CACHE_SIZE = int(os.environ.get("SAJU_CALENDAR_LUCK_CACHE_SIZE", "4096"))
+
+# 월운/일운 글자 위치별 가중치. 월운·일운은 그 기간의 세운이므로 연운(LUCK_WEIGHTS_FACTOR)과 같은 가중치를 씁니다.
+PERIOD_LUCK_WEIGHTS_FACTOR = {"월운_천간": 5.0, "월운_지지": 10.0, "일운_천간": 5.0, "일운_지지": 10.0}
+
+# 월운·일운 간지의 60갑자 순번 = (기준 서수 + 14) % 60  (천간 (x+4)%10, 지지 (x+2)%12를 함께 만족하는 값)
+# 월운은 '연도 x 12 + 절기 월 순번'이 하나씩 늘 때마다 한 칸씩 나아갑니다. (1984년 인월 = 병인)
+GAPJA_OFFSET = 14
+
+def _period_score_table(pos_key_prefix, pne1, pne2):
+    """월운 또는 일운 간지(60갑자 순서)의 점수 = 천간 점수 + 지지 점수"""
+    gan_weight = PERIOD_LUCK_WEIGHTS_FACTOR[f"{pos_key_prefix}_천간"]
+    ji_weight = PERIOD_LUCK_WEIGHTS_FACTOR[f"{pos_key_prefix}_지지"]
+    return [luck_char_score_chart(g % 10, False, gan_weight, pne1, pne2) + luck_char_score_chart(g % 12, True, ji_weight, pne1, pne2) for g in range(60)]
+
+# (1순위, 2순위) 필요오행 코드 쌍 -> 60갑자 순서의 월운/일운 점수 (YEONWOON_SCORE_TABLES와 같은 키)
+WOLUN_SCORE_TABLES = {key: _period_score_table("월운", *key) for key in YEONWOON_SCORE_TABLES}
+ILUN_SCORE_TABLES = {key: _period_score_table("일운", *key) for key in YEONWOON_SCORE_TABLES}
+
+def find_month_period(day):
+    """그 날짜가 속한 절기 달의 (천문학적 연도, 절기 월 순번). 절입일은 새 달에 넣습니다."""
+    end_of_day = datetime.datetime(day.year, day.month, day.day, 23, 59, 59)
+    _, _, year_cheongan_idx, astro_year = get_year_pillar(end_of_day)
+    _, _, _, month_period_idx = get_month_pillar(end_of_day, year_cheongan_idx, astro_year)
+    return astro_year, month_period_idx
+
+def _gapja_name(gapja_idx):
+    return f"{CHEONGAN[gapja_idx % 10]}{JIJI[gapja_idx % 12]}"
+
+def _luck_strength(np, total, adjusted, max_effect, min_effect, auto_luck_amount):
+    """calculate_yearly_luck_chart와 같은 정규화: 이론적 최대/최소로 나누고 행운량을 곱한 뒤, 합으로 조정된 기간은 1/10"""
+    effective = np.zeros_like(total)
+    if max_effect != 0:
+        effective = np.where(total > 0, total / max_effect, effective)
+    if min_effect != 0:
+        effective = np.where(total < 0, total / abs(min_effect), effective)
+    strength = (effective * auto_luck_amount) / 10.0
+    return np.where(adjusted, strength / 10.0, strength)
+
+@functools.lru_cache(maxsize=CALENDAR_LUCK_CACHE_SIZE)
+def calculate_calendar_luck_cached(pillar_key, daewoon_direction_str, daewoon_su_val, birth_year_solar, start_astro_year, start_period_idx, months):
+    """
+    (start_astro_year, start_period_idx) 절기 달부터 months개월의 월운/일운 행운강도를 계산합니다.
+    {"monthly": [...], "daily": [...]}를 반환하며, 캐시에 보관되므로 수정하지 말고 읽기만 해야 합니다.
+    """
+    import numpy as np
+    static_results = analyze_static_pillars(pillar_key)
+    sorted_element_codes = static_results["sorted_element_codes"]
+    primary, secondary, tertiary = (list(sorted_element_codes) + [None, None, None])[:3]
+    if primary is None:
+        return {"monthly": [], "daily": []}
+
+    # 1. 절기 달 경계 (절기 저장소) 와 달별 연운/월운/대운
+    end_astro_year = start_astro_year + (start_period_idx + months) // 12
+    boundary_times, boundary_astro_years, boundary_periods = build_jeolgi_boundary_arrays(start_astro_year, end_astro_year + 1)
+    first = 12 + start_period_idx # build_jeolgi_boundary_arrays는 start_astro_year - 1년부터 시작합니다.
+    window = slice(first, first + months + 1)
+    boundary_dates = boundary_times[window].astype("datetime64[D]")
+    astro_years, periods = boundary_astro_years[window][:-1], boundary_periods[window][:-1]
+    year_gapja = (astro_years - 4) % 60
+    month_gapja = (astro_years * 12 + periods + GAPJA_OFFSET) % 60
+
+    daewoon_list_val = get_yearly_daewoon_list(birth_year_solar, pillar_key[2], pillar_key[3], daewoon_su_val, (daewoon_direction_str == "순행"))
+    daewoon_gan = np.array([CHEONGAN.index(d["gan"]) for d in daewoon_list_val])
+    daewoon_ji = np.array([JIJI.index(d["ji"]) for d in daewoon_list_val])
+    daewoon_pos = (astro_years - daewoon_list_val[0]["start"]) // 10
+    has_daewoon = (daewoon_pos >= 0) & (daewoon_pos < len(daewoon_list_val)) # 첫 대운 전(또는 100년 뒤)에는 대운 점수 없이
+    daewoon_pos = np.clip(daewoon_pos, 0, len(daewoon_list_val) - 1)
+
+    # 2. 대운/세운/월운/일운 지지가 원국과 합을 완성하면 필요오행을 한 순위씩 당깁니다. (calculate_yearly_luck_chart와 같은 규칙)
+    chart = SajuChart.from_key(pillar_key)
+    trigger_mask = np.zeros(12, dtype=bool)
+    trigger_mask[list(hap_adjust_triggers_chart(chart, keyword_branch_code(static_results["keyword_char"])))] = True
+    normal_key, adjusted_key = (primary, secondary), (secondary, tertiary)
+
+    def layer_scores(key):
+        tables = LUCK_CHAR_SCORE_TABLES[key]
+        daewoon = np.where(has_daewoon, np.asarray(tables[0])[daewoon_gan[daewoon_pos]] + np.asarray(tables[1])[daewoon_ji[daewoon_pos]], 0.0)
+        return daewoon + np.asarray(YEONWOON_SCORE_TABLES[key])[year_gapja] + np.asarray(WOLUN_SCORE_TABLES[key])[month_gapja], np.asarray(ILUN_SCORE_TABLES[key])
+
+    month_normal, ilun_normal = layer_scores(normal_key)
+    month_adjusted, ilun_adjusted = layer_scores(adjusted_key)
+    month_triggered = (has_daewoon & trigger_mask[daewoon_ji[daewoon_pos]]) | trigger_mask[year_gapja % 12] | trigger_mask[month_gapja % 12]
+
+    max_effect, min_effect = get_theoretical_extremes(ELEMENTS[primary], ELEMENTS[secondary] if secondary is not None else None)
+    wolun_table, ilun_table = WOLUN_SCORE_TABLES[normal_key], ILUN_SCORE_TABLES[normal_key]
+    month_max, month_min = max_effect + max(wolun_table), min_effect + min(wolun_table)
+    day_max, day_min = month_max + max(ilun_table), month_min + min(ilun_table)
+    auto_luck_amount = static_results["auto_luck_amount"]
+    monthly_strength = _luck_strength(np, np.where(month_triggered, month_adjusted, month_normal), month_triggered, month_max, month_min, auto_luck_amount)
+
+    # 3. 날짜별: 각 날짜가 속한 달(절입일은 새 달)의 점수에 일운(날짜 서수) 점수를 더합니다.
+    days = np.arange(boundary_dates[0], boundary_dates[-1])
+    month_of_day = np.searchsorted(boundary_dates, days, side="right") - 1
+    day_gapja = (days.astype(np.int64) + EPOCH_ORDINAL + GAPJA_OFFSET) % 60
+    day_triggered = month_triggered[month_of_day] | trigger_mask[day_gapja % 12]
+    day_total = np.where(day_triggered, month_adjusted[month_of_day] + ilun_adjusted[day_gapja], month_normal[month_of_day] + ilun_normal[day_gapja])
+    daily_strength = _luck_strength(np, day_total, day_triggered, day_max, day_min, auto_luck_amount)
+
+    # 4. 응답 항목 (한글 간지는 여기서만 만듭니다)
+    date_strings = np.datetime_as_string(boundary_dates).tolist()
+    monthly = []
+    for i, (period_idx, y_gapja, m_gapja, d_pos, d_valid, strength) in enumerate(zip(
+        periods.tolist(), year_gapja.tolist(), month_gapja.tolist(), daewoon_pos.tolist(), has_daewoon.tolist(), monthly_strength.tolist()
+    )):
+        daewoon = daewoon_list_val[d_pos]
+        monthly.append({
+            "solar_term": PERIOD_IDX_TO_SOLAR_TERM_NAME[period_idx],
+            "start": date_strings[i],
+            "end": str(boundary_dates[i + 1] - 1),
+            "daewoon": f"{daewoon['gan']}{daewoon['ji']}" if d_valid else "",
+            "yeonun": _gapja_name(y_gapja),
+            "wolun": _gapja_name(m_gapja),
+            "luck_value": round(strength, 3),
+        })
+    daily = [
+        {"date": date_string, "ilun": _gapja_name(d_gapja), "luck_value": round(strength, 3)}
+        for date_string, d_gapja, strength in zip(np.datetime_as_string(days).tolist(), day_gapja.tolist(), daily_strength.tolist())
+    ]
+    return {"monthly": monthly, "daily": daily}
+
+def _parse_start_date(start_date_str):
+    if not start_date_str:
+        return datetime.date.today()
+    if not (len(start_date_str) == 8 and start_date_str.isdigit()):
+        raise ValueError("시작 날짜는 YYYYMMDD 형식이어야 합니다.")
+    return datetime.date(int(start_date_str[0:4]), int(start_date_str[4:6]), int(start_date_str[6:8]))
+
+def get_calendar_luck_for_api(cal_type, date_str, time_str, gender_input, is_leap_input, is_time_unknown, is_overseas, city_name="", true_solar_time=False, start_date_str="", months=CALENDAR_LUCK_MONTHS):
+    """
+    시작 날짜(start_date_str, 기본: 오늘)가 속한 절기 달부터 months개월의 월운/일운 행운강도를 반환합니다.
+    {"pillars": ..., "window": ..., "monthly_luck": [...], "daily_luck": [...]} 형식이며, 실패하면 {"error": ..., "details": ...}
+    """
+    try:
+        start_date = _parse_start_date(start_date_str)
+        if not 1 <= months <= CALENDAR_LUCK_MAX_MONTHS:
+            raise ValueError(f"months는 1~{CALENDAR_LUCK_MAX_MONTHS} 사이여야 합니다. (입력: {months})")
+    except ValueError as e:
+        return {"error": "입력값 오류", "details": str(e)}
+
+    engine_results = run_saju_engine(cal_type, date_str, time_str, gender_input, is_leap_input, is_time_unknown, is_overseas, city_name, true_solar_time)
+    if "error" in engine_results:
+        return engine_results
+    try:
+        saju_basics = engine_results["saju_basics"]
+        pillars = saju_basics["pillars"]
+        start_astro_year, start_period_idx = find_month_period(start_date)
+        series = calculate_calendar_luck_cached(
+            pillars_to_key(pillars), saju_basics["daewoon_direction"], saju_basics["daewoon_su"], engine_results["calc_target_solar_year"],
+            start_astro_year, start_period_idx, months
+        )
+        monthly = series["monthly"]
+        return {
+            "pillars": {"summary": f"{pillars['연간']}{pillars['연지']}년 {pillars['월간']}{pillars['월지']}월 {pillars['일간']}{pillars['일지']}일 {pillars['시간']}{pillars['시지']}시"},
+            "window": {"start": monthly[0]["start"] if monthly else None, "end": monthly[-1]["end"] if monthly else None, "months": months},
+            "monthly_luck": monthly,
+            "daily_luck": series["daily"],
+        }
+    except Exception as e:
+        return {"error": "API 처리 중 에러", "details": str(e), "traceback": traceback.format_exc()}
+
+async def get_calendar_luck_for_api_async(cal_type, date_str, time_str, gender_input, is_leap_input, is_time_unknown, is_overseas, city_name="", true_solar_time=False, start_date_str="", months=CALENDAR_LUCK_MONTHS):
+    """get_calendar_luck_for_api의 비동기 버전입니다. 외부 데이터(음력 변환, 절기)를 미리 가져온 뒤 계산은 스레드에서 실행합니다."""
+    from sajumentor_async import prefetch_engine_inputs_async
+    await prefetch_engine_inputs_async(cal_type, date_str, is_leap_input)
+    return await asyncio.to_thread(
+        get_calendar_luck_for_api, cal_type, date_str, time_str, gender_input, is_leap_input, is_time_unknown, is_overseas, city_name, true_solar_time, start_date_str, months
+    )
@@ -0,0 +1,154 @@
+import asyncio
+import os
+import traceback
+
+from sajumentor import (
+    CHEONGAN, JIJI, CHEONGAN_HAP_MATRIX, JIJI_YUKHAP_MATRIX, JIJI_CHUNG_MATRIX, JIJI_BANHAP_MATRIX,
+    SajuChart, pillars_to_key, run_saju_engine,
+)
+from saju_batch import record_to_engine_args
+
+# ==============================================================================
+# 궁합(여러 사람 비교) 분석
+# 사람마다 사주는 한 번만 계산하고(같은 입력은 한 번으로 합침), 두 사람씩 같은 기둥끼리
+# 천간합 / 지지 육합·충·반합을 확인한 뒤, 100년치 행운강도 곡선을 달력 연도로 맞춰
+# 모두에게 좋은 해 / 모두에게 나쁜 해를 찾습니다.
+# ==============================================================================
+
+COMPATIBILITY_MIN_PEOPLE = 2
+COMPATIBILITY_MAX_PEOPLE = int(os.environ.get("SAJU_COMPATIBILITY_MAX_PEOPLE", "10"))
+
+# 두 사람을 비교할 기둥: (기둥 이름, 천간 위치 코드, 지지 위치 코드) - SajuChart.stems / branches 순서
+COMPATIBILITY_PILLARS = [("연주", 0, 0), ("월주", 1, 1), ("일주", 2, 2), ("시주", 3, 3)]
+HOUR_PILLAR_IDX = 3
+
+def find_cross_chart_interactions(chart_a, chart_b, include_hour=True):
+    """
+    두 사람의 사주(SajuChart)에서 같은 기둥끼리의 천간합과 지지 육합·충·반합을 찾습니다.
+    출생 시간을 모르는 사람이 있으면 include_hour=False로 시주는 비교하지 않습니다.
+    """
+    interactions = []
+    stems_a, stems_b = chart_a.stems, chart_b.stems
+    branches_a, branches_b = chart_a.branches, chart_b.branches
+    for pillar_name, stem_idx, branch_idx in COMPATIBILITY_PILLARS:
+        if not include_hour and stem_idx == HOUR_PILLAR_IDX:
+            continue
+        s1, s2 = stems_a[stem_idx], stems_b[stem_idx]
+        if CHEONGAN_HAP_MATRIX[s1][s2]:
+            interactions.append({"type": "천간합", "name": CHEONGAN_HAP_MATRIX[s1][s2], "pillar": pillar_name, "chars": [CHEONGAN[s1], CHEONGAN[s2]]})
+
+        j1, j2 = branches_a[branch_idx], branches_b[branch_idx]
+        if j1 == j2:
+            continue
+        # 충(沖), 육합(六合), 반합(半合) 순으로 확인합니다. (find_all_jiji_interactions와 같은 순서)
+        if JIJI_CHUNG_MATRIX[j1][j2]:
+            interactions.append({"type": "충", "name": JIJI_CHUNG_MATRIX[j1][j2], "pillar": pillar_name, "chars": [JIJI[j1], JIJI[j2]]})
+        if JIJI_YUKHAP_MATRIX[j1][j2]:
+            interactions.append({"type": "육합", "name": JIJI_YUKHAP_MATRIX[j1][j2], "pillar": pillar_name, "chars": [JIJI[j1], JIJI[j2]]})
+        if JIJI_BANHAP_MATRIX[j1][j2]:
+            interactions.append({"type": "반합", "name": f"{JIJI[j1]}{JIJI[j2]} {JIJI_BANHAP_MATRIX[j1][j2]}", "pillar": pillar_name, "chars": [JIJI[j1], JIJI[j2]]})
+    return interactions
+
+def align_luck_curves(luck_curves):
+    """
+    여러 사람의 yearly_luck_raw_data를 달력 연도 기준으로 맞춥니다.
+    모두의 곡선에 있는 연도만 남기며, 연도마다 각자의 나이·행운강도와 평균(joint_luck)을 담아 연도순으로 반환합니다.
+    """
+    rows_by_year = [{row["연도"]: row for row in curve} for curve in luck_curves]
+    if not rows_by_year:
+        return []
+    common_years = sorted(set(rows_by_year[0]).intersection(*rows_by_year[1:]))
+    aligned = []
+    for year in common_years:
+        rows = [by_year[year] for by_year in rows_by_year]
+        luck_values = [row["행운강도"] for row in rows]
+        aligned.append({
+            "year": year,
+            "ages": [row["나이"] for row in rows],
+            "luck_values": luck_values,
+            "joint_luck": round(sum(luck_values) / len(luck_values), 3),
+        })
+    return aligned
+
+def _person_summary(engine_results):
+    saju_basics = engine_results["saju_basics"]
+    pillars = saju_basics["pillars"]
+    return {
+        "pillars": {"summary": f"{pillars['연간']}{pillars['연지']}년 {pillars['월간']}{pillars['월지']}월 {pillars['일간']}{pillars['일지']}일 {pillars['시간']}{pillars['시지']}시"},
+        "daewoon": {"direction": saju_basics["daewoon_direction"], "start_age_korean": saju_basics["daewoon_su"], "start_year_ad": saju_basics["start_year_ad"]},
+        "core": engine_results["core_analysis_results"],
+        "is_time_unknown": engine_results["raw_inputs"].get("is_time_unknown", False),
+    }
+
+def _validate_people(records):
+    if not isinstance(records, list) or not all(isinstance(r, dict) for r in records):
+        raise ValueError("'people'는 출생 정보 객체의 목록이어야 합니다.")
+    if not COMPATIBILITY_MIN_PEOPLE <= len(records) <= COMPATIBILITY_MAX_PEOPLE:
+        raise ValueError(f"궁합 분석은 {COMPATIBILITY_MIN_PEOPLE}~{COMPATIBILITY_MAX_PEOPLE}명까지 가능합니다. (입력: {len(records)}명)")
+    return [record_to_engine_args(record) for record in records]
+
+def get_compatibility_analysis(records):
+    """
+    여러 사람(/analysis와 같은 필드 이름의 딕셔너리 목록)의 궁합을 분석합니다.
+    {"people": [...], "pairs": [...], "aligned_luck": [...], "joint_good_years": [...], "joint_bad_years": [...]}를 반환하며,
+    입력이 잘못되었거나 한 사람이라도 분석에 실패하면 {"error": ..., "details": ...}를 반환합니다.
+    """
+    try:
+        engine_args_list = _validate_people(records)
+    except Exception as e:
+        return {"error": "입력값 오류", "details": str(e)}
+
+    try:
+        # 1. 사람별 엔진 실행 (같은 입력은 한 번만 계산)
+        engine_results_by_args = {}
+        people_results = []
+        for i, engine_args in enumerate(engine_args_list):
+            args_key = tuple(sorted(engine_args.items()))
+            if args_key not in engine_results_by_args:
+                engine_results_by_args[args_key] = run_saju_engine(**engine_args)
+            engine_results = engine_results_by_args[args_key]
+            if "error" in engine_results:
+                return {**engine_results, "details": f"{i + 1}번째 사람: {engine_results.get('details', '')}"}
+            people_results.append(engine_results)
+
+        charts = [SajuChart.from_key(pillars_to_key(r["saju_basics"]["pillars"])) for r in people_results]
+        time_unknown = [r["raw_inputs"].get("is_time_unknown", False) for r in people_results]
+
+        # 2. 두 사람씩 같은 기둥끼리의 합/충
+        pairs = []
+        for i in range(len(charts)):
+            for j in range(i + 1, len(charts)):
+                interactions = find_cross_chart_interactions(charts[i], charts[j], include_hour=not (time_unknown[i] or time_unknown[j]))
+                pairs.append({
+                    "people": [i, j],
+                    "interactions": interactions,
+                    "hap_count": sum(1 for item in interactions if item["type"] != "충"),
+                    "chung_count": sum(1 for item in interactions if item["type"] == "충"),
+                })
+
+        # 3. 행운강도 곡선을 달력 연도로 맞추고 모두에게 좋은 해 / 나쁜 해를 찾습니다.
+        aligned_luck = align_luck_curves([r["yearly_luck_raw_data"] for r in people_results])
+        return {
+            "people": [_person_summary(r) for r in people_results],
+            "pairs": pairs,
+            "aligned_luck": aligned_luck,
+            "joint_good_years": [entry for entry in aligned_luck if min(entry["luck_values"]) > 0],
+            "joint_bad_years": [entry for entry in aligned_luck if max(entry["luck_values"]) < 0],
+        }
+    except Exception as e:
+        return {"error": "API 처리 중 에러", "details": str(e), "traceback": traceback.format_exc()}
+
+async def get_compatibility_analysis_async(records):
+    """
+    get_compatibility_analysis의 비동기 버전입니다. (/compatibility 엔드포인트용)
+    사람마다 필요한 외부 데이터(음력 변환, 절기)를 동시에 미리 가져온 뒤, 계산은 스레드에서 실행합니다.
+    """
+    from sajumentor_async import prefetch_engine_inputs_async
+    try:
+        engine_args_list = _validate_people(records)
+    except Exception as e:
+        return {"error": "입력값 오류", "details": str(e)}
+    await asyncio.gather(*(
+        prefetch_engine_inputs_async(args["cal_type"], args["date_str"], args["is_leap_input"]) for args in engine_args_list
+    ))
+    return await asyncio.to_thread(get_compatibility_analysis, records)
@@ -0,0 +1,91 @@
+"""
+평생 운세(lifetime_luck_trend) 일괄 내보내기.
+출생 정보가 한 줄에 하나씩 담긴 JSON Lines를 읽어, 사람마다 한 줄의 압축된 JSON을 차례로 만들어 냅니다.
+입력과 출력 모두 제너레이터로 한 줄씩 흘려보내므로, 입력 크기와 관계없이 메모리 사용량이 일정합니다.
+
+    python saju_export.py 입력.ndjson [-o 출력.ndjson] [--columnar]
+
+입력/출력 파일 이름에 "-"를 주면(기본값) 표준 입력/표준 출력을 사용합니다.
+"""
+import argparse
+import json
+import sys
+
+from sajumentor import iter_lifetime_luck_trend, run_saju_engine
+from saju_batch import record_to_engine_args
+
+# 열(column) 형식 출력의 열 이름 (lifetime_luck_trend 항목의 키와 같습니다)
+LUCK_TREND_COLUMNS = ["year", "age", "daewoon", "yeonun", "luck_value", "luck_momentum"]
+
+def iter_birth_records(lines):
+    """JSON Lines의 각 줄을 (줄 번호, 출생 정보 딕셔너리 또는 파싱 오류 메시지 문자열)로 차례로 만들어 냅니다. 빈 줄은 건너뜁니다."""
+    for line_no, line in enumerate(lines):
+        if isinstance(line, bytes):
+            line = line.decode("utf-8")
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_no, str(e)
+            continue
+        yield line_no, record if isinstance(record, dict) else "한 줄에 JSON 객체 하나가 있어야 합니다."
+
+def luck_trend_to_columns(luck_trend_rows):
+    """lifetime_luck_trend 항목들을 열 이름 -> 값 목록 형식으로 바꿉니다."""
+    columns = {name: [] for name in LUCK_TREND_COLUMNS}
+    for row in luck_trend_rows:
+        for name in LUCK_TREND_COLUMNS:
+            columns[name].append(row[name])
+    return columns
+
+def export_luck_trend(record, columnar=False):
+    """
+    출생 정보 한 건(/analysis와 같은 필드 이름)의 평생 운세를 내보내기 형식의 딕셔너리로 만듭니다.
+    입력에 "id"가 있으면 그대로 붙여 돌려주며, 실패하면 {"error": ..., "details": ...}를 담습니다.
+    """
+    exported = {"id": record["id"]} if "id" in record else {}
+    try:
+        engine_results = run_saju_engine(**record_to_engine_args(record))
+    except Exception as e:
+        engine_results = {"error": "엔진 실행 중 에러", "details": str(e)}
+    if "error" in engine_results:
+        exported.update(error=engine_results["error"], details=engine_results.get("details", ""))
+        return exported
+
+    start_year = engine_results["raw_inputs"].get("year_val_initial_input", 1900)
+    luck_trend_rows = iter_lifetime_luck_trend(engine_results["yearly_luck_raw_data"], start_year)
+    exported["lifetime_luck_trend"] = luck_trend_to_columns(luck_trend_rows) if columnar else list(luck_trend_rows)
+    return exported
+
+def export_line(line_no, record_or_error, columnar=False):
+    """iter_birth_records의 한 항목을 출력 한 줄(줄바꿈 포함)로 만듭니다."""
+    if isinstance(record_or_error, str):
+        exported = {"error": "JSON 파싱 오류", "details": record_or_error}
+    else:
+        exported = export_luck_trend(record_or_error, columnar)
+    return json.dumps({"line": line_no, **exported}, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+def iter_luck_trend_export(lines, columnar=False):
+    """JSON Lines 입력을 받아 사람마다 한 줄씩 내보내기 결과를 만들어 냅니다."""
+    for line_no, record_or_error in iter_birth_records(lines):
+        yield export_line(line_no, record_or_error, columnar)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="출생 정보 JSON Lines에서 평생 운세(lifetime_luck_trend)를 JSON Lines로 내보냅니다.")
+    parser.add_argument("input", nargs="?", default="-", help="입력 JSON Lines 파일 (기본값: 표준 입력)")
+    parser.add_argument("-o", "--output", default="-", help="출력 JSON Lines 파일 (기본값: 표준 출력)")
+    parser.add_argument("--columnar", action="store_true", help="항목 목록 대신 열(year, age, luck_value, luck_momentum 등) 배열로 출력합니다.")
+    args = parser.parse_args(argv)
+
+    input_file = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    output_file = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        output_file.writelines(iter_luck_trend_export(input_file, args.columnar))
+    finally:
+        if input_file is not sys.stdin: input_file.close()
+        if output_file is not sys.stdout: output_file.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
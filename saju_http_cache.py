@@ -0,0 +1,136 @@
+import collections
+import datetime
+import hashlib
+import os
+import threading
+
+import sajumentor
+from saju_metrics import register_collector
+
+# ==============================================================================
+# /analysis HTTP 캐시 (ETag / Cache-Control / 프로세스 내 응답 캐시)
+# 같은 입력의 /analysis 응답은 '작년/올해/내년' 한난조습(hjs_trend)을 빼면 늘 같으므로,
+# (정규화한 입력, 엔진 버전, 기준 연도, 절기 출처)로 강한 ETag를 만들어
+# - If-None-Match가 같으면 계산 없이 304로 답하고,
+# - Cache-Control로 CDN/브라우저가 다음 해가 되기 전까지 응답을 재사용하게 하며,
+# - 자주 들어오는 입력은 인코딩된 본문을 LRU에 보관해 계산과 직렬화를 모두 건너뜁니다.
+# ==============================================================================
+
+# 엔진 버전: 지정하지 않으면 계산 결과에 영향을 주는 소스/데이터 파일의 해시를 씁니다. (배포하면 자동으로 바뀜)
+ENGINE_VERSION = os.environ.get("SAJU_ENGINE_VERSION", "")
+ENGINE_SOURCE_FILES = [
+    "sajumentor.py", "jeolgi_ephemeris.py", "lunar_calendar.py", "city_gazetteer.py", "saju_time_unknown.py", "saju_compatibility.py",
+    "saju_response.py", os.path.join("gazetteer", "cities.idx"),
+]
+ANALYSIS_MAX_AGE_SECONDS = int(os.environ.get("SAJU_ANALYSIS_MAX_AGE", "86400"))
+RESPONSE_CACHE_SIZE = int(os.environ.get("SAJU_RESPONSE_CACHE_SIZE", "1024"))
+
+_engine_version = None
+
+def get_engine_version():
+    """ETag에 넣을 엔진 버전 (처음 호출될 때 한 번 계산)"""
+    global _engine_version
+    if _engine_version is None:
+        if ENGINE_VERSION:
+            _engine_version = ENGINE_VERSION
+        else:
+            digest = hashlib.blake2b(digest_size=8)
+            base_dir = os.path.dirname(os.path.abspath(__file__))
+            for relative_path in ENGINE_SOURCE_FILES:
+                try:
+                    with open(os.path.join(base_dir, relative_path), "rb") as f:
+                        digest.update(f.read())
+                except OSError:
+                    digest.update(relative_path.encode("utf-8"))
+            _engine_version = digest.hexdigest()
+    return _engine_version
+
+def normalize_analysis_params(birth, gender, cal_type, time, is_leap, is_time_unknown, is_overseas, city, true_solar_time, all_hours, response_format, short_keys):
+    """
+    응답을 결정하는 /analysis 파라미터만 정규화한 튜플.
+    시간을 모르면 time은 쓰이지 않고, all_hours는 시간을 모를 때만 쓰이며, 도시 이름은 대소문자/공백과 무관하게 찾습니다.
+    """
+    return (
+        birth, gender, cal_type, "" if is_time_unknown else time, bool(is_leap), bool(is_time_unknown), bool(is_overseas),
+        " ".join(city.split()).casefold(), bool(true_solar_time), bool(all_hours and is_time_unknown), response_format, bool(short_keys),
+    )
+
+def analysis_etag(normalized_params):
+    """정규화한 입력 + 엔진 버전 + 기준 연도 + 절기 출처로 만든 강한 ETag (따옴표 포함)"""
+    key = repr((normalized_params, get_engine_version(), sajumentor.get_reference_year(), sajumentor.SOLAR_TERM_SOURCE))
+    return '"' + hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest() + '"'
+
+def etag_matches(if_none_match, etag):
+    """
+    If-None-Match 헤더 값이 etag와 맞는지 (여러 값, 약한 비교 W/ 허용).
+    '*'는 받지 않습니다. 입력이 잘못돼 오류가 날 요청에도 304를 돌려주게 되기 때문입니다.
+    """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+def analysis_cache_control(now=None):
+    """공유 캐시 허용, 유효 시간은 ANALYSIS_MAX_AGE_SECONDS와 다음 해 1월 1일(기준 연도가 바뀌는 시각)까지 중 짧은 쪽"""
+    now = now or datetime.datetime.now()
+    seconds_to_new_year = int((datetime.datetime(now.year + 1, 1, 1) - now).total_seconds())
+    return f"public, max-age={max(0, min(ANALYSIS_MAX_AGE_SECONDS, seconds_to_new_year))}"
+
+class ResponseCache:
+    """ETag -> 인코딩된 응답 본문(bytes)의 크기 제한 LRU. 모든 접근은 잠금으로 보호합니다."""
+
+    def __init__(self, max_entries=RESPONSE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "not_modified": 0, "evictions": 0}
+
+    def get(self, etag):
+        with self._lock:
+            body = self._entries.get(etag)
+            if body is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(etag)
+            self._stats["hits"] += 1
+            return body
+
+    def put(self, etag, body):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[etag] = body
+            self._entries.move_to_end(etag)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def record_not_modified(self):
+        with self._lock:
+            self._stats["not_modified"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self):
+        with self._lock:
+            return {**self._stats, "size": len(self._entries), "bytes": sum(len(body) for body in self._entries.values()), "max_entries": self.max_entries}
+
+ANALYSIS_RESPONSE_CACHE = ResponseCache()
+
+def _collect_response_cache_metrics():
+    """/metrics용: /analysis 응답 캐시 적중/실패, 304 응답 수, 크기"""
+    stats = ANALYSIS_RESPONSE_CACHE.get_stats()
+    return [
+        ("saju_response_cache_hits_total", "counter", "응답 캐시 적중 수", [((), stats["hits"])]),
+        ("saju_response_cache_misses_total", "counter", "응답 캐시 실패 수", [((), stats["misses"])]),
+        ("saju_response_not_modified_total", "counter", "If-None-Match로 304를 반환한 수", [((), stats["not_modified"])]),
+        ("saju_response_cache_size", "gauge", "응답 캐시 항목 수", [((), stats["size"])]),
+        ("saju_response_cache_bytes", "gauge", "응답 캐시 본문 크기 합계(bytes)", [((), stats["bytes"])]),
+    ]
+
+register_collector(_collect_response_cache_metrics)
@@ -0,0 +1,181 @@
+import bisect
+import os
+import threading
+import time
+
+# ==============================================================================
+# 운영 지표 (Prometheus 텍스트 형식)
+# 엔진 단계별 소요 시간 히스토그램, 외부 API 호출 수/지연 시간, 캐시 적중/실패 수를 프로세스 안에 모아 두고
+# /metrics 엔드포인트에서 render_prometheus()로 내보냅니다.
+# 기록 한 번에 perf_counter 두 번과 잠금 한 번 정도만 들기 때문에 운영 환경에서도 켜 둘 수 있으며,
+# SAJU_METRICS=0 이면 기록하지 않습니다.
+# ==============================================================================
+
+METRICS_ENABLED = os.environ.get("SAJU_METRICS", "1") != "0"
+
+# 히스토그램 구간 경계(초): 100us ~ 10s
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class Histogram:
+    __slots__ = ("buckets", "bucket_counts", "sum", "count", "_lock")
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.bucket_counts = [0] * (len(buckets) + 1) # 마지막 칸은 +Inf
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.bucket_counts[i] += 1
+            self.sum += value
+            self.count += 1
+
+class Counter:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+# 지표 이름 -> (종류, 설명, {레이블 튜플: Histogram/Counter})
+_METRICS = {}
+_METRICS_LOCK = threading.Lock()
+# 조회 시점에 값을 읽어 오는 수집 함수 목록 (캐시 크기/적중률처럼 다른 모듈이 이미 세고 있는 값)
+_COLLECTORS = []
+
+def _define(name, kind, help_text):
+    if name not in _METRICS:
+        _METRICS[name] = (kind, help_text, {})
+
+_define("saju_stage_duration_seconds", "histogram", "엔진 단계별 소요 시간")
+_define("saju_upstream_request_duration_seconds", "histogram", "외부 API 호출 소요 시간")
+_define("saju_upstream_requests_total", "counter", "외부 API 호출 수 (결과별)")
+_define("saju_http_request_duration_seconds", "histogram", "HTTP 요청 처리 시간")
+
+def _series(name, labels, factory):
+    series = _METRICS[name][2]
+    metric = series.get(labels)
+    if metric is None:
+        with _METRICS_LOCK:
+            metric = series.setdefault(labels, factory())
+    return metric
+
+def observe(name, value, labels=()):
+    """히스토그램 지표에 값을 기록합니다. labels는 ((이름, 값), ...) 튜플입니다."""
+    if METRICS_ENABLED:
+        _series(name, labels, Histogram).observe(value)
+
+def inc(name, labels=(), amount=1):
+    """카운터 지표를 amount만큼 올립니다."""
+    if METRICS_ENABLED:
+        _series(name, labels, Counter).inc(amount)
+
+class stage_timer:
+    """
+    with stage_timer("luck_curve"): ... 처럼 감싼 구간의 소요 시간을 saju_stage_duration_seconds{stage=...}에 기록합니다.
+    예외가 나도 기록합니다.
+    """
+    __slots__ = ("labels", "started")
+
+    def __init__(self, stage):
+        self.labels = (("stage", stage),)
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        observe("saju_stage_duration_seconds", time.perf_counter() - self.started, self.labels)
+        return False
+
+def record_upstream_call(api, elapsed_seconds, ok):
+    """외부 API 호출 한 번의 소요 시간과 결과(ok/error)를 기록합니다."""
+    observe("saju_upstream_request_duration_seconds", elapsed_seconds, (("api", api),))
+    inc("saju_upstream_requests_total", (("api", api), ("outcome", "ok" if ok else "error")))
+
+class HttpMetricsMiddleware:
+    """
+    HTTP 요청 처리 시간을 saju_http_request_duration_seconds{path, status}에 기록하는 ASGI 미들웨어입니다.
+    path는 실제 URL이 아니라 매칭된 라우트 경로라서 레이블 종류가 늘어나지 않습니다.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            return await self.app(scope, receive, send)
+        started = time.perf_counter()
+        status_code = [500]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status_code[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            path = getattr(scope.get("route"), "path", "unmatched")
+            observe("saju_http_request_duration_seconds", time.perf_counter() - started, (("path", path), ("status", str(status_code[0]))))
+
+def register_collector(collect_func):
+    """
+    조회 시점에 값을 읽어 올 수집 함수를 등록합니다.
+    collect_func()는 (지표 이름, 종류(counter/gauge), 설명, [(레이블 튜플, 값), ...]) 목록을 반환해야 합니다.
+    """
+    _COLLECTORS.append(collect_func)
+
+def _format_labels(labels, extra=()):
+    pairs = tuple(labels) + tuple(extra)
+    if not pairs:
+        return ""
+    escaped = (f'{key}="{_escape_label_value(value)}"' for key, value in pairs)
+    return "{" + ",".join(escaped) + "}"
+
+def _escape_label_value(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def render_prometheus():
+    """모든 지표를 Prometheus 텍스트 형식(0.0.4)으로 반환합니다."""
+    lines = []
+    with _METRICS_LOCK:
+        metrics = [(name, kind, help_text, list(series.items())) for name, (kind, help_text, series) in _METRICS.items()]
+    for name, kind, help_text, series in metrics:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, metric in sorted(series, key=lambda item: item[0]):
+            if kind == "histogram":
+                with metric._lock:
+                    bucket_counts, total, count = list(metric.bucket_counts), metric.sum, metric.count
+                cumulative = 0
+                for bound, bucket_count in zip(list(metric.buckets) + ["+Inf"], bucket_counts):
+                    cumulative += bucket_count
+                    lines.append(f"{name}_bucket{_format_labels(labels, (('le', bound),))} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(total)}")
+                lines.append(f"{name}_count{_format_labels(labels)} {count}")
+            else:
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(metric.value)}")
+
+    for collect_func in _COLLECTORS:
+        try:
+            collected = collect_func()
+        except Exception as e:
+            print(f"지표 수집 중 오류: {e}")
+            continue
+        for name, kind, help_text, samples in collected:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,119 @@
+import json
+import os
+import threading
+import time
+
+from saju_metrics import register_collector
+
+# ==============================================================================
+# API 응답 직렬화
+# 기본(pretty) 응답은 지금까지처럼 json.dumps(indent=4)로 만들고, format=compact 응답은 들여쓰기 없이
+# 교체 가능한 빠른 인코더(설치되어 있으면 orjson)로 만듭니다. 요청마다 응답 크기와 인코딩 시간을 기록합니다.
+# ==============================================================================
+
+RESPONSE_FORMATS = ("pretty", "compact")
+
+def _encode_stdlib(obj):
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def _encode_orjson(obj):
+    import orjson
+    return orjson.dumps(obj)
+
+# 압축 응답용 인코더: 이름 -> (객체 -> UTF-8 bytes) 함수. register_json_encoder로 추가할 수 있습니다.
+JSON_ENCODERS = {"json": _encode_stdlib, "orjson": _encode_orjson}
+# "auto"이면 orjson이 설치되어 있을 때 orjson, 아니면 표준 json을 씁니다.
+JSON_ENCODER_NAME = os.environ.get("SAJU_JSON_ENCODER", "auto")
+_compact_encoder = None
+
+# short_keys=true일 때 바꿔 쓸 짧은 필드 이름 (lifetime_luck_trend 항목처럼 반복되는 키 위주)
+COMPACT_FIELD_NAMES = {
+    "year": "y", "age": "a", "daewoon": "dw", "yeonun": "yw", "luck_value": "v", "luck_momentum": "m",
+    "lifetime_luck_trend": "trend", "interaction_summary": "inter", "hjs_trend": "hjs_t", "base_hjs": "hjs",
+    "date": "d", "wolun": "mw", "ilun": "iw", "monthly_luck": "ml", "daily_luck": "dl",
+}
+
+def register_json_encoder(name, encode_func):
+    """압축 응답용 인코더를 등록합니다. encode_func는 객체를 받아 UTF-8로 인코딩된 JSON bytes를 반환해야 합니다."""
+    global _compact_encoder
+    JSON_ENCODERS[name] = encode_func
+    _compact_encoder = None
+
+def get_compact_encoder():
+    """JSON_ENCODER_NAME에 해당하는 압축 응답용 인코더를 반환합니다. (처음 호출될 때 결정)"""
+    global _compact_encoder
+    if _compact_encoder is None:
+        name = JSON_ENCODER_NAME
+        if name == "auto":
+            try:
+                import orjson # noqa: F401
+                name = "orjson"
+            except ImportError:
+                name = "json"
+        if name not in JSON_ENCODERS:
+            raise ValueError(f"알 수 없는 JSON 인코더: {name}")
+        _compact_encoder = JSON_ENCODERS[name]
+    return _compact_encoder
+
+def shorten_field_names(obj):
+    """딕셔너리 키를 COMPACT_FIELD_NAMES에 따라 짧은 이름으로 바꾼 사본을 반환합니다. (중첩된 목록/딕셔너리 포함)"""
+    if isinstance(obj, dict):
+        return {COMPACT_FIELD_NAMES.get(key, key): shorten_field_names(value) for key, value in obj.items()}
+    if isinstance(obj, list):
+        return [shorten_field_names(value) for value in obj]
+    return obj
+
+# --- 응답 크기 / 인코딩 시간 기록 ---
+_RESPONSE_STATS_LOCK = threading.Lock()
+RESPONSE_ENCODING_STATS = {}
+
+def _record_encoding(endpoint, response_format, body_bytes, encode_seconds):
+    with _RESPONSE_STATS_LOCK:
+        stats = RESPONSE_ENCODING_STATS.setdefault((endpoint, response_format), {"count": 0, "bytes_total": 0, "encode_seconds_total": 0.0})
+        stats["count"] += 1
+        stats["bytes_total"] += body_bytes
+        stats["encode_seconds_total"] += encode_seconds
+
+def get_response_encoding_stats():
+    """(엔드포인트, 응답 형식)별 응답 수, 평균 응답 크기(bytes), 평균 인코딩 시간(ms)을 반환합니다."""
+    with _RESPONSE_STATS_LOCK:
+        return {
+            f"{endpoint} {response_format}": {
+                "count": s["count"], "bytes_total": s["bytes_total"],
+                "bytes_avg": round(s["bytes_total"] / s["count"], 1),
+                "encode_ms_avg": round(s["encode_seconds_total"] * 1000 / s["count"], 3),
+            }
+            for (endpoint, response_format), s in RESPONSE_ENCODING_STATS.items()
+        }
+
+def _collect_response_metrics():
+    """/metrics용: (엔드포인트, 응답 형식)별 응답 수, 응답 크기 합계, 인코딩 시간 합계"""
+    with _RESPONSE_STATS_LOCK:
+        items = [((("endpoint", endpoint), ("format", response_format)), dict(s)) for (endpoint, response_format), s in RESPONSE_ENCODING_STATS.items()]
+    return [
+        ("saju_responses_total", "counter", "인코딩한 응답 수", [(labels, s["count"]) for labels, s in items]),
+        ("saju_response_bytes_total", "counter", "응답 본문 크기 합계(bytes)", [(labels, s["bytes_total"]) for labels, s in items]),
+        ("saju_response_encode_seconds_total", "counter", "응답 인코딩 시간 합계(초)", [(labels, s["encode_seconds_total"]) for labels, s in items]),
+    ]
+
+register_collector(_collect_response_metrics)
+
+def encode_response(result, response_format="pretty", short_keys=False, endpoint=""):
+    """
+    응답 객체를 JSON bytes로 인코딩하고 (본문, 기록용 헤더)를 반환합니다.
+    pretty는 예전과 같은 json.dumps(indent=4) 출력이고, compact는 들여쓰기 없이 빠른 인코더로 만듭니다.
+    """
+    if response_format not in RESPONSE_FORMATS:
+        raise ValueError(f"format은 {', '.join(RESPONSE_FORMATS)} 중 하나여야 합니다.")
+    started = time.perf_counter()
+    if short_keys:
+        result = shorten_field_names(result)
+    if response_format == "compact":
+        body = get_compact_encoder()(result)
+    else:
+        body = json.dumps(result, ensure_ascii=False, indent=4).encode("utf-8")
+    encode_seconds = time.perf_counter() - started
+
+    _record_encoding(endpoint, response_format, len(body), encode_seconds)
+    headers = {"X-Response-Bytes": str(len(body)), "X-Encode-Ms": f"{encode_seconds * 1000:.3f}"}
+    return body, headers
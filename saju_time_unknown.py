@@ -0,0 +1,146 @@
+import asyncio
+import collections
+import datetime
+import math
+import traceback
+
+from sajumentor import (
+    calculate_overall_luck_score, get_all_possible_hour_pillars, get_day_pillar, get_month_pillar, get_year_pillar,
+    prepare_engine_inputs, run_saju_engine_from_pillars,
+)
+from saju_compatibility import align_luck_curves
+from saju_metrics import stage_timer
+
+# ==============================================================================
+# 출생 시간을 모를 때: 12시진 후보 전체 분석
+# 기본 엔진은 시간을 모르면 12시 30분으로 가정하지만, 이 모드는 가능한 시주 12개를 모두 분석해
+# 후보별 결과와 함께 키워드·필요오행·행운강도 곡선이 후보마다 얼마나 같은지(안정성)를 돌려줍니다.
+# 입력 변환(음력/시간대)과 연·월·일주는 한 번만 계산하고, 후보별 분석은 사주팔자 단위 캐시
+# (analyze_static_pillars / calculate_luck_curve_cached)를 그대로 씁니다.
+# ==============================================================================
+
+# 시진별 지방시(LMT) 구간. 자시 후보는 그날 일간 기준(00:00~00:59 조자시)의 시주입니다.
+HOUR_BRANCH_TIME_RANGES = [f"{(2 * j - 1) % 24:02d}:00~{(2 * j) % 24:02d}:59" for j in range(12)]
+
+def _year_month_pillars(jeolgi_dt):
+    year_gan, year_ji, year_gan_idx, astro_year = get_year_pillar(jeolgi_dt)
+    month_gan, month_ji, _, month_period_idx = get_month_pillar(jeolgi_dt, year_gan_idx, astro_year)
+    return {"연간": year_gan, "연지": year_ji, "월간": month_gan, "월지": month_ji}, astro_year, month_period_idx
+
+def calculate_hour_candidate_pillars(engine_inputs):
+    """
+    prepare_engine_inputs의 결과(시간 모름)로 12시진 후보의 (시진 순번, 후보 engine_inputs, 사주팔자, 천문학적 연도, 절기 월 순번)을 만듭니다.
+    후보 시각은 각 시진의 가운데(자시 00:00, 축시 02:00, ...)이며, 연·월주는 그날 안에 절입이 있을 때만 후보마다 다시 계산합니다.
+    """
+    datetime_lmt, datetime_jeolgi_lmt = engine_inputs["datetime_lmt"], engine_inputs["datetime_jeolgi_lmt"]
+    clock_offset = datetime_lmt - datetime_jeolgi_lmt # 경도/진태양시 보정량 (일·시주 시각 - 절기 기준 시각)
+    day_start = datetime_lmt.replace(hour=0, minute=0, second=0, microsecond=0)
+    day_gan, day_ji, day_gan_idx = get_day_pillar(day_start)
+
+    candidate_times = [day_start + datetime.timedelta(hours=2 * j) for j in range(12)]
+    first_year_month, last_year_month = _year_month_pillars(candidate_times[0] - clock_offset), _year_month_pillars(candidate_times[-1] - clock_offset)
+    shared_year_month = first_year_month if first_year_month == last_year_month else None
+
+    candidates = []
+    for j, ((hour_gan, hour_ji), candidate_lmt) in enumerate(zip(get_all_possible_hour_pillars(day_gan_idx), candidate_times)):
+        candidate_jeolgi_lmt = candidate_lmt - clock_offset
+        year_month, astro_year, month_period_idx = shared_year_month or _year_month_pillars(candidate_jeolgi_lmt)
+        saju_8_chars = {**year_month, "일간": day_gan, "일지": day_ji, "시간": hour_gan, "시지": hour_ji}
+        candidate_inputs = {**engine_inputs, "datetime_lmt": candidate_lmt, "datetime_jeolgi_lmt": candidate_jeolgi_lmt}
+        candidates.append((j, candidate_inputs, saju_8_chars, astro_year, month_period_idx))
+    return candidates
+
+def _agreement(values):
+    """후보들의 값 분포: 가장 많은 값, 그 비율, 값별 후보 수 (JSON 객체 키이므로 값은 문자열로)"""
+    counts = collections.Counter(values)
+    most_common, count = counts.most_common(1)[0]
+    return {"value": most_common, "agreement": round(count / len(values), 3), "counts": {str(value): n for value, n in counts.items()}}
+
+def _pearson(xs, ys):
+    """두 곡선의 피어슨 상관계수 (한쪽이 상수이면 None)"""
+    n = len(xs)
+    mean_x, mean_y = sum(xs) / n, sum(ys) / n
+    cov = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    var_x = sum((x - mean_x) ** 2 for x in xs)
+    var_y = sum((y - mean_y) ** 2 for y in ys)
+    return cov / math.sqrt(var_x * var_y) if var_x > 0 and var_y > 0 else None
+
+def summarize_luck_curve_stability(luck_curves):
+    """후보별 행운강도 곡선을 연도로 맞춰 연도별 평균/폭(최대-최소)과, 평균 곡선과의 최소 상관계수를 계산합니다."""
+    aligned = align_luck_curves(luck_curves)
+    if not aligned:
+        return {"years": [], "mean": [], "spread": [], "mean_spread": None, "max_spread": None, "min_correlation": None}, aligned
+    spreads = [round(max(entry["luck_values"]) - min(entry["luck_values"]), 3) for entry in aligned]
+    mean_curve = [entry["joint_luck"] for entry in aligned]
+    correlations = [_pearson([entry["luck_values"][k] for entry in aligned], mean_curve) for k in range(len(luck_curves))]
+    correlations = [value for value in correlations if value is not None]
+    return {
+        "years": [entry["year"] for entry in aligned],
+        "mean": mean_curve,
+        "spread": spreads,
+        "mean_spread": round(sum(spreads) / len(spreads), 3),
+        "max_spread": max(spreads),
+        "min_correlation": round(min(correlations), 3) if correlations else None,
+    }, aligned
+
+def get_saju_hour_candidates_for_api(cal_type, date_str, gender_input, is_leap_input, is_overseas, city_name="", true_solar_time=False):
+    """
+    출생 시간을 모를 때 가능한 시주 12개를 모두 분석합니다.
+    {"userInput", "sajuInfo", "candidates": [시진별 결과], "aggregate": {키워드/필요오행/대운수 일치도, 행운강도 곡선 안정성}}를 반환하며,
+    실패하면 {"error": ..., "details": ...}를 반환합니다.
+    """
+    try:
+        with stage_timer("input_preparation"):
+            engine_inputs = prepare_engine_inputs(cal_type, date_str, "1230", gender_input, is_leap_input, True, is_overseas, city_name, true_solar_time)
+    except Exception as e:
+        return {"error": "엔진 실행 중 에러", "details": str(e), "traceback": traceback.format_exc()}
+
+    try:
+        with stage_timer("four_pillars"):
+            candidate_pillars = calculate_hour_candidate_pillars(engine_inputs)
+        results = [
+            (j, run_saju_engine_from_pillars(candidate_inputs, saju_8_chars, astro_year, month_period_idx))
+            for j, candidate_inputs, saju_8_chars, astro_year, month_period_idx in candidate_pillars
+        ]
+
+        with stage_timer("response_build"):
+            luck_curve, aligned = summarize_luck_curve_stability([r["yearly_luck_raw_data"] for _, r in results])
+            candidates = []
+            for k, (j, r) in enumerate(results):
+                pillars, saju_basics, core = r["saju_basics"]["pillars"], r["saju_basics"], r["core_analysis_results"]
+                candidates.append({
+                    "hour_pillar": f"{pillars['시간']}{pillars['시지']}",
+                    "time_range_lmt": HOUR_BRANCH_TIME_RANGES[j],
+                    "pillars": {"summary": f"{pillars['연간']}{pillars['연지']}년 {pillars['월간']}{pillars['월지']}월 {pillars['일간']}{pillars['일지']}일 {pillars['시간']}{pillars['시지']}시"},
+                    "daewoon": {"direction": saju_basics["daewoon_direction"], "start_age_korean": saju_basics["daewoon_su"], "start_year_ad": saju_basics["start_year_ad"]},
+                    "core": core,
+                    "overall_luck": round(calculate_overall_luck_score(r["yearly_luck_raw_data"]), 3),
+                    "luck_values": [entry["luck_values"][k] for entry in aligned],
+                })
+
+            raw_inputs = engine_inputs["raw_inputs"]
+            day_pillars = results[0][1]["saju_basics"]["pillars"]
+            return {
+                "userInput": {
+                    "gender": gender_input, "calendar": "음력" if cal_type == "음" else "양력",
+                    "birthDateTime": f"{raw_inputs['year_val_initial_input']}년 {raw_inputs['kst_original_month_input']}월 {raw_inputs['kst_original_day_input']}일 시간 모름",
+                    "isLeapMonth": is_leap_input,
+                },
+                "sajuInfo": {"pillars": {"day": f"{day_pillars['일간']}{day_pillars['일지']}", "candidate_count": len(candidates)}},
+                "candidates": candidates,
+                "aggregate": {
+                    "keyword": _agreement([c["core"]["keyword"] for c in candidates]),
+                    "pne1": _agreement([c["core"]["pne1"] for c in candidates]),
+                    "pne2": _agreement([c["core"]["pne2"] for c in candidates]),
+                    "daewoon_su": _agreement([c["daewoon"]["start_age_korean"] for c in candidates]),
+                    "luck_curve": luck_curve,
+                },
+            }
+    except Exception as e:
+        return {"error": "API 처리 중 에러", "details": str(e), "traceback": traceback.format_exc()}
+
+async def get_saju_hour_candidates_for_api_async(cal_type, date_str, gender_input, is_leap_input, is_overseas, city_name="", true_solar_time=False):
+    """get_saju_hour_candidates_for_api의 비동기 버전입니다. 외부 데이터(음력 변환, 절기)를 미리 가져온 뒤 계산은 스레드에서 실행합니다."""
+    from sajumentor_async import prefetch_engine_inputs_async
+    await prefetch_engine_inputs_async(cal_type, date_str, is_leap_input)
+    return await asyncio.to_thread(get_saju_hour_candidates_for_api, cal_type, date_str, gender_input, is_leap_input, is_overseas, city_name, true_solar_time)
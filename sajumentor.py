@@ -1,16 +1,19 @@
 import datetime
 import math
-import pandas as pd
-import numpy as np
 import itertools
 import traceback
-from collections import defaultdict, Counter
+from collections import defaultdict
 import time
-import requests
 import json
-#from geopy.geocoders import Nominatim
-#from timezonefinder import TimezoneFinder
-import pytz
+import os
+import functools
+import collections
+import threading
+from city_gazetteer import find_city
+from jeolgi_ephemeris import calculate_solar_terms_for_year, equation_of_time_seconds
+from solar_term_store import SolarTermStore
+from saju_metrics import record_upstream_call, register_collector, stage_timer
+from lunar_calendar import lunar_to_solar, solar_to_lunar, is_lunar_year_supported
 
 # ==============================================================================
 # SECTION 0: 기본 데이터 정의 (Gemini 재작성)
@@ -92,35 +95,23 @@ HANGEUL_TO_HANJA_JIJI = {h: H_HANJA for h, H_HANJA in zip(JIJI, list(JIJI_TO_HAN
 YANG_CHEONGAN = ["갑", "병", "무", "경", "임"]
 
 # 절기 및 연도 계산 관련 상수
-YANG_CHEONGAN = ["갑", "병", "무", "경", "임"]
 PERIOD_IDX_TO_SOLAR_TERM_NAME = ["입춘", "경칩", "청명", "입하", "망종", "소서", "입추", "백로", "한로", "입동", "대설", "소한"]
 MONTH_PILLAR_BORDERS = [(2, 4), (3, 6), (4, 5), (5, 6), (6, 6), (7, 7), (8, 8), (9, 8), (10, 8), (11, 7), (12, 7), (1, 6)]
 SOLAR_MONTH_ORDER_TO_JIJI_IDX = [2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 0, 1]
 
 # 외부 API 관련 상수
+SOLAR_TERM_API_URL = "http://apis.data.go.kr/B090041/openapi/service/SpcdeInfoService/get24DivisionsInfo"
+LUNAR_API_URL = "http://apis.data.go.kr/B090041/openapi/service/LrsrCldInfoService/getLunCalInfo"
 SERVICE_KEY_DECODED = "Ydis1OrP2uRyCXRimsmNAUGA2rB6UWR6bC17vMBpSN0wMGyKvpAuDCiOLCYNzykaqMi/Kz989ZDtlXqrLwlUVw=="
-SOLAR_TERM_TIMES_KST = {} # 절기 API 호출 결과를 캐시하기 위한 변수
+# 절기 데이터 출처: "local"(천문 계산, 기본값) 또는 "api"(공공데이터 API)
+SOLAR_TERM_SOURCE = os.environ.get("SAJU_SOLAR_TERM_SOURCE", "local")
+LUNAR_API_CACHE = {} # 음력 표 범위 밖 날짜의 API 변환 결과 캐시 ((음력 연, 월, 일, 윤달) -> 양력 date)
 
 # 60갑자 리스트 생성 및 오행 매핑
 yearly_heavenly_stems = CHEONGAN
 yearly_earthly_branches = JIJI
 valid_60_gapja_list = [(yearly_heavenly_stems[i%10], yearly_earthly_branches[i%12]) for i in range(60)]
 
-# 천간 辛과 지지 申을 모두 포함하는 선생님의 원본 로직
-saju_element_mapping = {"목":["갑","을","인","묘"],"화":["병","정","사","오"],"토":["무","기","진","술","축","미"],"금":["경","신","신","유"],"수":["임","계","자","해"]}
-saju_reverse_element_mapping = {ch:e for e,chars in saju_element_mapping.items() for ch in chars}
-
-saju_position_info = {
-    "연간": {"label": "연간", "neighbors": ["월간", "연지", "월지"], "weight": 0.2},
-    "연지": {"label": "연지", "neighbors": ["연간", "월간", "월지"], "weight": 0.1},
-    "월간": {"label": "월간", "neighbors": ["연간", "일간", "연지", "월지", "일지"], "weight": 0.5},
-    "월지": {"label": "월지", "neighbors": ["연간", "월간", "일간", "연지", "일지"], "weight": 1.0},
-    "일간": {"label": "일간", "neighbors": ["월간", "시간", "월지", "일지", "시지"], "weight": 1.0},
-    "일지": {"label": "일지", "neighbors": ["월간", "일간", "시간", "월지", "시지"], "weight": 0.7},
-    "시간": {"label": "시간", "neighbors": ["일간", "일지", "시지"], "weight": 0.4},
-    "시지": {"label": "시지", "neighbors": ["일간", "시간", "일지"], "weight": 0.4}
-}
-
 # 위치별 가중치 정보
 saju_position_info = {
     "연간": {"label": "연간", "neighbors": ["월간", "연지", "월지"], "weight": 0.2},
@@ -160,6 +151,240 @@ HJS_SCORES_GLOBAL = {
     '술': {'한': 7, '난': 3, '조': 9, '습': 1}, '해': {'한': 7, '난': 3, '조': 3, '습': 7}
 }
 
+# ==============================================================================
+# SECTION 1: 정수 코드 사주 표현 (SajuChart)
+# 엔진 내부 계산은 천간(0~9)/지지(0~11)/오행(0~4) 정수 코드로 하고, 한글 글자는 응답을 만들 때만 사용합니다.
+# ==============================================================================
+# 사주팔자 위치 순서 (캐시 키로 쓰는 튜플과 SajuChart.codes의 순서)
+PILLAR_POSITIONS = ("연간", "연지", "월간", "월지", "일간", "일지", "시간", "시지")
+POSITION_TO_IDX = {pos: i for i, pos in enumerate(PILLAR_POSITIONS)}
+DAY_MASTER_POS_IDX = POSITION_TO_IDX["일간"]
+
+# 오행 코드는 상생 순서입니다. 오행 e에 대해 (e+1)%5는 내가 생하는 것, (e+2)%5는 내가 극하는 것,
+# (e+3)%5는 나를 극하는 것, (e+4)%5는 나를 생하는 것입니다. (SHENG_RELATIONS / KE_RELATIONS와 같은 관계)
+ELEMENTS = ["목", "화", "토", "금", "수"]
+ELEMENT_TO_IDX = {el: i for i, el in enumerate(ELEMENTS)}
+RELATION_SAME, RELATION_SHENG, RELATION_KE, RELATION_KE_IN, RELATION_SHENG_IN = range(5)
+YIN_YANG = ["양", "음"]
+
+CHEONGAN_TO_IDX = {ch: i for i, ch in enumerate(CHEONGAN)}
+JIJI_TO_IDX = {ch: i for i, ch in enumerate(JIJI)}
+CHEONGAN_ELEMENT_IDX = [ELEMENT_TO_IDX[saju_reverse_element_mapping[ch]] for ch in CHEONGAN]
+JIJI_ELEMENT_IDX = [ELEMENT_TO_IDX[JIJI_ELEMENTS_PRIMARY[ch]] for ch in JIJI]
+CHEONGAN_YIN_YANG_IDX = [YIN_YANG.index(CHEONGAN_YIN_YANG[ch]) for ch in CHEONGAN]
+JIJI_YIN_YANG_IDX = [YIN_YANG.index(JIJI_YIN_YANG_FUNCTIONAL[ch]) for ch in JIJI] # 기능적 음양
+CHEONGAN_HANJA = [CHEONGAN_TO_HANJA[ch] for ch in CHEONGAN]
+JIJI_HANJA = [JIJI_TO_HANJA[ch] for ch in JIJI]
+
+# 위치별 인접 위치 / 가중치 (saju_position_info의 정수 코드 버전)
+POSITION_NEIGHBOR_IDX = [tuple(POSITION_TO_IDX[n] for n in saju_position_info[pos]["neighbors"]) for pos in PILLAR_POSITIONS]
+POSITION_WEIGHTS = [saju_position_info[pos]["weight"] for pos in PILLAR_POSITIONS]
+MAX_TOTAL_POSITION_WEIGHT = sum(info['weight'] for info in saju_position_info.values())
+# 키워드(대표 글자)를 찾는 위치 우선순위
+KEYWORD_SEARCH_POSITIONS = ["월간", "시간", "연간", "월지", "일지", "시지", "연지"]
+KEYWORD_SEARCH_POS_IDX = [POSITION_TO_IDX[pos] for pos in KEYWORD_SEARCH_POSITIONS]
+# 키워드 위치별로 행운량 계산에 참여하는 위치
+KEYWORD_TO_PARTICIPATING_POSITIONS = {
+    "연간": ["연지", "월간", "월지"], "연지": ["연간", "월간", "월지"],
+    "월간": ["연간", "연지", "월지", "일간", "일지"], "월지": ["연간", "연지", "월간", "일간", "일지"],
+    "일간": ["월간", "월지", "일지", "시간", "시지"], "일지": ["월간", "월지", "일간", "시간", "시지"],
+    "시간": ["일간", "일지", "시지"], "시지": ["일간", "일지", "시간"]
+}
+KEYWORD_PARTICIPATING_POS_IDX = [[POSITION_TO_IDX[p] for p in KEYWORD_TO_PARTICIPATING_POSITIONS[pos]] for pos in PILLAR_POSITIONS]
+# 키워드 오행 기준 관계별 행운량 점수 (같음, 내가 생함, 내가 극함, 나를 극함, 나를 생함)
+LUCK_QUANTITY_RELATION_SCORES = [0, -1, -2, -2, 1]
+
+# 행운강도 점수용 정수 코드 테이블
+COMPLEX_INTERACTION_MATRIX = [[COMPLEX_INTERACTION_TABLE[p][e] for e in ELEMENTS] for p in ELEMENTS]
+JINNSULCHUKMI_BASE_MATRIX = {JIJI_TO_IDX[ch]: [values[e] for e in ELEMENTS] for ch, values in jinnsulchukmi_base_values.items()}
+
+class SajuChart:
+    """
+    사주팔자 8글자를 정수 코드로 담는 값 객체입니다.
+    codes는 PILLAR_POSITIONS 순서의 8개 정수로, 짝수 위치는 천간 코드(0~9), 홀수 위치는 지지 코드(0~11)입니다.
+    elements / yin_yang은 같은 순서의 오행 코드(ELEMENTS)와 음양 코드(YIN_YANG, 지지는 기능적 음양)이고,
+    adjacent_branch_pairs는 (연지-월지, 월지-일지, 일지-시지) 지지 코드 쌍을 정렬한 튜플입니다.
+    """
+    __slots__ = ("codes", "elements", "yin_yang", "adjacent_branch_pairs")
+
+    def __init__(self, codes):
+        codes = tuple(codes)
+        if len(codes) != 8:
+            raise ValueError("사주팔자는 8글자여야 합니다.")
+        self.codes = codes
+        self.elements = tuple(JIJI_ELEMENT_IDX[c] if p % 2 else CHEONGAN_ELEMENT_IDX[c] for p, c in enumerate(codes))
+        self.yin_yang = tuple(JIJI_YIN_YANG_IDX[c] if p % 2 else CHEONGAN_YIN_YANG_IDX[c] for p, c in enumerate(codes))
+        branches = codes[1::2]
+        self.adjacent_branch_pairs = tuple(tuple(sorted(branches[k:k + 2])) for k in range(3))
+
+    @classmethod
+    def from_key(cls, pillar_key):
+        """PILLAR_POSITIONS 순서의 한글 8글자 튜플로부터 만듭니다."""
+        try:
+            return cls(JIJI_TO_IDX[ch] if p % 2 else CHEONGAN_TO_IDX[ch] for p, ch in enumerate(pillar_key))
+        except KeyError as e:
+            raise ValueError(f"사주팔자 글자 오류: {e}") from None
+
+    @classmethod
+    def from_dict(cls, saju_8_chars):
+        """{"연간": "갑", ...} 형태의 사주팔자 딕셔너리로부터 만듭니다. 8글자가 모두 있어야 합니다."""
+        return cls.from_key(tuple(saju_8_chars.get(pos) for pos in PILLAR_POSITIONS))
+
+    def to_key(self):
+        """PILLAR_POSITIONS 순서의 한글 8글자 튜플로 변환합니다."""
+        return tuple(JIJI[c] if p % 2 else CHEONGAN[c] for p, c in enumerate(self.codes))
+
+    def to_dict(self):
+        """{"연간": "갑", ...} 형태의 사주팔자 딕셔너리로 변환합니다."""
+        return dict(zip(PILLAR_POSITIONS, self.to_key()))
+
+    def to_hanja(self):
+        """PILLAR_POSITIONS 순서의 한자 8글자 튜플로 변환합니다."""
+        return tuple(JIJI_HANJA[c] if p % 2 else CHEONGAN_HANJA[c] for p, c in enumerate(self.codes))
+
+    @property
+    def stems(self):
+        """(연간, 월간, 일간, 시간) 천간 코드"""
+        return self.codes[0::2]
+
+    @property
+    def branches(self):
+        """(연지, 월지, 일지, 시지) 지지 코드"""
+        return self.codes[1::2]
+
+    def __eq__(self, other):
+        return isinstance(other, SajuChart) and self.codes == other.codes
+
+    def __hash__(self):
+        return hash(self.codes)
+
+    def __repr__(self):
+        return f"SajuChart({''.join(self.to_key())})"
+
+def needed_elements_for_position_chart(chart, pos_idx):
+    """
+    determine_needed_elements_for_position의 정수 코드 버전입니다.
+    해당 위치에 필요한 (1순위, 2순위) 오행 코드 튜플을 반환하며, 세력이 중화되면 빈 튜플입니다.
+    """
+    center_element = chart.elements[pos_idx]
+    in_force_count = out_force_count = 0
+    for neighbor_idx in POSITION_NEIGHBOR_IDX[pos_idx]:
+        relation = (chart.elements[neighbor_idx] - center_element) % 5
+        if relation == RELATION_SAME:
+            continue
+        if relation >= RELATION_KE_IN: # 나를 극하거나 생하는 'in' 관계
+            in_force_count += 1
+        else: # 내가 생하거나 극하는 'out' 관계
+            out_force_count += 1
+
+    if in_force_count > out_force_count: # 신강: 재성, 식상
+        return ((center_element + RELATION_KE) % 5, (center_element + RELATION_SHENG) % 5)
+    elif out_force_count > in_force_count: # 신약: 인성, 관성
+        return ((center_element + RELATION_SHENG_IN) % 5, (center_element + RELATION_KE_IN) % 5)
+    return ()
+
+def calculate_needed_element_scores_chart(chart):
+    """calculate_needed_element_scores의 정수 코드 버전입니다. 오행 코드 순서의 점수 리스트를 반환합니다."""
+    scores = [0.0] * 5
+    for pos_idx in range(8):
+        for needed_el in needed_elements_for_position_chart(chart, pos_idx):
+            scores[needed_el] += POSITION_WEIGHTS[pos_idx]
+    return [round(score / MAX_TOTAL_POSITION_WEIGHT, 2) for score in scores]
+
+def sort_needed_elements(element_scores):
+    """오행 점수 리스트를 점수가 높은 순으로 정렬한 오행 코드 리스트를 반환합니다. (동점이면 목화토금수 순)"""
+    return sorted(range(5), key=element_scores.__getitem__, reverse=True)
+
+def derive_keyword_chart(chart, pne1_element, pne2_element):
+    """derive_keyword의 정수 코드 버전입니다. 키워드 글자의 위치 코드를 반환합니다. (없으면 일간)"""
+    for target_element in (pne1_element, pne2_element):
+        if target_element is None:
+            continue
+        for pos_idx in KEYWORD_SEARCH_POS_IDX:
+            if chart.elements[pos_idx] == target_element:
+                return pos_idx
+    return DAY_MASTER_POS_IDX
+
+def calculate_luck_quantity_chart(chart, reference_element, keyword_pos_idx):
+    """calculate_luck_quantity_auto의 정수 코드 버전입니다."""
+    total_score = 0
+    if reference_element is not None and keyword_pos_idx is not None:
+        for pos_idx in KEYWORD_PARTICIPATING_POS_IDX[keyword_pos_idx]:
+            total_score += LUCK_QUANTITY_RELATION_SCORES[(chart.elements[pos_idx] - reference_element) % 5]
+    luck_quantity = abs(total_score)
+    return 1 if luck_quantity == 0 else luck_quantity
+
+# ==============================================================================
+# SECTION 2: 관계 행렬 (십성 / 천간합 / 지지 육합·충·반합 / 합에 의한 필요오행 조정 조회표)
+# 모두 (천간, 천간) / (천간, 지지) / (지지, 지지) 코드의 순수 함수이므로 import 시점에 한 번만 만들어 두고 조회만 합니다.
+# ==============================================================================
+# 기준 오행에서 본 대상 오행의 관계별 십성 이름 (음양이 같을 때, 다를 때)
+SIPSEONG_BY_RELATION = {
+    RELATION_SAME: ("비견", "겁재"), RELATION_SHENG: ("식신", "상관"), RELATION_SHENG_IN: ("편인", "정인"),
+    RELATION_KE: ("편재", "정재"), RELATION_KE_IN: ("편관", "정관"),
+}
+
+def _sipseong_name(base_element, base_yin_yang, target_element, target_yin_yang):
+    return SIPSEONG_BY_RELATION[(target_element - base_element) % 5][0 if base_yin_yang == target_yin_yang else 1]
+
+# [기준 천간][대상 천간] -> 십성, [일간][대상 지지] -> 십성 (지지는 본기 오행과 기능적 음양 기준)
+SIPSEONG_CHEONGAN_MATRIX = [[_sipseong_name(CHEONGAN_ELEMENT_IDX[b], CHEONGAN_YIN_YANG_IDX[b], CHEONGAN_ELEMENT_IDX[t], CHEONGAN_YIN_YANG_IDX[t]) for t in range(10)] for b in range(10)]
+SIPSEONG_JIJI_MATRIX = [[_sipseong_name(CHEONGAN_ELEMENT_IDX[b], CHEONGAN_YIN_YANG_IDX[b], JIJI_ELEMENT_IDX[t], JIJI_YIN_YANG_IDX[t]) for t in range(12)] for b in range(10)]
+
+def _pair_matrix(size, pairs_table, labels):
+    """(글자, 글자) -> 이름 딕셔너리를 [코드][코드] -> 이름(없으면 None) 행렬로 바꿉니다."""
+    matrix = [[None] * size for _ in range(size)]
+    for (a, b), name in pairs_table.items():
+        matrix[labels.index(a)][labels.index(b)] = name
+    return matrix
+
+CHEONGAN_HAP_MATRIX = _pair_matrix(10, CHEONGAN_HAP_PAIRS, CHEONGAN)
+JIJI_YUKHAP_MATRIX = _pair_matrix(12, JIJI_YUKHAP_PAIRS, JIJI)
+JIJI_CHUNG_MATRIX = _pair_matrix(12, JIJI_CHUNG_PAIRS, JIJI)
+# 반합: 서로 다른 두 글자가 같은 삼합에 속하고, 그중 하나가 왕지(삼합의 가운데 글자)일 때 (예: "화국 반합")
+JIJI_BANHAP_MATRIX = _pair_matrix(12, {
+    (a, b): hap_name.replace('삼합', '반합')
+    for required_jijis, hap_name in JIJI_SAMHAP_LIST for a in required_jijis for b in required_jijis
+    if a != b and required_jijis[1] in (a, b)
+}, JIJI)
+
+# 대운/세운의 지지가 원국의 인접한 두 지지와 합을 완성하는 조건: ((원국 두 글자), 운의 글자)
+# 키워드가 원국 두 글자 중 하나이면 필요오행을 한 순위씩 당깁니다.
+HAP_ADJUST_COMBOS = [
+    (("인", "술"), "오"), (("인", "진"), "묘"), (("사", "축"), "유"), (("사", "미"), "오"),
+    (("신", "진"), "자"), (("신", "술"), "유"), (("해", "미"), "묘"), (("해", "축"), "자"),
+]
+# [원국 지지][원국 지지] -> 합을 완성하는 운의 지지 코드 (없으면 None)
+HAP_ADJUST_TRIGGER_MATRIX = _pair_matrix(12, {
+    pair: JIJI_TO_IDX[luck_char] for natal_pair, luck_char in HAP_ADJUST_COMBOS for pair in (natal_pair, natal_pair[::-1])
+}, JIJI)
+
+def keyword_branch_code(keyword_char):
+    """
+    합에 의한 필요오행 조정에 쓰는 키워드의 지지 코드를 반환합니다. (지지 이름이 아니면 None)
+    기존 로직이 글자 이름으로 비교하므로, 천간 辛(신)도 지지 申(신)과 같이 취급됩니다.
+    """
+    return JIJI_TO_IDX.get(keyword_char)
+
+def hap_adjust_triggers_chart(chart, keyword_branch):
+    """대운/세운에 오면 필요오행을 조정하게 되는 지지 코드 집합을 반환합니다. (원국의 인접 지지 쌍과 키워드로 결정)"""
+    if keyword_branch is None:
+        return frozenset()
+    return frozenset(
+        HAP_ADJUST_TRIGGER_MATRIX[a][b] for a, b in chart.adjacent_branch_pairs
+        if keyword_branch in (a, b) and HAP_ADJUST_TRIGGER_MATRIX[a][b] is not None
+    )
+
+def adjust_needed_elements_for_haps_chart(chart, keyword_branch, pne1, pne2, pne3, daewoon_ji, yeonwoon_ji):
+    """
+    adjust_needed_elements_for_haps의 정수 코드 버전입니다.
+    (조정된 1순위, 조정된 2순위, 조정 여부)를 반환합니다.
+    """
+    triggers = hap_adjust_triggers_chart(chart, keyword_branch)
+    if daewoon_ji in triggers or yeonwoon_ji in triggers:
+        return pne2, pne3, True
+    return pne1, pne2, False
+
 # ==============================================================================
 # SECTION 3: 헬퍼 함수 정의 (Gemini 재작성)
 # ==============================================================================
@@ -168,10 +393,37 @@ def to_LMT(dt_kst):
     """KST(한국 표준시)를 LMT(지방 평균시)로 변환합니다. (30분 차감)"""
     return dt_kst - datetime.timedelta(minutes=30)
 
+# to_LMT가 나타내는 평균태양시의 기준 경도 (UTC+9에서 30분을 뺀 UTC+8:30 = 동경 127.5도)
+LMT_REFERENCE_LONGITUDE = 127.5
+
+def longitude_lmt_offset(longitude):
+    """동경 127.5도 평균태양시(to_LMT)에 더하면 해당 경도의 평균태양시가 되는 시간 차이 (경도 1도당 4분)"""
+    return datetime.timedelta(seconds=round((longitude - LMT_REFERENCE_LONGITUDE) * 240))
+
+def to_true_solar_time(dt_lmt, longitude=None):
+    """
+    절기 기준 LMT(동경 127.5도 평균태양시)를 출생지의 진태양시로 변환합니다. (경도 보정 + 날짜별 균시차 표)
+    경도를 모르면(국내 출생, 도시 미입력) 기준 경도 127.5도로 보고 균시차만 더합니다.
+    """
+    dt_mean = dt_lmt if longitude is None else dt_lmt + longitude_lmt_offset(longitude)
+    return dt_mean + datetime.timedelta(seconds=equation_of_time_seconds(dt_mean))
+
 def convert_lunar_to_solar(l_year, l_month, l_day, is_leap_month):
-    """공공데이터 API를 이용해 음력을 양력으로 변환합니다."""
-    api_url = "http://apis.data.go.kr/B090041/openapi/service/LrsrCldInfoService/getLunCalInfo"
-    params = {
+    """
+    음력을 양력으로 변환합니다.
+    내장 음력 표(1900~2100년)로 네트워크 없이 변환하며, 표 범위 밖의 연도만 공공데이터 API를 사용합니다.
+    """
+    if is_lunar_year_supported(l_year):
+        return lunar_to_solar(l_year, l_month, l_day, is_leap_month)
+    return convert_lunar_to_solar_from_api(l_year, l_month, l_day, is_leap_month)
+
+def convert_solar_to_lunar(solar_date):
+    """양력 날짜를 음력 (연, 월, 일, 윤달 여부) 튜플로 변환합니다. 내장 음력 표 범위 밖이면 None을 반환합니다."""
+    return solar_to_lunar(solar_date)
+
+def build_lunar_api_params(l_year, l_month, l_day, is_leap_month):
+    """음력->양력 변환 API(getLunCalInfo) 요청 파라미터를 만듭니다."""
+    return {
         "serviceKey": SERVICE_KEY_DECODED,
         "solYear": str(l_year),
         "lunYear": str(l_year),
@@ -181,103 +433,172 @@ def convert_lunar_to_solar(l_year, l_month, l_day, is_leap_month):
         "_type": "json"
     }
 
+def parse_lunar_api_response(data):
+    """음력->양력 변환 API의 JSON 응답에서 양력 날짜를 꺼냅니다. 유효한 날짜가 없으면 None을 반환합니다."""
+    if data.get('response', {}).get('body', {}).get('items'):
+        item = data['response']['body']['items'].get('item', {})
+        if item:
+            # API 응답이 단일 항목일 경우 리스트로 감싸서 처리
+            items = [item] if not isinstance(item, list) else item
+            first_item = items[0]
+            
+            sol_year = first_item.get('solYear')
+            sol_month = first_item.get('solMonth')
+            sol_day = first_item.get('solDay')
+
+            if sol_year and sol_month and sol_day:
+                return datetime.date(int(sol_year), int(sol_month), int(sol_day))
+    
+    # API에서 유효한 날짜를 받지 못한 모든 경우
+    # (디버깅을 위해 에러/정보 메시지는 원본 그대로 유지합니다)
+    if data.get('response', {}).get('header', {}).get('resultCode') != '00':
+        print(f"API 오류: {data['response']['header'].get('resultMsg')}")
+    return None
+
+def convert_lunar_to_solar_from_api(l_year, l_month, l_day, is_leap_month):
+    """공공데이터 API를 이용해 음력을 양력으로 변환합니다. 성공한 결과는 LUNAR_API_CACHE에 캐시합니다."""
+    cache_key = (l_year, l_month, l_day, bool(is_leap_month))
+    if cache_key in LUNAR_API_CACHE:
+        return LUNAR_API_CACHE[cache_key]
+
+    import requests # API를 쓰는 경로에서만 필요하므로 지연 로드합니다.
+    params = build_lunar_api_params(l_year, l_month, l_day, is_leap_month)
+
+    started = time.perf_counter()
     try:
-        response = requests.get(api_url, params=params, timeout=10)
+        response = requests.get(LUNAR_API_URL, params=params, timeout=10)
         response.raise_for_status()
         data = response.json()
-
-        if data.get('response', {}).get('body', {}).get('items'):
-            item = data['response']['body']['items'].get('item', {})
-            if item:
-                # API 응답이 단일 항목일 경우 리스트로 감싸서 처리
-                items = [item] if not isinstance(item, list) else item
-                first_item = items[0]
-                
-                sol_year = first_item.get('solYear')
-                sol_month = first_item.get('solMonth')
-                sol_day = first_item.get('solDay')
-
-                if sol_year and sol_month and sol_day:
-                    return datetime.date(int(sol_year), int(sol_month), int(sol_day))
-        
-        # API에서 유효한 날짜를 받지 못한 모든 경우
-        # (디버깅을 위해 에러/정보 메시지는 원본 그대로 유지합니다)
-        if data.get('response', {}).get('header', {}).get('resultCode') != '00':
-            print(f"API 오류: {data['response']['header'].get('resultMsg')}")
+        record_upstream_call("lunar", time.perf_counter() - started, ok=True) # 본문까지 파싱돼야 성공으로 셉니다.
+        solar_date = parse_lunar_api_response(data)
+        if solar_date is not None:
+            LUNAR_API_CACHE[cache_key] = solar_date
+        return solar_date
+
+    except json.JSONDecodeError: # requests의 JSONDecodeError는 RequestException이기도 하므로 먼저 잡습니다.
+        record_upstream_call("lunar", time.perf_counter() - started, ok=False)
+        print(f"API 응답 JSON 파싱 오류. 응답: {response.text}")
         return None
-
     except requests.exceptions.RequestException as e:
+        record_upstream_call("lunar", time.perf_counter() - started, ok=False)
         print(f"API 요청 오류: {e}")
         return None
-    except json.JSONDecodeError:
-        print(f"API 응답 JSON 파싱 오류. 응답: {response.text}")
-        return None
     except Exception as e:
         print(f"음력->양력 변환 중 예기치 않은 오류: {e}")
         return None
-    
-def get_solar_terms_from_api(year, service_key):
-    """지정된 연도의 24절기 정보를 공공데이터 API를 통해 가져옵니다."""
-    api_url = "http://apis.data.go.kr/B090041/openapi/service/SpcdeInfoService/get24DivisionsInfo"
-    params = {
+
+def build_solar_term_api_params(year, service_key):
+    """24절기 API(get24DivisionsInfo) 요청 파라미터를 만듭니다."""
+    return {
         "serviceKey": service_key,
         "solYear": str(year),
         "numOfRows": "30",
         "_type": "json"
     }
+
+def parse_solar_terms_response(year, data):
+    """24절기 API의 JSON 응답을 {절기 이름: KST datetime} 딕셔너리로 변환합니다."""
+    items = data.get('response', {}).get('body', {}).get('items', {}).get('item')
+    if not items:
+        # API 응답은 정상이나, 데이터가 없는 경우
+        return {}
+
+    # 항목이 하나일 경우 list로 만들어 일관성 유지
+    if not isinstance(items, list):
+        items = [items]
+
+    solar_terms_for_year = {}
+    for item in items:
+        try:
+            term_name = item.get('dateName')
+            date_str = str(item.get('locdate'))
+            time_str = str(item.get('kst', '1200')).zfill(4)
+
+            if term_name and len(date_str) == 8:
+                dt_obj = datetime.datetime(
+                    int(date_str[:4]), int(date_str[4:6]), int(date_str[6:8]),
+                    int(time_str[:2]), int(time_str[2:])
+                )
+                solar_terms_for_year[term_name] = dt_obj
+        except (ValueError, TypeError) as e:
+            # 개별 항목 처리 중 오류 발생 시 print하고 계속 진행
+            print(f"주의: {year}년 {term_name} 처리 중 오류 발생 - {e}")
+            continue
+    
+    return solar_terms_for_year
+
+def get_solar_terms_from_api(year, service_key):
+    """지정된 연도의 24절기 정보를 공공데이터 API를 통해 가져옵니다."""
+    import requests # API를 쓰는 경로에서만 필요하므로 지연 로드합니다.
+    params = build_solar_term_api_params(year, service_key)
     
+    started = time.perf_counter()
     try:
-        response = requests.get(api_url, params=params, timeout=10)
+        response = requests.get(SOLAR_TERM_API_URL, params=params, timeout=10)
         response.raise_for_status() # HTTP 오류 발생 시 예외 발생
         data = response.json()
+        record_upstream_call("solar_term", time.perf_counter() - started, ok=True) # 본문까지 파싱돼야 성공으로 셉니다.
+        return parse_solar_terms_response(year, data)
 
-        items = data.get('response', {}).get('body', {}).get('items', {}).get('item')
-        if not items:
-            # API 응답은 정상이나, 데이터가 없는 경우
-            return {}
-
-        # 항목이 하나일 경우 list로 만들어 일관성 유지
-        if not isinstance(items, list):
-            items = [items]
-
-        solar_terms_for_year = {}
-        for item in items:
-            try:
-                term_name = item.get('dateName')
-                date_str = str(item.get('locdate'))
-                time_str = str(item.get('kst', '1200')).zfill(4)
-
-                if term_name and len(date_str) == 8:
-                    dt_obj = datetime.datetime(
-                        int(date_str[:4]), int(date_str[4:6]), int(date_str[6:8]),
-                        int(time_str[:2]), int(time_str[2:])
-                    )
-                    solar_terms_for_year[term_name] = dt_obj
-            except (ValueError, TypeError) as e:
-                # 개별 항목 처리 중 오류 발생 시 print하고 계속 진행
-                print(f"주의: {year}년 {term_name} 처리 중 오류 발생 - {e}")
-                continue
-        
-        return solar_terms_for_year
-
+    except json.JSONDecodeError: # requests의 JSONDecodeError는 RequestException이기도 하므로 먼저 잡습니다.
+        record_upstream_call("solar_term", time.perf_counter() - started, ok=False)
+        print(f"API 응답 JSON 파싱 오류. 응답 내용: {response.text}")
+        return None
     except requests.exceptions.RequestException as e:
+        record_upstream_call("solar_term", time.perf_counter() - started, ok=False)
         print(f"API 요청 오류: {e}")
         return None # 네트워크 오류 등 요청 자체가 실패한 경우
-    except json.JSONDecodeError:
-        print(f"API 응답 JSON 파싱 오류. 응답 내용: {response.text}")
-        return None
     except Exception as e:
         print(f"절기 정보 API 호출 중 예기치 않은 오류: {e}")
         return None
     
+def load_solar_terms_for_year(calendar_year):
+    """
+    지정된 양력 연도의 24절기 정보를 {절기 이름: KST datetime} 형태로 가져옵니다.
+    기본값(local)은 천문 계산으로 네트워크 없이 구하며, SOLAR_TERM_SOURCE가 "api"일 때만 공공데이터 API를 호출합니다.
+    """
+    with stage_timer("solar_term_load"):
+        if SOLAR_TERM_SOURCE == "api":
+            return get_solar_terms_from_api(calendar_year, SERVICE_KEY_DECODED)
+        return calculate_solar_terms_for_year(calendar_year)
+
+def has_all_month_border_terms(terms):
+    """월 경계 절기(12절)가 모두 있는지 (하나라도 빠지면 그 연도는 다시 가져와야 하므로 디스크에 저장하지 않습니다)"""
+    return all(term_name in terms for term_name in PERIOD_IDX_TO_SOLAR_TERM_NAME)
+
+# 절기 계산(또는 API 호출) 결과 캐시: 잠금으로 보호되는 크기 제한 LRU + 실패 결과의 유효 시간 + (선택) 호스트 공용 sqlite 파일
+SOLAR_TERM_STORE = SolarTermStore(
+    load_solar_terms_for_year, source=SOLAR_TERM_SOURCE,
+    max_years=int(os.environ.get("SAJU_SOLAR_TERM_CACHE_YEARS", "512")),
+    negative_ttl_seconds=float(os.environ.get("SAJU_SOLAR_TERM_NEGATIVE_TTL", "300")),
+    db_path=os.environ.get("SAJU_SOLAR_TERM_DB", ""),
+    is_complete=has_all_month_border_terms,
+)
+
+def cross_check_solar_terms(calendar_year, tolerance_minutes=2):
+    """
+    천문 계산 결과를 공공데이터 API 결과와 비교합니다. (선택적 검증용)
+    허용 오차(분)를 넘는 절기만 {절기 이름: 차이(분)} 형태로 반환하며, API 호출에 실패하면 None을 반환합니다.
+    """
+    api_terms = get_solar_terms_from_api(calendar_year, SERVICE_KEY_DECODED)
+    if not api_terms:
+        return None
+    local_terms = calculate_solar_terms_for_year(calendar_year)
+    mismatches = {}
+    for term_name, api_dt in api_terms.items():
+        local_dt = local_terms.get(term_name)
+        if local_dt is None:
+            continue
+        diff_minutes = (local_dt - api_dt).total_seconds() / 60.0
+        if abs(diff_minutes) > tolerance_minutes:
+            mismatches[term_name] = diff_minutes
+    return mismatches
+
 def get_precise_jeolgi_datetime_lmt(astro_year, period_idx):
     """
     지정된 년도와 절기 순번(period_idx)에 해당하는 정확한 절기 시간을 LMT로 반환합니다.
-    내부적으로 API 호출 결과를 캐시하여 중복 호출을 방지합니다.
+    내부적으로 연도별 절기 정보를 캐시하여 중복 계산을 방지합니다.
     """
-    # 전역 변수로 선언된 캐시와 서비스 키를 사용합니다.
-    global SOLAR_TERM_TIMES_KST, SERVICE_KEY_DECODED
-    
     term_name = PERIOD_IDX_TO_SOLAR_TERM_NAME[period_idx]
     calendar_year_of_term = astro_year
     term_month_approx = MONTH_PILLAR_BORDERS[period_idx][0]
@@ -286,20 +607,15 @@ def get_precise_jeolgi_datetime_lmt(astro_year, period_idx):
     if term_month_approx < MONTH_PILLAR_BORDERS[0][0]:
         calendar_year_of_term = astro_year + 1
 
-    # 캐시에 해당 년도 절기 정보가 없으면 API를 호출하여 가져옵니다.
-    if calendar_year_of_term not in SOLAR_TERM_TIMES_KST:
-        fetched_terms = get_solar_terms_from_api(calendar_year_of_term, SERVICE_KEY_DECODED)
-        # API 호출 성공 여부와 관계없이 결과를 캐시에 저장하여 중복 호출 방지
-        SOLAR_TERM_TIMES_KST[calendar_year_of_term] = fetched_terms if fetched_terms is not None else {}
-
-    year_data = SOLAR_TERM_TIMES_KST.get(calendar_year_of_term)
+    # 캐시에 해당 년도 절기 정보가 없으면 계산(또는 API 호출)하여 가져옵니다. (실패하면 빈 딕셔너리)
+    year_data = SOLAR_TERM_STORE.get(calendar_year_of_term)
     
     # 캐시에서 정확한 절기 정보를 찾아서 LMT로 변환 후 반환합니다.
     if year_data and term_name in year_data:
         term_datetime_kst = year_data[term_name]
         return to_LMT(term_datetime_kst)
     else:
-        # API 호출에 실패했거나 데이터가 없는 경우, 대략적인 날짜로 대체합니다.
+        # (API 모드에서) 호출에 실패했거나 데이터가 없는 경우, 대략적인 날짜로 대체합니다.
         border_m, border_d = MONTH_PILLAR_BORDERS[period_idx]
         return to_LMT(datetime.datetime(calendar_year_of_term, border_m, border_d, 12, 0))
     
@@ -421,120 +737,27 @@ def get_saju_element(char):
 
 def determine_needed_elements_for_position(pos_label, char_val, full_saju_dict):
     """사주의 특정 위치 글자를 기준으로, 주변 글자와의 관계를 분석하여 해당 위치에 필요한 오행을 결정합니다."""
-    center_element = get_saju_element(char_val)
-    if not center_element:
-        return []
-
-    # '나를 돕는 세력'과 '내 힘을 빼는 세력'의 수를 셉니다.
-    in_force_count = 0
-    out_force_count = 0
-    
-    neighbor_positions = saju_position_info[pos_label]['neighbors']
-    for neighbor_pos in neighbor_positions:
-        neighbor_char = full_saju_dict.get(neighbor_pos, "")
-        neighbor_element = get_saju_element(neighbor_char)
-
-        if not neighbor_element or neighbor_element == center_element:
-            continue
-        
-        # 나를 생(生)하거나 극(剋)하는, 'in' 관계 카운트
-        if neighbor_element == saju_sheng_in.get(center_element) or neighbor_element == saju_ke_in.get(center_element):
-            in_force_count += 1
-        # 내가 생(生)하거나 극(剋)하는, 'out' 관계 카운트
-        if neighbor_element == SHENG_RELATIONS.get(center_element) or neighbor_element == KE_RELATIONS.get(center_element):
-            out_force_count += 1
-            
-    # 세력 비교를 통해 필요한 오행 관계를 반환합니다.
-    if in_force_count > out_force_count: # 세력이 강할 때 (신강)
-        # 내 힘을 빼는 관계 (식상, 재성)가 필요함
-        return [(KE_RELATIONS[center_element], 1), (SHENG_RELATIONS[center_element], 2)]
-    elif out_force_count > in_force_count: # 세력이 약할 때 (신약)
-        # 나를 돕는 관계 (인성, 관성)가 필요함
-        return [(saju_sheng_in[center_element], 1), (saju_ke_in[center_element], 2)]
-    else: # 세력이 중화될 때
-        return []
+    chart = SajuChart.from_dict(full_saju_dict)
+    needed = needed_elements_for_position_chart(chart, POSITION_TO_IDX[pos_label])
+    return [(ELEMENTS[el], priority) for priority, el in enumerate(needed, start=1)]
 
 def derive_keyword(saju_8_chars_dict, pne1_element, pne2_element):
     """
     1, 2순위 필요오행을 바탕으로 사주 원국의 키워드(대표 글자)를 도출합니다.
     순서대로 원국에 해당 오행이 있는지 찾고, 없으면 일간을 반환합니다.
     """
-    # 검색할 위치의 우선순위를 미리 정의합니다.
-    search_positions = ["월간", "시간", "연간", "월지", "일지", "시지", "연지"]
-
-    # --- 1. 1순위 필요오행(pne1_element)으로 키워드 검색 ---
-    if pne1_element:
-        for pos in search_positions:
-            char = saju_8_chars_dict.get(pos)
-            if char and get_saju_element(char) == pne1_element:
-                return char, pos # 찾으면 즉시 반환
-
-    # --- 2. 2순위 필요오행(pne2_element)으로 키워드 검색 (1순위를 못 찾았을 경우) ---
-    if pne2_element:
-        for pos in search_positions:
-            char = saju_8_chars_dict.get(pos)
-            if char and get_saju_element(char) == pne2_element:
-                return char, pos # 찾으면 즉시 반환
-
-    # --- 3. 최종 수단: 일간을 키워드로 반환 ---
-    day_master_char = saju_8_chars_dict.get("일간")
-    if day_master_char:
-        return day_master_char, "일간"
-    
-    return None, None # 일간조차 없는 예외적인 경우
+    chart = SajuChart.from_dict(saju_8_chars_dict)
+    pos_idx = derive_keyword_chart(chart, ELEMENT_TO_IDX.get(pne1_element), ELEMENT_TO_IDX.get(pne2_element))
+    return saju_8_chars_dict[PILLAR_POSITIONS[pos_idx]], PILLAR_POSITIONS[pos_idx]
 
 def calculate_needed_element_scores(saju_8_chars_dict):
     """사주팔자 전체의 균형을 보고, 각 오행이 얼마나 필요한지 점수를 계산합니다."""
-    scores = defaultdict(float)
-    for pos_label, char_val in saju_8_chars_dict.items():
-        if not char_val or pos_label not in saju_position_info:
-            continue
-        
-        needed_for_this_pos = determine_needed_elements_for_position(pos_label, char_val, saju_8_chars_dict)
-        position_weight = saju_position_info[pos_label]['weight']
-        
-        for needed_el, priority_val in needed_for_this_pos:
-            scores[needed_el] += position_weight
-            
-    max_total_possible = sum(info['weight'] for info in saju_position_info.values())
-    all_elements = ["목", "화", "토", "금", "수"]
-    final_scores = {el: 0.0 for el in all_elements}
-    
-    if max_total_possible > 0:
-        for el, score in scores.items():
-            final_scores[el] = round(score / max_total_possible, 2)
-            
-    return final_scores, {}
+    scores = calculate_needed_element_scores_chart(SajuChart.from_dict(saju_8_chars_dict))
+    return dict(zip(ELEMENTS, scores)), {}
 
 def calculate_luck_quantity_auto(saju_8_chars_dict, keyword_element, keyword_pos_label):
     """키워드 오행을 기준으로, 원국 내 다른 글자들과의 관계를 통해 '행운량'을 계산합니다."""
-    reference_el = keyword_element
-    total_score = 0
-    
-    if reference_el:
-        keyword_to_participating_positions = {
-            "연간": ["연지", "월간", "월지"], "연지": ["연간", "월간", "월지"],
-            "월간": ["연간", "연지", "월지", "일간", "일지"], "월지": ["연간", "연지", "월간", "일간", "일지"],
-            "일간": ["월간", "월지", "일지", "시간", "시지"], "일지": ["월간", "월지", "일간", "시간", "시지"],
-            "시간": ["일간", "일지", "시지"], "시지": ["일간", "일지", "시간"]
-        }
-        positions_for_score_calc = keyword_to_participating_positions.get(keyword_pos_label, [])
-        
-        if positions_for_score_calc:
-            for pos_label in positions_for_score_calc:
-                char_val = saju_8_chars_dict.get(pos_label, "")
-                if not char_val: continue
-                
-                el = get_saju_element(char_val)
-                if not el or el == reference_el: continue
-                
-                if el == saju_sheng_in.get(reference_el): total_score += 1
-                elif el == saju_ke_in.get(reference_el): total_score -= 2
-                elif el == SHENG_RELATIONS.get(reference_el): total_score -= 1
-                elif el == KE_RELATIONS.get(reference_el): total_score -= 2
-    
-    luck_quantity = abs(total_score)
-    return 1 if luck_quantity == 0 else luck_quantity
+    return calculate_luck_quantity_chart(SajuChart.from_dict(saju_8_chars_dict), ELEMENT_TO_IDX.get(keyword_element), POSITION_TO_IDX.get(keyword_pos_label))
 
 def get_base_value_for_score(char_of_luck, position_key, element_of_luck, p_el, p_val, s_el, s_val):
     """운의 글자에 대한 기본 가중치를 계산합니다. (진술축미 고려)"""
@@ -561,13 +784,12 @@ def get_yearly_daewoon_list(birth_year_solar, month_gan_char_saju, month_ji_char
     """100년치 대운의 흐름을 리스트로 생성합니다."""
     first_daewoon_start_year = birth_year_solar + daewoon_soo_val - 1
     
-    if month_gan_char_saju not in yearly_heavenly_stems:
+    gan_idx = CHEONGAN_TO_IDX.get(month_gan_char_saju)
+    ji_idx = JIJI_TO_IDX.get(month_ji_char_saju)
+    if gan_idx is None:
         raise ValueError(f"월주 천간('{month_gan_char_saju}') 오류")
-    if month_ji_char_saju not in yearly_earthly_branches:
+    if ji_idx is None:
         raise ValueError(f"월주 지지('{month_ji_char_saju}') 오류")
-        
-    gan_idx = yearly_heavenly_stems.index(month_gan_char_saju)
-    ji_idx = yearly_earthly_branches.index(month_ji_char_saju)
     
     daewoons = []
     for i in range(10):  # 10개의 대운 (100년)
@@ -586,89 +808,307 @@ def get_yearly_daewoon_list(birth_year_solar, month_gan_char_saju, month_ji_char
         
     return daewoons
 
-def calculate_yearly_luck_final(birth_year_solar, saju_8_chars, keyword_char, sorted_needed_elements, auto_luck_amount, daewoon_list_val):
+# 대운/연운 글자 위치별 가중치
+LUCK_WEIGHTS_FACTOR = {"대운_천간": 1.0, "대운_지지": 3.0, "연운_천간": 5.0, "연운_지지": 10.0}
+
+# (1순위, 2순위) 필요오행 쌍별 이론적 최대/최소 효과 점수 캐시 (최대 30가지 조합)
+THEORETICAL_EXTREMES_CACHE = {}
+
+def get_theoretical_extremes(primary_el, secondary_el):
     """
-    100년치 대운/연운의 흐름에 따른 '행운강도'를 계산하여 리스트로 반환합니다.
+    모든 대운/연운 간지 조합에 대한 이론적인 최대/최소 효과 점수를 (1순위, 2순위) 필요오행 쌍별로 한 번만 계산합니다.
+    대운 점수와 연운 점수는 서로 독립이므로, 60x60 조합의 최대(최소)는 각 60갑자 최대(최소)의 합과 같습니다.
     """
-    original_primary_el = sorted_needed_elements[0][0] if len(sorted_needed_elements) >= 1 else None
-    original_secondary_el = sorted_needed_elements[1][0] if len(sorted_needed_elements) >= 2 else None
-
-    # 필요한 오행이 없거나, 상호작용 데이터가 없으면 빈 결과를 반환하고 함수를 종료합니다.
-    if not original_primary_el or original_primary_el not in COMPLEX_INTERACTION_TABLE:
-        return [], 0.0, 0.0
+    key = (primary_el, secondary_el)
+    cached = THEORETICAL_EXTREMES_CACHE.get(key)
+    if cached is not None:
+        return cached
+
+    interaction_coeffs = COMPLEX_INTERACTION_TABLE.get(primary_el, {})
+
+    def score_extreme(ch_extreme, pos_key_extreme):
+        el_extreme_local = saju_reverse_element_mapping.get(ch_extreme)
+        if not el_extreme_local: return 0
+        base_extreme = get_base_value_for_score(ch_extreme, pos_key_extreme, el_extreme_local, primary_el, 12.0, secondary_el, 10.0)
+        inter_extreme = interaction_coeffs.get(el_extreme_local, 0.0)
+        return base_extreme * inter_extreme * LUCK_WEIGHTS_FACTOR[pos_key_extreme]
+
+    # 점수는 모두 0.5의 배수이므로 합산 순서와 무관하게 기존 60x60 전수 조사와 같은 값이 나옵니다.
+    daewoon_totals = [score_extreme(dg, '대운_천간') + score_extreme(dj, '대운_지지') for dg, dj in valid_60_gapja_list]
+    yeonwoon_totals = [score_extreme(yg, '연운_천간') + score_extreme(yj, '연운_지지') for yg, yj in valid_60_gapja_list]
+    extremes = (max(daewoon_totals) + max(yeonwoon_totals), min(daewoon_totals) + min(yeonwoon_totals))
+
+    THEORETICAL_EXTREMES_CACHE[key] = extremes
+    return extremes
+
+def luck_char_score_chart(char_code, is_branch, weight, pne1, pne2):
+    """대운/연운 글자 하나의 점수(기본 가중치 x 오행 상호작용 계수 x 위치 가중치)를 정수 코드로 계산합니다."""
+    if pne1 is None:
+        return 0.0
+    el = JIJI_ELEMENT_IDX[char_code] if is_branch else CHEONGAN_ELEMENT_IDX[char_code]
+    # 기본 가중치 (get_base_value_for_score와 같은 규칙, 지지의 진술축미는 지장간 가치 사용)
+    if is_branch and char_code in JINNSULCHUKMI_BASE_MATRIX:
+        base = JINNSULCHUKMI_BASE_MATRIX[char_code][pne1]
+    elif el == pne1:
+        base = 12.0
+    elif pne2 is not None and el == pne2:
+        base = 10.0
+    else:
+        base = 1.0
+    return base * COMPLEX_INTERACTION_MATRIX[pne1][el] * weight
+
+# 대운/연운 글자 위치별 (가중치 키, 지지 여부)
+LUCK_SCORE_POSITIONS = [("대운_천간", False), ("대운_지지", True), ("연운_천간", False), ("연운_지지", True)]
+
+# (1순위, 2순위) 필요오행 코드 쌍 -> 위치별 글자 점수표 (대운 천간[10], 대운 지지[12], 연운 천간[10], 연운 지지[12])
+# 필요오행이 없는 경우(None)까지 포함해 import 시점에 모두 만들어 둡니다. (36가지 조합)
+LUCK_CHAR_SCORE_TABLES = {
+    (pne1, pne2): tuple(
+        [luck_char_score_chart(code, is_branch, LUCK_WEIGHTS_FACTOR[pos_key], pne1, pne2) for code in range(12 if is_branch else 10)]
+        for pos_key, is_branch in LUCK_SCORE_POSITIONS
+    )
+    for pne1 in list(range(5)) + [None] for pne2 in list(range(5)) + [None]
+}
 
-    weights_factor = {"대운_천간": 1.0, "대운_지지": 3.0, "연운_천간": 5.0, "연운_지지": 10.0}
-
-    def get_theoretical_extremes():
-        """모든 간지 조합을 시뮬레이션하여 이론적인 최대/최소 효과 점수를 계산하는 내부 함수"""
-        max_total, min_total = float('-inf'), float('inf')
-        for daewoon_ganji in valid_60_gapja_list:
-            dg, dj = daewoon_ganji
-            for yeonwoon_ganji in valid_60_gapja_list:
-                yg, yj = yeonwoon_ganji
-                current_total_for_extreme = 0
-                
-                def score_extreme(ch_extreme, pos_key_extreme):
-                    el_extreme_local = saju_reverse_element_mapping.get(ch_extreme) # 수정된 부분
-                    if not el_extreme_local: return 0
-                    base_extreme = get_base_value_for_score(ch_extreme, pos_key_extreme, el_extreme_local, original_primary_el, 12.0, original_secondary_el, 10.0)
-                    interaction_coeffs = COMPLEX_INTERACTION_TABLE.get(original_primary_el, {})
-                    inter_extreme = interaction_coeffs.get(el_extreme_local, 0.0)
-                    return base_extreme * inter_extreme * weights_factor[pos_key_extreme]
-
-                current_total_for_extreme = sum([score_extreme(dg, '대운_천간'), score_extreme(dj, '대운_지지'), score_extreme(yg, '연운_천간'), score_extreme(yj, '연운_지지')])
-                if current_total_for_extreme > max_total: max_total = current_total_for_extreme
-                if current_total_for_extreme < min_total: min_total = current_total_for_extreme
-        return (max_total, min_total)
-
-    max_effect, min_effect = get_theoretical_extremes()
-    results = []
+# 같은 필요오행 쌍 -> 60갑자 순서(갑자=0)의 연운 점수(연운 천간 점수 + 연운 지지 점수)
+# 점수는 모두 0.5의 배수인 작은 값이라 대운 점수와 연운 점수를 따로 더해 두어도 합계가 정확히 같습니다.
+YEONWOON_SCORE_TABLES = {
+    key: [tables[2][g % 10] + tables[3][g % 12] for g in range(60)] for key, tables in LUCK_CHAR_SCORE_TABLES.items()
+}
 
-    for age in range(101):
-        year = birth_year_solar + age
-        y_gan, y_ji = get_yearly_gapja(year)
-        daewoon = next((d for d in daewoon_list_val if d['start'] <= year <= d['end']), None)
-        if not daewoon: continue
-            
-        effective_pne1, effective_pne2, was_adjusted = adjust_needed_elements_for_haps(
-            saju_8_chars, keyword_char, sorted_needed_elements, daewoon['ji'], y_ji
-        )
+# 60갑자 순서의 연운 지지 코드 (두 바퀴, 대운 기간이 갑자를 넘어가도 순번 그대로 쓸 수 있도록)
+YEONWOON_JI_IDX_CYCLE = [g % 12 for g in range(120)]
 
-        def score_yearly_final_inner(ch_yearly, pos_key_yearly):
-            el_yearly = saju_reverse_element_mapping.get(ch_yearly) # 수정된 부분
-            if not el_yearly: return 0
-            base_yearly = get_base_value_for_score(ch_yearly, pos_key_yearly, el_yearly, effective_pne1, 12.0, effective_pne2, 10.0)
-            interaction_coeffs = COMPLEX_INTERACTION_TABLE.get(effective_pne1, {})
-            inter_yearly = interaction_coeffs.get(el_yearly, 0.0)
-            return base_yearly * inter_yearly * weights_factor[pos_key_yearly]
+LUCK_STRENGTH_ROW_CACHE_SIZE = int(os.environ.get("SAJU_LUCK_STRENGTH_ROW_CACHE_SIZE", "16384"))
 
-        total_score_for_year = sum([score_yearly_final_inner(daewoon['gan'], '대운_천간'), score_yearly_final_inner(daewoon['ji'], '대운_지지'), score_yearly_final_inner(y_gan, '연운_천간'), score_yearly_final_inner(y_ji, '연운_지지')])
-        
+@functools.lru_cache(maxsize=LUCK_STRENGTH_ROW_CACHE_SIZE)
+def yearly_luck_strength_slice(score_key, max_effect, min_effect, auto_luck_amount, daewoon_score, was_adjusted, gapja_start, year_count):
+    """
+    대운 점수가 daewoon_score인 대운 기간에서, 60갑자 순번 gapja_start부터 year_count년 동안 각 연운의 최종 행운강도(소수 셋째 자리 반올림)를 계산합니다.
+    score_key는 연운 점수표의 (1순위, 2순위) 필요오행 코드 쌍이고, 정규화(max_effect/min_effect)는 조정 전 필요오행 기준입니다.
+    대운 기간(최대 10년)에 쓰는 해만 계산하므로 캐시가 비어 있을 때도 예전처럼 해마다 한 번씩만 계산합니다. 반환값은 튜플입니다.
+    """
+    positive_scale = max_effect if max_effect != 0 else None
+    negative_scale = abs(min_effect) if min_effect != 0 else None
+    yeonwoon_scores = YEONWOON_SCORE_TABLES[score_key]
+    values = []
+    for g in range(gapja_start, gapja_start + year_count):
+        total_score_for_year = daewoon_score + yeonwoon_scores[g % 60]
         effective_score = 0.0
-        if total_score_for_year > 0 and max_effect != 0:
-            effective_score = total_score_for_year / max_effect
-        elif total_score_for_year < 0 and min_effect != 0:
-            effective_score = total_score_for_year / abs(min_effect)
+        if total_score_for_year > 0 and positive_scale is not None:
+            effective_score = total_score_for_year / positive_scale
+        elif total_score_for_year < 0 and negative_scale is not None:
+            effective_score = total_score_for_year / negative_scale
 
         intermediate_luck_strength = (effective_score * auto_luck_amount) / 10.0
         final_luck_strength = intermediate_luck_strength / 10.0 if was_adjusted else intermediate_luck_strength
-        luck_strength = round(final_luck_strength, 3)
+        values.append(round(final_luck_strength, 3))
+    return tuple(values)
+
+# (출생 연도, 대운 목록) -> 행운강도 곡선 결과 행 목록. 같은 출생 연도와 대운 목록이 다시 오면 행을 복사해 행운강도만 바꿉니다.
+# 처음 계산한 결과 행을 그대로 틀로 보관하므로(캐시가 비어 있을 때 행을 두 번 만들지 않도록) 결과는 읽기만 해야 합니다.
+LUCK_ROW_TEMPLATE_CACHE_SIZE = int(os.environ.get("SAJU_LUCK_ROW_TEMPLATE_CACHE_SIZE", "1024"))
+LUCK_ROW_TEMPLATE_CACHE = collections.OrderedDict()
+_luck_row_template_lock = threading.Lock()
+_luck_row_template_stats = {"hits": 0, "misses": 0}
+
+def _get_luck_row_templates(template_key):
+    with _luck_row_template_lock:
+        templates = LUCK_ROW_TEMPLATE_CACHE.get(template_key)
+        if templates is None:
+            _luck_row_template_stats["misses"] += 1
+        else:
+            LUCK_ROW_TEMPLATE_CACHE.move_to_end(template_key)
+            _luck_row_template_stats["hits"] += 1
+        return templates
+
+def _put_luck_row_templates(template_key, rows):
+    if LUCK_ROW_TEMPLATE_CACHE_SIZE <= 0:
+        return
+    with _luck_row_template_lock:
+        LUCK_ROW_TEMPLATE_CACHE[template_key] = rows
+        while len(LUCK_ROW_TEMPLATE_CACHE) > LUCK_ROW_TEMPLATE_CACHE_SIZE:
+            LUCK_ROW_TEMPLATE_CACHE.popitem(last=False)
+
+def build_yearly_luck_rows(birth_year_solar, daewoon_key, luck_values):
+    """
+    행운강도 곡선 결과 행(나이, 연도, 행운강도, 대운, 연운)을 만듭니다.
+    daewoon_key는 대운 목록의 ((천간, 지지, 시작 연도, 종료 연도), ...) 튜플이며, 출생 연도와 대운 목록이 같은 사주는
+    (일주/시주가 달라도) 행운강도를 뺀 칸이 같으므로 캐시에 있는 행을 복사해 행운강도만 바꿉니다.
+    """
+    template_key = (birth_year_solar, daewoon_key)
+    templates = _get_luck_row_templates(template_key)
+    if templates is not None:
+        results = []
+        for template, luck_value in zip(templates, luck_values):
+            row = template.copy()
+            row["행운강도"] = luck_value
+            results.append(row)
+        return results
+
+    first_year, last_year = max(birth_year_solar, daewoon_key[0][2]), birth_year_solar + 100
+    results = []
+    luck_iter = iter(luck_values)
+    for gan, ji, start, end in daewoon_key:
+        for year in range(max(start, first_year), min(end, last_year) + 1):
+            gapja_idx = (year - 1984) % 60 # 1984년 갑자년 기준
+            results.append({"나이": year - birth_year_solar, "연도": year, "행운강도": next(luck_iter), "대운천간": gan, "대운지지": ji, "연운천간": CHEONGAN[gapja_idx % 10], "연운지지": JIJI[gapja_idx % 12], "대운시작": start, "대운종료": end})
+    _put_luck_row_templates(template_key, results)
+    return results
+
+def luck_row_template_cache_stats():
+    """행 틀 캐시의 적중/실패 수와 크기 (_lru_cache_stats와 같은 형식)"""
+    with _luck_row_template_lock:
+        hits, misses, size = _luck_row_template_stats["hits"], _luck_row_template_stats["misses"], len(LUCK_ROW_TEMPLATE_CACHE)
+    lookups = hits + misses
+    return {"hits": hits, "misses": misses, "size": size, "maxsize": LUCK_ROW_TEMPLATE_CACHE_SIZE, "hit_rate": round(hits / lookups, 4) if lookups else 0.0}
+
+def clear_luck_row_templates():
+    with _luck_row_template_lock:
+        LUCK_ROW_TEMPLATE_CACHE.clear()
+
+def calculate_yearly_luck_chart(birth_year_solar, chart, keyword_branch, sorted_element_codes, auto_luck_amount, daewoon_list_val):
+    """
+    calculate_yearly_luck_final의 정수 코드 버전입니다.
+    sorted_element_codes는 필요오행 코드를 순위대로 정렬한 리스트이고, daewoon_list_val은 get_yearly_daewoon_list의 결과
+    (첫 대운부터 10년 단위로 이어지는 목록)입니다. 해마다 계산하지 않고 대운 기간(10년) 단위로,
+    행운강도는 (필요오행, 행운량, 대운 점수, 60갑자 구간)별로 캐시된 값을 가져옵니다.
+    한글 글자는 결과 행을 만들 때만 사용합니다. 결과 행은 캐시와 공유될 수 있으므로 읽기만 해야 합니다.
+    """
+    original_primary_el = sorted_element_codes[0] if len(sorted_element_codes) >= 1 else None
+    original_secondary_el = sorted_element_codes[1] if len(sorted_element_codes) >= 2 else None
+    original_tertiary_el = sorted_element_codes[2] if len(sorted_element_codes) >= 3 else None
 
-        results.append({"나이": age, "연도": year, "행운강도": luck_strength, "대운천간": daewoon['gan'], "대운지지": daewoon['ji'], "연운천간": y_gan, "연운지지": y_ji, "대운시작": daewoon['start'], "대운종료": daewoon['end']})
+    # 필요한 오행이 없으면 빈 결과를 반환하고 함수를 종료합니다.
+    if original_primary_el is None:
+        return [], 0.0, 0.0
 
+    max_effect, min_effect = get_theoretical_extremes(ELEMENTS[original_primary_el], ELEMENTS[original_secondary_el] if original_secondary_el is not None else None)
+    if not daewoon_list_val:
+        return [], max_effect, min_effect
+
+    # 대운/세운 지지가 원국과 합을 완성하면 필요오행을 한 순위씩 당깁니다. (조정 전/후 점수표를 모두 준비)
+    hap_triggers = hap_adjust_triggers_chart(chart, keyword_branch)
+    normal_key, adjusted_key = (original_primary_el, original_secondary_el), (original_secondary_el, original_tertiary_el)
+    normal_tables, adjusted_tables = LUCK_CHAR_SCORE_TABLES[normal_key], LUCK_CHAR_SCORE_TABLES[adjusted_key]
+
+    # 1. 대운 기간별로 연운 행운강도를 이어 붙입니다. (첫 대운 시작 전의 해와 100세 이후는 결과에서 빠집니다)
+    first_year = max(birth_year_solar, daewoon_list_val[0]['start'])
+    last_year = birth_year_solar + 100
+    luck_values = []
+    for d in daewoon_list_val:
+        start_year = d['start'] if d['start'] > first_year else first_year
+        end_year = d['end'] if d['end'] < last_year else last_year
+        if start_year > end_year:
+            continue
+        dw_gan, dw_ji = CHEONGAN_TO_IDX[d['gan']], JIJI_TO_IDX[d['ji']]
+        gapja_start = (start_year - 1984) % 60 # 1984년 갑자년 기준
+        year_count = end_year - start_year + 1
+        if dw_ji in hap_triggers: # 대운이 합을 완성하면 그 10년은 모두 조정
+            luck_values += yearly_luck_strength_slice(adjusted_key, max_effect, min_effect, auto_luck_amount, adjusted_tables[0][dw_gan] + adjusted_tables[1][dw_ji], True, gapja_start, year_count)
+            continue
+        normal_values = yearly_luck_strength_slice(normal_key, max_effect, min_effect, auto_luck_amount, normal_tables[0][dw_gan] + normal_tables[1][dw_ji], False, gapja_start, year_count)
+        if not hap_triggers:
+            luck_values += normal_values
+        else: # 세운 지지가 합을 완성하는 해만 조정
+            adjusted_values = yearly_luck_strength_slice(adjusted_key, max_effect, min_effect, auto_luck_amount, adjusted_tables[0][dw_gan] + adjusted_tables[1][dw_ji], True, gapja_start, year_count)
+            luck_values += [
+                adjusted_values[k] if YEONWOON_JI_IDX_CYCLE[gapja_start + k] in hap_triggers else normal_values[k] for k in range(year_count)
+            ]
+
+    # 2. 결과 행: 출생 연도와 대운 목록으로 정해지는 칸에 행운강도를 채웁니다.
+    results = build_yearly_luck_rows(birth_year_solar, tuple((d['gan'], d['ji'], d['start'], d['end']) for d in daewoon_list_val), luck_values)
     return results, max_effect, min_effect
 
+def calculate_yearly_luck_final(birth_year_solar, saju_8_chars, keyword_char, sorted_needed_elements, auto_luck_amount, daewoon_list_val):
+    """
+    100년치 대운/연운의 흐름에 따른 '행운강도'를 계산하여 리스트로 반환합니다.
+    """
+    sorted_element_codes = [ELEMENT_TO_IDX[el] for el, _ in sorted_needed_elements if el in ELEMENT_TO_IDX]
+    return calculate_yearly_luck_chart(
+        birth_year_solar, SajuChart.from_dict(saju_8_chars), keyword_branch_code(keyword_char),
+        sorted_element_codes, auto_luck_amount, daewoon_list_val
+    )
+
 def calculate_overall_luck_score(luck_results_list):
     """행운강도 리스트를 받아, 특정 나이 구간의 평균 점수를 계산합니다."""
     if not luck_results_list: return 0.0
     
-    df = pd.DataFrame(luck_results_list)
-    df_filtered = df[(df['나이'] >= 21) & (df['나이'] <= 70)]
+    all_values = [row['행운강도'] for row in luck_results_list]
+    filtered_values = [row['행운강도'] for row in luck_results_list if 21 <= row['나이'] <= 70]
     
-    if df_filtered.empty:
-        return df['행운강도'].mean() if not df.empty else 0.0
+    if not filtered_values:
+        return sum(all_values) / len(all_values)
     
-    return df_filtered['행운강도'].mean()
+    return sum(filtered_values) / len(filtered_values)
+
+def _to_float_or_nan(value):
+    """숫자로 변환할 수 없는 값은 NaN으로 바꿉니다. (pd.to_numeric(errors='coerce')와 같은 동작)"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+def calculate_centered_rolling_mean(values, window=3):
+    """
+    가운데 정렬 이동평균을 계산합니다. 창이 다 차지 않는 양 끝이나 NaN이 섞인 창은 None입니다.
+    pandas의 rolling(window, center=True).mean()과 비트 단위까지 같은 값을 내도록
+    같은 누적 방식(카한 보정 합, 연속 동일값/부호 보정)을 그대로 따릅니다.
+    """
+    n = len(values)
+    offset = (window - 1) // 2
+    output = [None] * n
+    sum_x = compensation_add = compensation_remove = 0.0
+    nobs = neg_ct = 0
+    prev_value = None
+    num_consecutive_same_value = 0
+    prev_start = prev_end = 0
+
+    for i in range(n):
+        end = min(i + offset + 1, n)
+        start = max(i + offset + 1 - window, 0)
+        if i == 0 or start >= prev_end:
+            # 창이 이전 창과 겹치지 않으면 누적값을 새로 시작합니다.
+            sum_x = compensation_add = compensation_remove = 0.0
+            nobs = neg_ct = 0
+            prev_value = values[start] if start < n else None
+            num_consecutive_same_value = 0
+            remove_range, add_range = range(0), range(start, end)
+        else:
+            remove_range, add_range = range(prev_start, start), range(prev_end, end)
+
+        for j in remove_range:
+            val = values[j]
+            if math.isnan(val): continue
+            nobs -= 1
+            y = -val - compensation_remove
+            t = sum_x + y
+            compensation_remove = t - sum_x - y
+            sum_x = t
+            if math.copysign(1.0, val) < 0: neg_ct -= 1
+
+        for j in add_range:
+            val = values[j]
+            if math.isnan(val): continue
+            nobs += 1
+            y = val - compensation_add
+            t = sum_x + y
+            compensation_add = t - sum_x - y
+            sum_x = t
+            if math.copysign(1.0, val) < 0: neg_ct += 1
+            num_consecutive_same_value = num_consecutive_same_value + 1 if val == prev_value else 1
+            prev_value = val
+
+        if nobs >= window:
+            result = sum_x / nobs
+            # 부동소수점 잔여 오차 보정 (모두 같은 값이면 그 값, 부호가 모두 같으면 부호 유지)
+            if num_consecutive_same_value >= nobs: result = prev_value
+            elif neg_ct == 0 and result < 0: result = 0.0
+            elif neg_ct == nobs and result > 0: result = 0.0
+            output[i] = result
+        prev_start, prev_end = start, end
+
+    return output
 
 def get_ganji_for_year(year):
     """특정 연도의 간지를 문자열로 반환합니다. (예: "갑자")"""
@@ -746,31 +1186,27 @@ def find_cheongan_hap(saju_8_chars: dict) -> list:
     """사주 원국 내 천간합을 찾습니다."""
     results = []
     # 확인할 천간 쌍 정의 (인접한 위치만)
-    adjacent_cheongan_pairs = [
-        (saju_8_chars.get("연간"), saju_8_chars.get("월간"), "연간", "월간"),
-        (saju_8_chars.get("월간"), saju_8_chars.get("일간"), "월간", "일간"),
-        (saju_8_chars.get("일간"), saju_8_chars.get("시간"), "일간", "시간"),
-    ]
-    for c1, c2, p1_key, p2_key in adjacent_cheongan_pairs:
-        if c1 and c2 and (c1, c2) in CHEONGAN_HAP_PAIRS:
-            results.append(f"{CHEONGAN_HAP_PAIRS[(c1, c2)]} ({p1_key} {c1} - {p2_key} {c2})")
+    for p1_key, p2_key in [("연간", "월간"), ("월간", "일간"), ("일간", "시간")]:
+        c1, c2 = saju_8_chars.get(p1_key), saju_8_chars.get(p2_key)
+        if c1 in CHEONGAN_TO_IDX and c2 in CHEONGAN_TO_IDX:
+            hap_name = CHEONGAN_HAP_MATRIX[CHEONGAN_TO_IDX[c1]][CHEONGAN_TO_IDX[c2]]
+            if hap_name:
+                results.append(f"{hap_name} ({p1_key} {c1} - {p2_key} {c2})")
     
     # 중복 제거 후 반환
-    return list(set(results))
+    return sorted(set(results))
 
 def find_jiji_yukhap(saju_8_chars: dict) -> list:
     """사주 원국 내 지지육합(六合)을 찾습니다."""
     results = []
     # 확인할 인접한 지지 쌍 정의
-    adjacent_jiji_pairs = [
-        (saju_8_chars.get("연지"), saju_8_chars.get("월지"), "연-월"),
-        (saju_8_chars.get("월지"), saju_8_chars.get("일지"), "월-일"),
-        (saju_8_chars.get("일지"), saju_8_chars.get("시지"), "일-시"),
-    ]
-    for j1, j2, pos_key in adjacent_jiji_pairs:
-        if j1 and j2 and (j1, j2) in JIJI_YUKHAP_PAIRS:
-            results.append(f"{JIJI_YUKHAP_PAIRS[(j1, j2)]} ({pos_key})")
-    return list(set(results))
+    for p1_key, p2_key, pos_key in [("연지", "월지", "연-월"), ("월지", "일지", "월-일"), ("일지", "시지", "일-시")]:
+        j1, j2 = saju_8_chars.get(p1_key), saju_8_chars.get(p2_key)
+        if j1 in JIJI_TO_IDX and j2 in JIJI_TO_IDX:
+            hap_name = JIJI_YUKHAP_MATRIX[JIJI_TO_IDX[j1]][JIJI_TO_IDX[j2]]
+            if hap_name:
+                results.append(f"{hap_name} ({pos_key})")
+    return sorted(set(results))
 
 def find_jiji_samhap_or_banghap(saju_8_chars: dict, hap_list_data: list, hap_type_name: str) -> list:
     """사주 원국 내 지지 삼합/방합 및 반합을 찾습니다."""
@@ -790,7 +1226,7 @@ def find_jiji_samhap_or_banghap(saju_8_chars: dict, hap_list_data: list, hap_typ
         if len(saju_jijis_present) >= 3:
             for group in itertools.combinations(saju_jijis_present, 3):
                 group_chars = tuple(sorted(item[0] for item in group))
-                if Counter(group_chars) == Counter(required_jijis):
+                if group_chars == tuple(sorted(required_jijis)):
                     display_elements = [f"{char}({pos_key})" for char, pos_key in group]
                     results.append(f"{hap_name} ({'-'.join(display_elements)})")
                     found_full_hap = True
@@ -810,7 +1246,7 @@ def find_jiji_samhap_or_banghap(saju_8_chars: dict, hap_list_data: list, hap_typ
                     display_elements = [f"{char}({pos_key})" for char, pos_key in group]
                     results.append(f"{hap_name.replace('삼합','반합')} ({'-'.join(display_elements)})")
 
-    return list(set(results))
+    return sorted(set(results))
 
 def find_all_jiji_interactions(saju_8_chars: dict) -> list:
     """
@@ -829,32 +1265,19 @@ def find_all_jiji_interactions(saju_8_chars: dict) -> list:
         jiji2 = saju_8_chars.get(pos2_key)
 
         # 두 지지 중 하나라도 없거나, 같은 글자이면 건너뜁니다.
-        if not jiji1 or not jiji2 or jiji1 == jiji2:
+        if jiji1 not in JIJI_TO_IDX or jiji2 not in JIJI_TO_IDX or jiji1 == jiji2:
             continue
 
-        # --- 1. 충(沖) 검사 ---
-        if (jiji1, jiji2) in JIJI_CHUNG_PAIRS:
-            pos_str = f"({POSITION_NAMES_SIMPLE.get(pos1_key)}-{POSITION_NAMES_SIMPLE.get(pos2_key)})"
-            found_interactions.append(f"{JIJI_CHUNG_PAIRS[(jiji1, jiji2)]}{pos_str}")
-
-        # --- 2. 육합(六合) 검사 ---
-        if (jiji1, jiji2) in JIJI_YUKHAP_PAIRS:
-            pos_str = f"({POSITION_NAMES_SIMPLE.get(pos1_key)}-{POSITION_NAMES_SIMPLE.get(pos2_key)})"
-            found_interactions.append(f"{JIJI_YUKHAP_PAIRS[(jiji1, jiji2)]}{pos_str}")
-        
-        # --- 3. 반합(半合) 검사 (수정된 로직) ---
-        for required_jijis, hap_name in JIJI_SAMHAP_LIST:
-            # 1. 두 글자가 같은 삼합 그룹에 속하는지 확인
-            if jiji1 in required_jijis and jiji2 in required_jijis:
-                # 2. 해당 삼합의 왕지(子, 午, 卯, 酉)를 정의 (리스트의 항상 두 번째 글자)
-                wangji = required_jijis[1]
-
-                # 3. 새로운 규칙: jiji1이나 jiji2 중 하나가 반드시 왕지여야만 반합으로 인정
-                if jiji1 == wangji or jiji2 == wangji:
-                    pos_str = f"({POSITION_NAMES_SIMPLE.get(pos1_key)}-{POSITION_NAMES_SIMPLE.get(pos2_key)})"
-                    # 예: "인오술 화국 삼합" -> "인오 화국 반합"
-                    found_interactions.append(f"{jiji1}{jiji2} {hap_name.replace('삼합','반합')}{pos_str}")
-                    break
+        j1, j2 = JIJI_TO_IDX[jiji1], JIJI_TO_IDX[jiji2]
+        pos_str = f"({POSITION_NAMES_SIMPLE.get(pos1_key)}-{POSITION_NAMES_SIMPLE.get(pos2_key)})"
+        # 충(沖), 육합(六合), 반합(半合: 같은 삼합의 두 글자 중 하나가 왕지) 순으로 확인합니다.
+        if JIJI_CHUNG_MATRIX[j1][j2]:
+            found_interactions.append(f"{JIJI_CHUNG_MATRIX[j1][j2]}{pos_str}")
+        if JIJI_YUKHAP_MATRIX[j1][j2]:
+            found_interactions.append(f"{JIJI_YUKHAP_MATRIX[j1][j2]}{pos_str}")
+        if JIJI_BANHAP_MATRIX[j1][j2]:
+            # 예: "인오술 화국 삼합" -> "인오 화국 반합"
+            found_interactions.append(f"{jiji1}{jiji2} {JIJI_BANHAP_MATRIX[j1][j2]}{pos_str}")
 
     return sorted(list(set(found_interactions)))
 
@@ -939,52 +1362,14 @@ def get_all_sinsal_and_hapchung(saju_8_chars: dict) -> dict:
 
 def get_sipseong(day_master_char, target_jiji_char):
     """일간을 기준으로 특정 지지의 십성을 구합니다."""
-    if not day_master_char or not target_jiji_char: return ""
-    if day_master_char not in CHEONGAN or target_jiji_char not in JIJI: return ""
-
-    dm_element = get_saju_element(day_master_char)
-    dm_yinyang = CHEONGAN_YIN_YANG.get(day_master_char)
-    target_element = JIJI_ELEMENTS_PRIMARY.get(target_jiji_char)
+    if day_master_char not in CHEONGAN_TO_IDX or target_jiji_char not in JIJI_TO_IDX: return ""
     # 지지의 음양은 기능적 음양(절기에 따른 음양)을 사용합니다.
-    target_yinyang = JIJI_YIN_YANG_FUNCTIONAL.get(target_jiji_char)
-
-    if not all([dm_element, target_element, dm_yinyang, target_yinyang]): return ""
-
-    if dm_element == target_element:
-        return "비견" if dm_yinyang == target_yinyang else "겁재"
-    elif SHENG_RELATIONS.get(dm_element) == target_element: # 일간이 생함
-        return "식신" if dm_yinyang == target_yinyang else "상관"
-    elif saju_sheng_in.get(dm_element) == target_element: # 일간을 생함
-        return "편인" if dm_yinyang == target_yinyang else "정인"
-    elif KE_RELATIONS.get(dm_element) == target_element: # 일간이 극함
-        return "편재" if dm_yinyang == target_yinyang else "정재"
-    elif saju_ke_in.get(dm_element) == target_element: # 일간을 극함
-        return "편관" if dm_yinyang == target_yinyang else "정관"
-    return ""
+    return SIPSEONG_JIJI_MATRIX[CHEONGAN_TO_IDX[day_master_char]][JIJI_TO_IDX[target_jiji_char]]
 
 def get_sipseong_cheongan(base_cheongan_char, target_cheongan_char):
     """기준 천간을 바탕으로 다른 천간의 십성을 구합니다."""
-    if not base_cheongan_char or not target_cheongan_char: return ""
-    if base_cheongan_char not in CHEONGAN or target_cheongan_char not in CHEONGAN: return ""
-
-    base_element = get_saju_element(base_cheongan_char)
-    base_yinyang = CHEONGAN_YIN_YANG.get(base_cheongan_char)
-    target_element = get_saju_element(target_cheongan_char)
-    target_yinyang = CHEONGAN_YIN_YANG.get(target_cheongan_char)
-
-    if not all([base_element, target_element, base_yinyang, target_yinyang]): return ""
-
-    if base_element == target_element:
-        return "비견" if base_yinyang == target_yinyang else "겁재"
-    elif SHENG_RELATIONS.get(base_element) == target_element:
-        return "식신" if base_yinyang == target_yinyang else "상관"
-    elif saju_sheng_in.get(base_element) == target_element:
-        return "편인" if base_yinyang == target_yinyang else "정인"
-    elif KE_RELATIONS.get(base_element) == target_element:
-        return "편재" if base_yinyang == target_yinyang else "정재"
-    elif saju_ke_in.get(base_element) == target_element:
-        return "편관" if base_yinyang == target_yinyang else "정관"
-    return ""
+    if base_cheongan_char not in CHEONGAN_TO_IDX or target_cheongan_char not in CHEONGAN_TO_IDX: return ""
+    return SIPSEONG_CHEONGAN_MATRIX[CHEONGAN_TO_IDX[base_cheongan_char]][CHEONGAN_TO_IDX[target_cheongan_char]]
 
 def get_dynamic_monthly_ranking(saju_8_chars_dict, keyword_char_input, pne1_element_input, pne2_element_input):
     """필요오행에 따른 월운의 순위를 반환합니다."""
@@ -1009,169 +1394,356 @@ def adjust_needed_elements_for_haps(saju_8_chars, keyword_char, original_pne_lis
     조정이 발생했는지 여부도 함께 반환합니다.
     """
     # 원본 1, 2, 3순위 필요오행 추출
-    original_pne1 = original_pne_list[0][0] if len(original_pne_list) >= 1 else None
-    original_pne2 = original_pne_list[1][0] if len(original_pne_list) >= 2 else None
-    original_pne3 = original_pne_list[2][0] if len(original_pne_list) >= 3 else None
-    
-    was_adjusted = False # 조정 여부 플래그
-
-    # 이 로직이 적용되는 특정 키워드 글자들이 아니면 바로 원본값 반환
-    required_keyword_chars = ["인", "신", "사", "해", "진", "술", "축", "미"]
-    if keyword_char not in required_keyword_chars:
-        return original_pne1, original_pne2, was_adjusted
-
-    # 합을 완성시키는 특정 '운의 글자'가 오지 않으면 바로 원본값 반환
-    trigger_luck_chars = ["자", "오", "묘", "유"]
-    if daewoon_ji not in trigger_luck_chars and yeonwoon_ji not in trigger_luck_chars:
-        return original_pne1, original_pne2, was_adjusted
-
-    # 합을 구성하는 조건 정의
-    HAP_COMBOS = [
-        ((("인", "술"), "오"), ["인", "술"]), ((("인", "진"), "묘"), ["인", "진"]),
-        ((("사", "축"), "유"), ["사", "축"]), ((("사", "미"), "오"), ["사", "미"]),
-        ((("신", "진"), "자"), ["신", "진"]), ((("신", "술"), "유"), ["신", "술"]),
-        ((("해", "미"), "묘"), ["해", "미"]), ((("해", "축"), "자"), ["해", "축"]),
-    ]
+    original_pne = [original_pne_list[k][0] if len(original_pne_list) > k else None for k in range(3)]
+    pne1, pne2, was_adjusted = adjust_needed_elements_for_haps_chart(
+        SajuChart.from_dict(saju_8_chars), keyword_branch_code(keyword_char),
+        *(ELEMENT_TO_IDX.get(el) for el in original_pne), JIJI_TO_IDX.get(daewoon_ji), JIJI_TO_IDX.get(yeonwoon_ji)
+    )
+    return (ELEMENTS[pne1] if pne1 is not None else None), (ELEMENTS[pne2] if pne2 is not None else None), was_adjusted
+
+def get_city_info(city_name: str) -> tuple:
+    """
+    도시 이름을 입력받아 시간대 이름과 경도를 반환합니다. (내장 도시 지명 사전 조회, 네트워크 호출 없음)
+    성공 시: (시간대 이름, 경도) 튜플, 실패 시: (None, None)
+    """
+    city = find_city(city_name.strip()) if city_name and city_name.strip() else None
+    if city is None:
+        return (None, None)
+    return (city.timezone, city.longitude)
+
+def prepare_engine_inputs(cal_type, date_str, time_str, gender_input, is_leap_input, is_time_unknown, is_overseas, city_name="", true_solar_time=False):
+    """
+    입력값을 검증하고 사주 계산 기준 시각(LMT)으로 변환합니다. 잘못된 입력이면 ValueError를 발생시킵니다.
+    """
+    if not(len(date_str) == 8 and date_str.isdigit()): raise ValueError("YYYYMMDD 형식")
+    year_val_initial_input = int(date_str[0:4]); kst_original_month_input = int(date_str[4:6]); kst_original_day_input = int(date_str[6:8])
+    if not(1 <= kst_original_month_input <= 12): raise ValueError("월(01-12)")
+    if not(1 <= kst_original_day_input <= 31): raise ValueError("일(01-31)")
+    hour_input, minute_input = (12, 30) if is_time_unknown else (int(time_str[0:2]), int(time_str[2:4]))
+    if not is_time_unknown:
+        if not(0 <= hour_input <= 23): raise ValueError("시(00-23)")
+        if not(0 <= minute_input <= 59): raise ValueError("분(00-59)")
+    if cal_type == "음":
+        with stage_timer("lunar_conversion"):
+            solar_date_obj = convert_lunar_to_solar(year_val_initial_input, kst_original_month_input, kst_original_day_input, is_leap_input)
+        if solar_date_obj is None: raise ValueError("음력->양력 변환 실패. 유효하지 않은 날짜입니다.")
+        calc_target_solar_year, calc_target_solar_month, calc_target_solar_day = solar_date_obj.year, solar_date_obj.month, solar_date_obj.day
+    else:
+        calc_target_solar_year, calc_target_solar_month, calc_target_solar_day = year_val_initial_input, kst_original_month_input, kst_original_day_input
+    longitude = None
+    if is_overseas:
+        if not city_name: raise ValueError("해외 출생 선택 시, 도시 이름은 필수입니다.")
+        tz_name, longitude = get_city_info(city_name)
+        if not tz_name: raise ValueError(f"'{city_name}' 도시 정보를 찾을 수 없습니다.")
+        import pytz # 해외 출생 경로에서만 필요하므로 지연 로드합니다.
+        local_tz = pytz.timezone(tz_name); naive_dt = datetime.datetime(calc_target_solar_year, calc_target_solar_month, calc_target_solar_day, hour_input, minute_input)
+        local_dt = local_tz.localize(naive_dt, is_dst=None)
+        # 절기 시각과 같은 기준(KST 고정 UTC+9에서 30분 차감)으로 나타낸 출생 순간
+        datetime_kst = local_dt.astimezone(pytz.utc).replace(tzinfo=None) + datetime.timedelta(hours=9); datetime_jeolgi_lmt = to_LMT(datetime_kst)
+    else:
+        datetime_kst = datetime.datetime(calc_target_solar_year, calc_target_solar_month, calc_target_solar_day, hour_input, minute_input)
+        datetime_jeolgi_lmt = to_LMT(datetime_kst)
+        if city_name:
+            # 국내 출생은 국내 도시를 찾았을 때만 그 경도를 씁니다. (못 찾으면 예전처럼 30분 고정 보정)
+            tz_name, city_longitude = get_city_info(city_name)
+            if tz_name == "Asia/Seoul": longitude = city_longitude
+
+    # 출생지 경도를 알면 일주/시주는 그 지방의 실제 평균태양시(경도 1도당 4분)로 계산합니다.
+    # 연주/월주/대운수는 절기와 비교하는 값이라 같은 순간을 절기 기준 시각으로 나타낸 datetime_jeolgi_lmt를 씁니다.
+    # 진태양시 모드(true_solar_time)에서는 여기에 그날의 균시차까지 더해 실제 해의 위치(남중 = 12시)를 기준으로 삼습니다.
+    if true_solar_time:
+        datetime_lmt = to_true_solar_time(datetime_jeolgi_lmt, longitude)
+    else:
+        datetime_lmt = datetime_jeolgi_lmt if longitude is None else datetime_jeolgi_lmt + longitude_lmt_offset(longitude)
+
+    return {
+        "raw_inputs": {"gender_input": gender_input, "cal_type": cal_type, "date_str": date_str, "time_str": time_str, "is_leap_input": is_leap_input, "is_time_unknown": is_time_unknown, "is_overseas": is_overseas, "city_name": city_name, "true_solar_time": true_solar_time, "year_val_initial_input": year_val_initial_input, "kst_original_month_input": kst_original_month_input, "kst_original_day_input": kst_original_day_input, "hour_input": hour_input, "minute_input": minute_input},
+        "calc_target_solar_year": calc_target_solar_year,
+        "datetime_lmt": datetime_lmt,
+        "datetime_jeolgi_lmt": datetime_jeolgi_lmt,
+        "longitude": longitude
+    }
 
-    # 원국의 인접한 지지 쌍
-    adjacent_pairs = [
-        (saju_8_chars.get("연지"), saju_8_chars.get("월지")),
-        (saju_8_chars.get("월지"), saju_8_chars.get("일지")),
-        (saju_8_chars.get("일지"), saju_8_chars.get("시지")),
+def calculate_four_pillars(datetime_lmt, datetime_jeolgi_lmt=None):
+    """
+    LMT 기준 시각으로 사주팔자를 계산합니다.
+    datetime_jeolgi_lmt를 주면 연주/월주는 그 시각(같은 순간을 절기 기준 시각으로 나타낸 값)으로, 일주/시주는 datetime_lmt로 계산합니다.
+    (사주팔자 딕셔너리, 천문학적 연도, 절기 월 순번) 튜플을 반환합니다.
+    """
+    jeolgi_dt = datetime_lmt if datetime_jeolgi_lmt is None else datetime_jeolgi_lmt
+    year_gan_char, year_ji_char, year_gan_idx, astro_year = get_year_pillar(jeolgi_dt)
+    month_gan_char, month_ji_char, month_gan_idx, current_month_period_idx = get_month_pillar(jeolgi_dt, year_gan_idx, astro_year)
+    day_gan_char, day_ji_char, day_gan_idx = get_day_pillar(datetime_lmt)
+    hour_gan_char, hour_ji_char = get_hour_pillar(datetime_lmt, day_gan_idx)
+    saju_8_chars_calculated = {"연간": year_gan_char, "연지": year_ji_char, "월간": month_gan_char, "월지": month_ji_char, "일간": day_gan_char, "일지": day_ji_char, "시간": hour_gan_char, "시지": hour_ji_char}
+    return saju_8_chars_calculated, astro_year, current_month_period_idx
+
+# 사주팔자 기반 분석 결과 캐시 크기 (환경 변수로 조정 가능)
+SAJU_STATIC_CACHE_SIZE = int(os.environ.get("SAJU_STATIC_CACHE_SIZE", "50000"))
+LUCK_CURVE_CACHE_SIZE = int(os.environ.get("SAJU_LUCK_CURVE_CACHE_SIZE", "20000"))
+
+def pillars_to_key(saju_8_chars):
+    """사주팔자 딕셔너리를 캐시 키로 쓸 수 있는 8글자 튜플로 변환합니다."""
+    return tuple(saju_8_chars[pos] for pos in PILLAR_POSITIONS)
+
+@functools.lru_cache(maxsize=SAJU_STATIC_CACHE_SIZE)
+def analyze_static_pillars(pillar_key):
+    """
+    사주팔자(8글자 튜플)에만 의존하는 분석 결과(필요오행, 키워드, 행운량, 신살/합충, 한난조습)를 계산합니다.
+    같은 사주팔자는 다시 계산하지 않도록 LRU 캐시에 보관하므로, 반환값은 수정하지 말고 읽기만 해야 합니다.
+    """
+    with stage_timer("needed_elements"):
+        chart = SajuChart.from_key(pillar_key)
+        element_scores = calculate_needed_element_scores_chart(chart)
+        sorted_element_codes = sort_needed_elements(element_scores)
+        sorted_elements = [(ELEMENTS[el], element_scores[el]) for el in sorted_element_codes]
+        pne1_element, pne2_element = ELEMENTS[sorted_element_codes[0]], ELEMENTS[sorted_element_codes[1]]
+        keyword_pos_idx = derive_keyword_chart(chart, sorted_element_codes[0], sorted_element_codes[1])
+        keyword_char, keyword_pos_label = pillar_key[keyword_pos_idx], PILLAR_POSITIONS[keyword_pos_idx]
+        auto_luck_amount = calculate_luck_quantity_chart(chart, chart.elements[keyword_pos_idx], keyword_pos_idx)
+
+    saju_8_chars = dict(zip(PILLAR_POSITIONS, pillar_key))
+    with stage_timer("sinsal_hapchung"):
+        sinsal_results = get_all_sinsal_and_hapchung(saju_8_chars)
+    hjs_totals = calculate_saju_hjs_total_scores(jiji_siju=saju_8_chars.get("시지"), jiji_ilju=saju_8_chars.get("일지"), jiji_wolju=saju_8_chars.get("월지"), jiji_yeonju=saju_8_chars.get("연지"), hjs_scores_dict=HJS_SCORES_GLOBAL)
+    day_master_char = saju_8_chars.get("일간")
+    keyword_sipsin = ""
+    if day_master_char and keyword_char and keyword_pos_label:
+        if '간' in keyword_pos_label: keyword_sipsin = get_sipseong_cheongan(day_master_char, keyword_char)
+        else: keyword_sipsin = get_sipseong(day_master_char, keyword_char)
+    formatted_keyword_string = f"{keyword_char}({keyword_sipsin})" if keyword_sipsin else keyword_char
+
+    return {
+        "sorted_elements": sorted_elements, "sorted_element_codes": sorted_element_codes, "pne1": pne1_element, "pne2": pne2_element,
+        "keyword_char": keyword_char, "keyword_pos": keyword_pos_label, "keyword": formatted_keyword_string,
+        "auto_luck_amount": auto_luck_amount, "sinsal_results": sinsal_results, "hjs_totals": hjs_totals
+    }
+
+@functools.lru_cache(maxsize=LUCK_CURVE_CACHE_SIZE)
+def calculate_luck_curve_cached(pillar_key, daewoon_direction_str, daewoon_su_val, birth_year_solar):
+    """
+    100년치 행운강도 곡선을 (사주팔자, 대운 방향, 대운수, 출생 연도) 단위로 캐시하여 계산합니다.
+    반환값(리스트)은 캐시에 보관되므로 수정하지 말고 읽기만 해야 합니다.
+    """
+    static_results = analyze_static_pillars(pillar_key)
+    daewoon_list_val = get_yearly_daewoon_list(birth_year_solar, pillar_key[POSITION_TO_IDX["월간"]], pillar_key[POSITION_TO_IDX["월지"]], daewoon_su_val, (daewoon_direction_str=="순행"))
+    with stage_timer("luck_loop"):
+        yearly_luck_results, _, _ = calculate_yearly_luck_chart(
+            birth_year_solar, SajuChart.from_key(pillar_key), keyword_branch_code(static_results["keyword_char"]),
+            static_results["sorted_element_codes"], static_results["auto_luck_amount"], daewoon_list_val
+        )
+    return yearly_luck_results
+
+def _lru_cache_stats(cached_func):
+    info = cached_func.cache_info()
+    lookups = info.hits + info.misses
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "maxsize": info.maxsize, "hit_rate": round(info.hits / lookups, 4) if lookups else 0.0}
+
+def get_engine_cache_stats():
+    """사주팔자 기반 캐시들의 크기와 적중률을 반환합니다."""
+    return {
+        "static_analysis": _lru_cache_stats(analyze_static_pillars), "luck_curve": _lru_cache_stats(calculate_luck_curve_cached),
+        "luck_strength_row": _lru_cache_stats(yearly_luck_strength_slice), "luck_row_template": luck_row_template_cache_stats(),
+    }
+
+def _collect_engine_metrics():
+    """/metrics용: 사주팔자 캐시와 절기 저장소의 적중/실패 수와 크기, 음력 API 캐시 크기"""
+    lru_stats = get_engine_cache_stats()
+    store_stats = SOLAR_TERM_STORE.get_stats()
+    return [
+        ("saju_cache_hits_total", "counter", "캐시 적중 수",
+         [((("cache", name),), stats["hits"]) for name, stats in lru_stats.items()] + [((("cache", "solar_term"),), store_stats["hits"])]),
+        ("saju_cache_misses_total", "counter", "캐시 실패 수",
+         [((("cache", name),), stats["misses"]) for name, stats in lru_stats.items()] + [((("cache", "solar_term"),), store_stats["misses"])]),
+        ("saju_cache_size", "gauge", "캐시 항목 수",
+         [((("cache", name),), stats["size"]) for name, stats in lru_stats.items()]
+         + [((("cache", "solar_term"),), store_stats["size"]), ((("cache", "lunar_api"),), len(LUNAR_API_CACHE))]),
+        ("saju_solar_term_disk_hits_total", "counter", "절기 디스크 캐시 적중 수", [((), store_stats["disk_hits"])]),
+        ("saju_solar_term_load_failures_total", "counter", "절기 조회 실패 수", [((), store_stats["load_failures"])]),
     ]
 
-    for (natal_pair, luck_char), hap_members in HAP_COMBOS:
-        # 운에서 합을 완성하는 글자가 왔는지 확인
-        if daewoon_ji == luck_char or yeonwoon_ji == luck_char:
-            # 원국에 합을 구성하는 나머지 두 글자가 인접해 있는지 확인
-            for pair in adjacent_pairs:
-                if Counter(pair) == Counter(natal_pair):
-                    # 키워드가 합을 구성하는 글자 중 하나라면, 필요오행을 조정
-                    if keyword_char in hap_members:
-                        new_pne1 = original_pne2       # 2순위를 새로운 1순위로
-                        new_pne2 = original_pne3       # 3순위를 새로운 2순위로
-                        was_adjusted = True            # 조정 발생
-                        return new_pne1, new_pne2, was_adjusted
-
-    # 어떤 조건에도 해당하지 않으면 원본 필요오행을 그대로 반환
-    return original_pne1, original_pne2, was_adjusted
+register_collector(_collect_engine_metrics)
 
-def get_city_info(city_name: str) -> tuple:
+def clear_engine_caches():
+    """사주팔자 기반 캐시들을 비웁니다."""
+    analyze_static_pillars.cache_clear()
+    calculate_luck_curve_cached.cache_clear()
+    yearly_luck_strength_slice.cache_clear()
+    clear_luck_row_templates()
+
+# 미리 채워 둘 절기 연도 범위 (기본: 1900년 ~ 올해 + 1년)
+WARMUP_SOLAR_TERM_START_YEAR = int(os.environ.get("SAJU_WARMUP_START_YEAR", "1900"))
+
+def warm_up(solar_term_years=None):
     """
-    도시 이름을 입력받아 시간대 이름과 경도를 반환합니다.
-    성공 시: (시간대 이름, 경도) 튜플, 실패 시: (None, None)
+    서버가 요청을 받기 전에 조회용 테이블을 미리 만들어 첫 요청들의 지연을 없앱니다.
+    (필요오행 쌍별 이론적 최대/최소 점수, 연도별 절기 시각. 음력 표 색인은 import 시점에 이미 만들어집니다.)
+    절기 출처가 "api"이면 네트워크 호출을 피하기 위해 절기는 미리 채우지 않습니다.
+    소요 시간(초)과 채운 항목 수를 반환합니다.
     """
-    #try:
-        # Nominatim은 고유한 user_agent를 요구합니다.
-        #geolocator = Nominatim(user_agent="saju_api_v1.0")
-        #location = geolocator.geocode(city_name, language='en')
-
-        #if location:
-            #tf = TimezoneFinder()
-            # 위도와 경도를 사용해 시간대 이름을 찾음
-            #tz_name = tf.timezone_at(lng=location.longitude, lat=location.latitude)
-            #return (tz_name, location.longitude)
-        #else:
-            # 도시를 찾지 못한 경우
-            #return (None, None)
-            
-    #except Exception as e:
-        # 서버에서는 print 대신 로깅(logging)을 사용하는 것이 더 좋습니다.
-        #print(f"도시 정보 조회 중 오류 발생: {e}")
-        #return (None, None)
+    started = time.perf_counter()
+    elements = list(COMPLEX_INTERACTION_TABLE.keys())
+    for primary_el in elements:
+        for secondary_el in elements + [None]:
+            get_theoretical_extremes(primary_el, secondary_el)
+
+    if solar_term_years is None:
+        solar_term_years = range(WARMUP_SOLAR_TERM_START_YEAR, datetime.date.today().year + 2)
+    if SOLAR_TERM_SOURCE != "api":
+        for calendar_year in solar_term_years:
+            SOLAR_TERM_STORE.get(calendar_year)
+
+    return {
+        "elapsed_seconds": round(time.perf_counter() - started, 4),
+        "theoretical_extremes": len(THEORETICAL_EXTREMES_CACHE),
+        "solar_term_years": len(SOLAR_TERM_STORE),
+    }
+
+# 절기 일괄 사전 조회 기본값 (동시 조회 수, 실패한 연도의 재시도 횟수와 첫 대기 시간)
+PREFETCH_SOLAR_TERM_WORKERS = 8
+PREFETCH_SOLAR_TERM_RETRIES = 2
+PREFETCH_SOLAR_TERM_BACKOFF_SECONDS = 0.5
+
+def find_solar_term_gaps(calendar_year):
+    """해당 연도의 절기 캐시에 없는 월 경계 절기(12절) 이름 목록을 반환합니다. 이 절기들은 MONTH_PILLAR_BORDERS 근사값으로 대체됩니다."""
+    year_data = SOLAR_TERM_STORE.peek(calendar_year) or {}
+    return [term_name for term_name in PERIOD_IDX_TO_SOLAR_TERM_NAME if term_name not in year_data]
+
+def prefetch_solar_terms(start_year, end_year, max_workers=PREFETCH_SOLAR_TERM_WORKERS, retries=PREFETCH_SOLAR_TERM_RETRIES, backoff_seconds=PREFETCH_SOLAR_TERM_BACKOFF_SECONDS):
+    """
+    start_year ~ end_year(포함) 양력 연도의 절기 정보를 최대 max_workers개씩 동시에 가져와 SOLAR_TERM_STORE를 채웁니다.
+    일부 절기라도 빠진 연도는 기억된 실패를 지우고 retries번까지 (대기 시간을 두 배씩 늘리며) 다시 시도합니다.
+    (불완전한 결과는 디스크 캐시에 저장되지 않으므로 다시 시도하면 loader를 실제로 다시 호출합니다.)
+    배치 작업 전이나 배포 시점에 실행해 두면 요청 처리 중에는 절기 조회가 일어나지 않습니다.
+    {"start_year", "end_year", "years", "covered", "gaps": [{"year", "missing_terms"}], "elapsed_seconds"}를 반환합니다.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    def fetch_year(calendar_year):
+        delay = backoff_seconds
+        for attempt in range(retries + 1):
+            SOLAR_TERM_STORE.get(calendar_year)
+            missing_terms = find_solar_term_gaps(calendar_year)
+            if not missing_terms or attempt == retries:
+                return missing_terms
+            SOLAR_TERM_STORE.forget(calendar_year)
+            time.sleep(delay)
+            delay *= 2
+
+    started = time.perf_counter()
+    years = list(range(start_year, end_year + 1))
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        missing_by_year = list(executor.map(fetch_year, years))
+    gaps = [{"year": calendar_year, "missing_terms": missing_terms} for calendar_year, missing_terms in zip(years, missing_by_year) if missing_terms]
+    return {
+        "start_year": start_year, "end_year": end_year, "years": len(years), "covered": len(years) - len(gaps),
+        "gaps": gaps, "elapsed_seconds": round(time.perf_counter() - started, 4),
+    }
+
+def run_saju_engine_from_pillars(engine_inputs, saju_8_chars_calculated, astro_year, current_month_period_idx):
+    """
+    이미 계산된 사주팔자로부터 대운, 필요오행, 100년치 행운강도 등 나머지 분석을 수행합니다.
+    (일괄 처리처럼 사주팔자를 따로 계산하는 경로와 run_saju_engine이 함께 사용합니다.)
+    사주팔자에만 의존하는 부분과 행운강도 곡선은 캐시된 결과를 재사용합니다.
+    """
+    raw_inputs = engine_inputs["raw_inputs"]
+    gender_input = raw_inputs["gender_input"]
+    calc_target_solar_year = engine_inputs["calc_target_solar_year"]
+    datetime_jeolgi_lmt = engine_inputs["datetime_jeolgi_lmt"]
+    pillar_key = pillars_to_key(saju_8_chars_calculated)
+
+    # 2. 대운 및 사주팔자 기반 분석 (캐시)
+    with stage_timer("daewoon"):
+        daewoon_direction_str = get_daewoon_direction(saju_8_chars_calculated["연간"], gender_input)
+        daewoon_su_val = get_daewoon_su(datetime_jeolgi_lmt, daewoon_direction_str, astro_year, current_month_period_idx)
+        daewoon_start_year_val = (calc_target_solar_year + daewoon_su_val) - 1
+    with stage_timer("static_analysis"):
+        static_results = analyze_static_pillars(pillar_key)
+
+    # 3. 100년치 행운강도 계산 (캐시)
+    with stage_timer("luck_curve"):
+        yearly_luck_results = calculate_luck_curve_cached(pillar_key, daewoon_direction_str, daewoon_su_val, calc_target_solar_year)
+
+    # 4. 모든 계산 결과를 하나의 딕셔너리로 묶어 반환
+    return {
+        "raw_inputs": raw_inputs,
+        "saju_basics": {"pillars": saju_8_chars_calculated, "daewoon_direction": daewoon_direction_str, "daewoon_su": daewoon_su_val, "start_year_ad": daewoon_start_year_val},
+        "core_analysis_results": {"pne1": static_results["pne1"], "pne2": static_results["pne2"], "keyword": static_results["keyword"], "keyword_pos": static_results["keyword_pos"]},
+        "yearly_luck_raw_data": yearly_luck_results,
+        "sinsal_results": static_results["sinsal_results"],
+        "hjs_totals": static_results["hjs_totals"],
+        "calc_target_solar_year": calc_target_solar_year
+    }
 
-def run_saju_engine(cal_type, date_str, time_str, gender_input, is_leap_input, is_time_unknown, is_overseas, city_name=""):
+def run_saju_engine(cal_type, date_str, time_str, gender_input, is_leap_input, is_time_unknown, is_overseas, city_name="", true_solar_time=False):
     """
     모든 사주 분석 계산을 수행하고, 가공되지 않은 순수 결과 데이터 묶음을 반환하는 단일 엔진.
     """
     try:
     # 1. 입력값 검증, 날짜/시간 변환
-        if not(len(date_str) == 8 and date_str.isdigit()): raise ValueError("YYYYMMDD 형식")
-        year_val_initial_input = int(date_str[0:4]); kst_original_month_input = int(date_str[4:6]); kst_original_day_input = int(date_str[6:8])
-        if not(1 <= kst_original_month_input <= 12): raise ValueError("월(01-12)")
-        if not(1 <= kst_original_day_input <= 31): raise ValueError("일(01-31)")
-        hour_input, minute_input = (12, 30) if is_time_unknown else (int(time_str[0:2]), int(time_str[2:4]))
-        if not is_time_unknown:
-            if not(0 <= hour_input <= 23): raise ValueError("시(00-23)")
-            if not(0 <= minute_input <= 59): raise ValueError("분(00-59)")
-        if cal_type == "음":
-            solar_date_obj = convert_lunar_to_solar(year_val_initial_input, kst_original_month_input, kst_original_day_input, is_leap_input)
-            if solar_date_obj is None: raise ValueError("음력->양력 변환 실패. 유효하지 않은 날짜입니다.")
-            calc_target_solar_year, calc_target_solar_month, calc_target_solar_day = solar_date_obj.year, solar_date_obj.month, solar_date_obj.day
-        else:
-            calc_target_solar_year, calc_target_solar_month, calc_target_solar_day = year_val_initial_input, kst_original_month_input, kst_original_day_input
-        if is_overseas:
-            if not city_name: raise ValueError("해외 출생 선택 시, 도시 이름은 필수입니다.")
-            tz_name, _ = get_city_info(city_name)
-            if not tz_name: raise ValueError(f"'{city_name}' 도시 정보를 찾을 수 없습니다.")
-            local_tz = pytz.timezone(tz_name); naive_dt = datetime.datetime(calc_target_solar_year, calc_target_solar_month, calc_target_solar_day, hour_input, minute_input)
-            local_dt = local_tz.localize(naive_dt, is_dst=None); kst_tz = pytz.timezone('Asia/Seoul')
-            datetime_kst = local_dt.astimezone(kst_tz); datetime_lmt = to_LMT(datetime_kst).replace(tzinfo=None)
-        else:
-            datetime_kst = datetime.datetime(calc_target_solar_year, calc_target_solar_month, calc_target_solar_day, hour_input, minute_input)
-            datetime_lmt = to_LMT(datetime_kst).replace(tzinfo=None)
-
-    # 2. 사주팔자, 대운, 필요오행 등 분석 재료 계산
-        year_gan_char, year_ji_char, year_gan_idx, astro_year = get_year_pillar(datetime_lmt)
-        month_gan_char, month_ji_char, month_gan_idx, current_month_period_idx = get_month_pillar(datetime_lmt, year_gan_idx, astro_year)
-        day_gan_char, day_ji_char, day_gan_idx = get_day_pillar(datetime_lmt)
-        hour_gan_char, hour_ji_char = get_hour_pillar(datetime_lmt, day_gan_idx)
-        saju_8_chars_calculated = {"연간": year_gan_char, "연지": year_ji_char, "월간": month_gan_char, "월지": month_ji_char, "일간": day_gan_char, "일지": day_ji_char, "시간": hour_gan_char, "시지": hour_ji_char}
-        daewoon_direction_str = get_daewoon_direction(year_gan_char, gender_input)
-        daewoon_su_val = get_daewoon_su(datetime_lmt, daewoon_direction_str, astro_year, current_month_period_idx)
-        daewoon_start_year_val = (calc_target_solar_year + daewoon_su_val) - 1
-        needed_element_scores, _ = calculate_needed_element_scores(saju_8_chars_calculated)
-        sorted_elements = sorted(needed_element_scores.items(), key=lambda item: item[1], reverse=True)
-        pne1_element = sorted_elements[0][0] if len(sorted_elements) > 0 else None
-        pne2_element = sorted_elements[1][0] if len(sorted_elements) > 1 else None
-        keyword_char, keyword_pos_label = derive_keyword(saju_8_chars_dict=saju_8_chars_calculated, pne1_element=pne1_element, pne2_element=pne2_element)
-        final_keyword_element = get_saju_element(keyword_char)
-        auto_luck_amount = calculate_luck_quantity_auto(saju_8_chars_calculated, final_keyword_element, keyword_pos_label)
-        daewoon_list_val = get_yearly_daewoon_list(calc_target_solar_year, month_gan_char, month_ji_char, daewoon_su_val, (daewoon_direction_str=="순행"))
-    
-    # 3. 100년치 행운강도 계산
-        yearly_luck_results, _, _ = calculate_yearly_luck_final(
-            birth_year_solar=calc_target_solar_year, saju_8_chars=saju_8_chars_calculated,
-            keyword_char=keyword_char, sorted_needed_elements=sorted_elements,
-            auto_luck_amount=auto_luck_amount, daewoon_list_val=daewoon_list_val
-        )
-
-    # 4. 다른 정적 분석 결과들도 계산
-        saju_8_chars_hangeul = saju_8_chars_calculated.copy()
-        sinsal_results = get_all_sinsal_and_hapchung(saju_8_chars_hangeul)
-        hjs_totals = calculate_saju_hjs_total_scores(jiji_siju=saju_8_chars_calculated.get("시지"), jiji_ilju=saju_8_chars_calculated.get("일지"), jiji_wolju=saju_8_chars_calculated.get("월지"), jiji_yeonju=saju_8_chars_calculated.get("연지"), hjs_scores_dict=HJS_SCORES_GLOBAL)
-        day_master_char = saju_8_chars_calculated.get("일간")
-        keyword_sipsin = ""
-        if day_master_char and keyword_char and keyword_pos_label:
-            if '간' in keyword_pos_label: keyword_sipsin = get_sipseong_cheongan(day_master_char, keyword_char)
-            else: keyword_sipsin = get_sipseong(day_master_char, keyword_char)
-        formatted_keyword_string = f"{keyword_char}({keyword_sipsin})" if keyword_sipsin else keyword_char
-    
-    # 5. 모든 계산 결과를 하나의 딕셔너리로 묶어 반환
-        return {
-            "raw_inputs": {"gender_input": gender_input, "cal_type": cal_type, "date_str": date_str, "time_str": time_str, "is_leap_input": is_leap_input, "is_time_unknown": is_time_unknown, "is_overseas": is_overseas, "city_name": city_name, "year_val_initial_input": year_val_initial_input, "kst_original_month_input": kst_original_month_input, "kst_original_day_input": kst_original_day_input, "hour_input": hour_input, "minute_input": minute_input},
-            "saju_basics": {"pillars": saju_8_chars_calculated, "daewoon_direction": daewoon_direction_str, "daewoon_su": daewoon_su_val, "start_year_ad": daewoon_start_year_val},
-            "core_analysis_results": {"pne1": pne1_element, "pne2": pne2_element, "keyword": formatted_keyword_string, "keyword_pos": keyword_pos_label},
-            "yearly_luck_raw_data": yearly_luck_results,
-            "sinsal_results": sinsal_results,
-            "hjs_totals": hjs_totals,
-            "calc_target_solar_year": calc_target_solar_year
-        }
+        with stage_timer("input_preparation"):
+            engine_inputs = prepare_engine_inputs(cal_type, date_str, time_str, gender_input, is_leap_input, is_time_unknown, is_overseas, city_name, true_solar_time)
+    # 2~5. 사주팔자 계산 후 나머지 분석 수행
+        with stage_timer("four_pillars"):
+            saju_8_chars_calculated, astro_year, current_month_period_idx = calculate_four_pillars(engine_inputs["datetime_lmt"], engine_inputs["datetime_jeolgi_lmt"])
+        return run_saju_engine_from_pillars(engine_inputs, saju_8_chars_calculated, astro_year, current_month_period_idx)
 
     except Exception as e:
         return {"error": "엔진 실행 중 에러", "details": str(e), "traceback": traceback.format_exc()}
 
-def get_saju_analysis_for_api(cal_type, date_str, time_str, gender_input, is_leap_input, is_time_unknown, is_overseas, city_name=""):
+def get_saju_analysis_for_api(cal_type, date_str, time_str, gender_input, is_leap_input, is_time_unknown, is_overseas, city_name="", true_solar_time=False):
     """
     [최종본] 기본 사주 및 3년치 운세 등 모든 초기 분석 정보를 반환합니다.
     """
-    try:
-        # 1. 마스터 엔진을 호출하여 모든 기본 계산을 한 번에 수행합니다.
+    # 1. 마스터 엔진을 호출하여 모든 기본 계산을 한 번에 수행합니다.
+    with stage_timer("engine_total"):
         engine_results = run_saju_engine(
             cal_type, date_str, time_str, gender_input, 
-            is_leap_input, is_time_unknown, is_overseas, city_name
+            is_leap_input, is_time_unknown, is_overseas, city_name, true_solar_time
         )
-        
+    with stage_timer("response_build"):
+        return build_saju_analysis_response(engine_results)
+
+def iter_lifetime_luck_trend(yearly_luck_raw_data, start_year):
+    """
+    100년치 행운강도(yearly_luck_raw_data)를 API 응답의 lifetime_luck_trend 항목(연도, 나이, 대운, 연운, 행운강도, 3년 이동평균)으로
+    하나씩 만들어 냅니다. 출생 연도(start_year)부터 100년 사이의 연도만 포함합니다.
+    """
+    if not yearly_luck_raw_data:
+        return
+    luck_values = [_to_float_or_nan(row['행운강도']) for row in yearly_luck_raw_data]
+    momentum_values = calculate_centered_rolling_mean(luck_values, window=3)
+    end_year = start_year + 100
+
+    for row, luck_value, raw_momentum in zip(yearly_luck_raw_data, luck_values, momentum_values):
+        if not (start_year <= row['연도'] <= end_year):
+            continue
+        momentum = round(raw_momentum, 2) if raw_momentum is not None else None
+        if momentum is not None and momentum == -0.0:
+            momentum = 0.0
+
+        yield {
+            "year": int(row['연도']),
+            "age": int(row['나이']),
+            "daewoon": f"{row.get('대운천간', '')}{row.get('대운지지', '')}",
+            "yeonun": f"{row.get('연운천간', '')}{row.get('연운지지', '')}",
+            "luck_value": round(luck_value, 2),
+            "luck_momentum": momentum
+        }
+
+def build_lifetime_luck_trend(yearly_luck_raw_data, start_year):
+    """iter_lifetime_luck_trend의 결과를 리스트로 반환합니다."""
+    return list(iter_lifetime_luck_trend(yearly_luck_raw_data, start_year))
+
+def get_reference_year():
+    """응답의 '작년/올해/내년' 한난조습 변화를 계산할 기준 연도 (회귀 검사에서는 고정값으로 바꿔 끼웁니다)"""
+    return datetime.datetime.now().year
+
+def build_saju_analysis_response(engine_results):
+    """
+    run_saju_engine(또는 run_saju_engine_from_pillars)의 결과를 API 응답 구조로 가공합니다.
+    """
+    try:
         if "error" in engine_results:
             return engine_results
 
@@ -1183,11 +1755,10 @@ def get_saju_analysis_for_api(cal_type, date_str, time_str, gender_input, is_lea
         hjs_totals = engine_results.get("hjs_totals", {})
         yearly_luck_raw_data = engine_results.get("yearly_luck_raw_data", [])
         saju_8_chars_calculated = saju_basics.get("pillars", {})
-        current_year = datetime.datetime.now().year # 현재 연도 (예: 2025)
+        current_year = get_reference_year() # 현재 연도 (예: 2025)
 
         # 3. 3년치 한난조습 동적 변화를 계산합니다.
         yearly_hjs_scores = []
-        current_year = datetime.datetime.now().year
         years_to_check = [
             {'label': '작년', 'year': current_year - 1},
             {'label': '올해', 'year': current_year},
@@ -1204,30 +1775,7 @@ def get_saju_analysis_for_api(cal_type, date_str, time_str, gender_input, is_lea
             yearly_hjs_scores.append({"label": year_info['label'], "year": year_info['year'], "ganji": ganji_str, "scores": dynamic_scores})
 
         # 4. 평생 운세(Momentum) 데이터 계산 (100년치로 수정)
-        lifetime_luck_data = []
-        if yearly_luck_raw_data:
-            df = pd.DataFrame(yearly_luck_raw_data)
-            df['행운강도'] = pd.to_numeric(df['행운강도'], errors='coerce')
-            df['momentum'] = df['행운강도'].rolling(window=3, center=True).mean()
-        
-            start_year = raw_inputs.get("year_val_initial_input", 1900)
-            end_year = start_year + 100
-        
-            df_filtered = df[(df['연도'] >= start_year) & (df['연도'] <= end_year)].copy()
-
-        for _, row in df_filtered.iterrows():
-            momentum = round(row['momentum'], 2) if pd.notna(row['momentum']) else None
-            if momentum is not None and momentum == -0.0:
-                momentum = 0.0
-            
-            lifetime_luck_data.append({
-                "year": int(row['연도']),
-                "age": int(row['나이']),
-                "daewoon": f"{row.get('대운천간', '')}{row.get('대운지지', '')}",
-                "yeonun": f"{row.get('연운천간', '')}{row.get('연운지지', '')}",
-                "luck_value": round(row['행운강도'], 2),
-                "luck_momentum": momentum
-            })
+        lifetime_luck_data = build_lifetime_luck_trend(yearly_luck_raw_data, raw_inputs.get("year_val_initial_input", 1900))
 
         # 5. 최종 결과물을 보기 좋은 구조로 조립합니다.
         sinsal_summary_parts = []
@@ -1262,6 +1810,8 @@ def get_saju_analysis_for_api(cal_type, date_str, time_str, gender_input, is_lea
                 "lifetime_luck_trend": lifetime_luck_data
             }
         }
+        if raw_inputs.get("true_solar_time"):
+            final_result["userInput"]["trueSolarTime"] = True # 기본(평균태양시) 응답은 그대로 둡니다.
         return final_result
 
     except Exception as e:
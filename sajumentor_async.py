@@ -0,0 +1,140 @@
+import asyncio
+import json
+import time
+
+import sajumentor
+from saju_metrics import record_upstream_call
+from sajumentor import (
+    LUNAR_API_CACHE, LUNAR_API_URL, SOLAR_TERM_API_URL, SOLAR_TERM_STORE, SERVICE_KEY_DECODED,
+    build_lunar_api_params, build_solar_term_api_params, parse_lunar_api_response, parse_solar_terms_response,
+    get_saju_analysis_for_api, is_lunar_year_supported, run_saju_engine,
+)
+
+# ==============================================================================
+# 비동기(async) 분석 경로
+# 외부 API가 필요한 입력(음력 표 범위 밖 날짜, SOLAR_TERM_SOURCE="api")을 이벤트 루프를 막지 않고 미리 가져와
+# 캐시에 채운 뒤, 동기 엔진(run_saju_engine)은 네트워크 없이 캐시만 읽도록 합니다.
+# ==============================================================================
+
+# 공공데이터 API(apis.data.go.kr) 한 곳만 호출하므로 연결 수 제한이 곧 호스트당 제한입니다.
+ASYNC_HTTP_MAX_CONNECTIONS = 20
+ASYNC_HTTP_MAX_KEEPALIVE = 10
+ASYNC_HTTP_TIMEOUT_SECONDS = 10.0
+
+_ASYNC_HTTP_CLIENT = None
+# 진행 중인 동일 요청을 하나로 합치기 위한 작업 목록 (연도 / 음력 날짜 -> asyncio.Task)
+_INFLIGHT_SOLAR_TERM_FETCHES = {}
+_INFLIGHT_LUNAR_CONVERSIONS = {}
+
+def get_async_http_client():
+    """연결 풀을 공유하는 비동기 HTTP 클라이언트를 반환합니다. (처음 호출될 때 생성)"""
+    global _ASYNC_HTTP_CLIENT
+    if _ASYNC_HTTP_CLIENT is None:
+        import httpx
+        _ASYNC_HTTP_CLIENT = httpx.AsyncClient(
+            timeout=ASYNC_HTTP_TIMEOUT_SECONDS,
+            limits=httpx.Limits(max_connections=ASYNC_HTTP_MAX_CONNECTIONS, max_keepalive_connections=ASYNC_HTTP_MAX_KEEPALIVE),
+        )
+    return _ASYNC_HTTP_CLIENT
+
+async def close_async_http_client():
+    """서버 종료 시 비동기 HTTP 클라이언트의 연결 풀을 닫습니다."""
+    global _ASYNC_HTTP_CLIENT
+    if _ASYNC_HTTP_CLIENT is not None:
+        await _ASYNC_HTTP_CLIENT.aclose()
+        _ASYNC_HTTP_CLIENT = None
+
+async def _get_json_async(url, params, api):
+    """GET 요청 후 JSON 응답을 반환합니다. 요청/파싱 실패 시 None을 반환합니다. (api: 지표에 기록할 API 이름)"""
+    import httpx
+    started = time.perf_counter()
+    try:
+        response = await get_async_http_client().get(url, params=params)
+        response.raise_for_status()
+        data = response.json()
+        record_upstream_call(api, time.perf_counter() - started, ok=True) # 본문까지 파싱돼야 성공으로 셉니다.
+        return data
+    except httpx.HTTPError as e:
+        record_upstream_call(api, time.perf_counter() - started, ok=False)
+        print(f"API 요청 오류: {e}")
+        return None
+    except json.JSONDecodeError:
+        record_upstream_call(api, time.perf_counter() - started, ok=False)
+        print(f"API 응답 JSON 파싱 오류. 응답 내용: {response.text}")
+        return None
+
+async def _fetch_solar_terms_async(calendar_year):
+    data = await _get_json_async(SOLAR_TERM_API_URL, build_solar_term_api_params(calendar_year, SERVICE_KEY_DECODED), "solar_term")
+    fetched_terms = parse_solar_terms_response(calendar_year, data) if data is not None else None
+    # 동기 경로(get_precise_jeolgi_datetime_lmt)와 같은 저장소에 넣습니다. (실패는 정해진 시간 동안만 기억, 디스크 쓰기는 스레드에서)
+    await asyncio.to_thread(SOLAR_TERM_STORE.put, calendar_year, fetched_terms)
+    return fetched_terms or {}
+
+async def ensure_solar_terms_async(calendar_year):
+    """
+    해당 연도의 절기 정보가 캐시에 있도록 보장합니다.
+    같은 연도를 동시에 요청하면 API 호출은 한 번만 일어나고 나머지는 그 결과를 함께 기다립니다.
+    """
+    # 메모리에 없으면 sqlite 디스크 캐시를 읽으므로 스레드에서 조회합니다.
+    cached_terms = await asyncio.to_thread(SOLAR_TERM_STORE.peek, calendar_year)
+    if cached_terms is not None:
+        return cached_terms
+    task = _INFLIGHT_SOLAR_TERM_FETCHES.get(calendar_year)
+    if task is None:
+        task = asyncio.ensure_future(_fetch_solar_terms_async(calendar_year))
+        _INFLIGHT_SOLAR_TERM_FETCHES[calendar_year] = task
+        task.add_done_callback(lambda _: _INFLIGHT_SOLAR_TERM_FETCHES.pop(calendar_year, None))
+    return await asyncio.shield(task)
+
+async def _fetch_lunar_conversion_async(cache_key):
+    data = await _get_json_async(LUNAR_API_URL, build_lunar_api_params(*cache_key), "lunar")
+    solar_date = parse_lunar_api_response(data) if data is not None else None
+    if solar_date is not None:
+        LUNAR_API_CACHE[cache_key] = solar_date
+    return solar_date
+
+async def convert_lunar_to_solar_async(l_year, l_month, l_day, is_leap_month):
+    """convert_lunar_to_solar의 비동기 버전입니다. 내장 음력 표 범위 밖의 날짜만 API를 (중복 없이) 호출합니다."""
+    if is_lunar_year_supported(l_year):
+        return sajumentor.convert_lunar_to_solar(l_year, l_month, l_day, is_leap_month)
+    cache_key = (l_year, l_month, l_day, bool(is_leap_month))
+    if cache_key in LUNAR_API_CACHE:
+        return LUNAR_API_CACHE[cache_key]
+    task = _INFLIGHT_LUNAR_CONVERSIONS.get(cache_key)
+    if task is None:
+        task = asyncio.ensure_future(_fetch_lunar_conversion_async(cache_key))
+        _INFLIGHT_LUNAR_CONVERSIONS[cache_key] = task
+        task.add_done_callback(lambda _: _INFLIGHT_LUNAR_CONVERSIONS.pop(cache_key, None))
+    return await asyncio.shield(task)
+
+async def prefetch_engine_inputs_async(cal_type, date_str, is_leap_input):
+    """
+    run_saju_engine이 필요로 하는 외부 데이터(음력 변환, 절기)를 미리 비동기로 가져와 캐시에 채웁니다.
+    입력값이 잘못된 경우에는 아무것도 하지 않으며, 오류 메시지는 동기 엔진이 그대로 만들어 냅니다.
+    """
+    try:
+        if not (len(date_str) == 8 and date_str.isdigit()):
+            return
+        year, month, day = int(date_str[0:4]), int(date_str[4:6]), int(date_str[6:8])
+        solar_year = year
+        if cal_type == "음":
+            solar_date = await convert_lunar_to_solar_async(year, month, day, is_leap_input)
+            if solar_date is None:
+                return
+            solar_year = solar_date.year
+
+        if sajumentor.SOLAR_TERM_SOURCE == "api":
+            # 입춘 이전 출생(전년도 절기), 해외 출생의 날짜 변경, 다음 해 소한까지 모두 포함합니다.
+            await asyncio.gather(*(ensure_solar_terms_async(y) for y in (solar_year - 1, solar_year, solar_year + 1)))
+    except Exception as e:
+        print(f"비동기 사전 조회 중 오류: {e}")
+
+async def run_saju_engine_async(cal_type, date_str, time_str, gender_input, is_leap_input, is_time_unknown, is_overseas, city_name="", true_solar_time=False):
+    """외부 I/O를 비동기로 미리 처리한 뒤 run_saju_engine을 스레드에서 실행합니다. (CPU 계산이 이벤트 루프를 막지 않도록)"""
+    await prefetch_engine_inputs_async(cal_type, date_str, is_leap_input)
+    return await asyncio.to_thread(run_saju_engine, cal_type, date_str, time_str, gender_input, is_leap_input, is_time_unknown, is_overseas, city_name, true_solar_time)
+
+async def get_saju_analysis_for_api_async(cal_type, date_str, time_str, gender_input, is_leap_input, is_time_unknown, is_overseas, city_name="", true_solar_time=False):
+    """get_saju_analysis_for_api의 비동기 버전입니다. (/analysis 엔드포인트용, 계산은 스레드에서 실행)"""
+    await prefetch_engine_inputs_async(cal_type, date_str, is_leap_input)
+    return await asyncio.to_thread(get_saju_analysis_for_api, cal_type, date_str, time_str, gender_input, is_leap_input, is_time_unknown, is_overseas, city_name, true_solar_time)
@@ -0,0 +1,240 @@
+import collections
+import datetime
+import json
+import threading
+import time
+
+# ==============================================================================
+# 연도별 24절기 저장소
+# - 메모리: 크기 제한이 있는 LRU (연도 -> {절기 이름: KST datetime}), 모든 접근은 잠금으로 보호합니다.
+# - 같은 연도를 여러 스레드가 동시에 요청하면 계산/API 호출은 한 번만 하고 나머지는 그 결과를 기다립니다. (single-flight)
+# - 실패한 조회(API 오류, 빈 응답)와 일부 절기가 빠진 결과는 negative_ttl_seconds 동안만 기억하고, 그 뒤에는 다시 시도합니다.
+# - db_path를 주면 완전한 결과만 sqlite 파일에 저장하여 같은 호스트의 모든 워커와 재시작 후에도 공유합니다.
+# ==============================================================================
+
+class SolarTermStore:
+    """
+    loader(calendar_year)는 {절기 이름: KST datetime}을 반환하고, 실패하면 None(또는 빈 딕셔너리)을 반환해야 합니다.
+    is_complete(terms)는 결과에 필요한 절기가 모두 있는지 판단합니다. (기본: 비어 있지 않으면 완전)
+    get()이 반환하는 딕셔너리는 저장소와 공유되므로 수정하지 말고 읽기만 해야 합니다.
+    """
+
+    def __init__(self, loader, source="local", max_years=512, negative_ttl_seconds=300.0, db_path=None, is_complete=bool):
+        self._loader = loader
+        self._is_complete = is_complete
+        self.source = source # 디스크 캐시에서 절기 출처(local/api)별로 결과를 구분하는 키
+        self.max_years = max_years
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.db_path = db_path or None
+        self._entries = collections.OrderedDict() # 연도 -> (절기 딕셔너리, 만료 시각 또는 None)
+        self._lock = threading.Lock()
+        self._inflight = {} # 연도 -> threading.Event (계산/호출 진행 중)
+        self._stats = {"hits": 0, "misses": 0, "disk_hits": 0, "loads": 0, "load_failures": 0, "evictions": 0}
+        self._db_ready = False
+
+    # --- 메모리 캐시 (호출하는 쪽에서 self._lock을 잡고 있어야 합니다) ---
+    def _get_memory(self, calendar_year):
+        entry = self._entries.get(calendar_year)
+        if entry is None:
+            return None
+        terms, expires_at = entry
+        if expires_at is not None and time.monotonic() >= expires_at:
+            del self._entries[calendar_year]
+            return None
+        self._entries.move_to_end(calendar_year)
+        return terms
+
+    def _put_memory(self, calendar_year, terms):
+        expires_at = None if terms and self._is_complete(terms) else time.monotonic() + self.negative_ttl_seconds
+        self._entries[calendar_year] = (terms or {}, expires_at)
+        self._entries.move_to_end(calendar_year)
+        while len(self._entries) > self.max_years:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    # --- 디스크 캐시 (sqlite) ---
+    def _connect(self):
+        import sqlite3
+        connection = sqlite3.connect(self.db_path, timeout=10)
+        if not self._db_ready:
+            connection.execute("PRAGMA journal_mode=WAL") # 여러 워커가 읽는 동안에도 쓸 수 있도록
+            connection.execute("CREATE TABLE IF NOT EXISTS solar_terms (source TEXT NOT NULL, year INTEGER NOT NULL, terms TEXT NOT NULL, PRIMARY KEY (source, year))")
+            connection.commit()
+            self._db_ready = True
+        return connection
+
+    def _read_disk(self, calendar_year):
+        if not self.db_path:
+            return None
+        import sqlite3
+        try:
+            connection = self._connect()
+            try:
+                row = connection.execute("SELECT terms FROM solar_terms WHERE source = ? AND year = ?", (self.source, calendar_year)).fetchone()
+            finally:
+                connection.close()
+        except sqlite3.Error as e:
+            print(f"절기 디스크 캐시 읽기 오류: {e}")
+            return None
+        if not row:
+            return None
+        terms = _terms_from_json(row[0])
+        return terms if terms and self._is_complete(terms) else None # 불완전한 행(이전 버전이 저장한 것)은 없는 것으로 봅니다.
+
+    def _write_disk(self, terms_by_year):
+        # 일부 절기가 빠진 결과는 저장하지 않습니다. (디스크에 남으면 다시 시도해도 그 값을 읽게 되므로)
+        terms_by_year = {calendar_year: terms for calendar_year, terms in terms_by_year.items() if terms and self._is_complete(terms)}
+        if not self.db_path or not terms_by_year:
+            return
+        import sqlite3
+        try:
+            connection = self._connect()
+            try:
+                with connection:
+                    connection.executemany(
+                        "INSERT OR REPLACE INTO solar_terms (source, year, terms) VALUES (?, ?, ?)",
+                        [(self.source, calendar_year, _terms_to_json(terms)) for calendar_year, terms in terms_by_year.items()],
+                    )
+            finally:
+                connection.close()
+        except sqlite3.Error as e:
+            print(f"절기 디스크 캐시 쓰기 오류: {e}")
+
+    # --- 공개 API ---
+    def get(self, calendar_year):
+        """해당 연도의 절기 딕셔너리를 반환합니다. 없으면 디스크 캐시 -> loader 순으로 가져오며, 실패하면 빈 딕셔너리를 반환합니다."""
+        while True:
+            with self._lock:
+                terms = self._get_memory(calendar_year)
+                if terms is not None:
+                    self._stats["hits"] += 1
+                    return terms
+                event = self._inflight.get(calendar_year)
+                is_owner = event is None
+                if is_owner:
+                    self._stats["misses"] += 1
+                    event = self._inflight[calendar_year] = threading.Event()
+            if not is_owner:
+                # 다른 스레드가 같은 연도를 가져오는 중이면 끝날 때까지 기다렸다가 메모리에서 다시 읽습니다.
+                event.wait()
+                continue
+            try:
+                return self._load(calendar_year)
+            finally:
+                with self._lock:
+                    self._inflight.pop(calendar_year, None)
+                event.set()
+
+    def _load(self, calendar_year):
+        terms = self._read_disk(calendar_year)
+        if terms is not None:
+            with self._lock:
+                self._stats["disk_hits"] += 1
+                self._put_memory(calendar_year, terms)
+            return terms
+        try:
+            terms = self._loader(calendar_year)
+        except Exception as e:
+            print(f"{calendar_year}년 절기 정보를 가져오지 못했습니다: {e}")
+            terms = None
+        self.put(calendar_year, terms)
+        return terms or {}
+
+    def peek(self, calendar_year):
+        """loader를 호출하지 않고 메모리/디스크 캐시에 있는 값만 반환합니다. 없으면 None (실패가 기억된 연도는 빈 딕셔너리)."""
+        with self._lock:
+            terms = self._get_memory(calendar_year)
+        if terms is not None:
+            return terms
+        terms = self._read_disk(calendar_year)
+        if terms is not None:
+            with self._lock:
+                self._stats["disk_hits"] += 1
+                self._put_memory(calendar_year, terms)
+        return terms
+
+    def put(self, calendar_year, terms):
+        """
+        가져온 결과를 저장합니다. 비어 있거나(None/{}) 일부 절기가 빠졌으면 실패로 보고 negative_ttl_seconds 동안만 메모리에 기억하며,
+        디스크에는 완전한 결과만 씁니다.
+        """
+        with self._lock:
+            self._stats["loads"] += 1
+            if not terms or not self._is_complete(terms):
+                self._stats["load_failures"] += 1
+            self._put_memory(calendar_year, terms)
+        self._write_disk({calendar_year: terms})
+
+    def preload_from_file(self, path):
+        """
+        {"연도": {"절기 이름": "ISO 형식 KST 시각", ...}, ...} 형식의 JSON 파일을 읽어 캐시(메모리와 디스크)를 채웁니다.
+        채운 연도 수를 반환합니다.
+        """
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        terms_by_year = {int(calendar_year): _terms_from_dict(terms) for calendar_year, terms in data.items() if terms}
+        with self._lock:
+            for calendar_year, terms in terms_by_year.items():
+                self._put_memory(calendar_year, terms)
+        self._write_disk(terms_by_year)
+        return len(terms_by_year)
+
+    def export_to_file(self, path):
+        """메모리에 있는 (성공한) 연도들을 preload_from_file이 읽을 수 있는 JSON 파일로 저장하고, 저장한 연도 수를 반환합니다."""
+        with self._lock:
+            snapshot = {calendar_year: terms for calendar_year, (terms, expires_at) in self._entries.items() if terms}
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({str(y): _terms_to_dict(snapshot[y]) for y in sorted(snapshot)}, f, ensure_ascii=False, indent=1)
+        return len(snapshot)
+
+    def snapshot(self):
+        """메모리에 있는 (성공한) 연도들의 {연도: {절기 이름: KST datetime}} 사본을 반환합니다. (다른 프로세스에 넘겨줄 때)"""
+        with self._lock:
+            return {calendar_year: dict(terms) for calendar_year, (terms, expires_at) in self._entries.items() if terms}
+
+    def restore(self, terms_by_year):
+        """snapshot()의 결과로 메모리 캐시를 채우고 채운 연도 수를 반환합니다. (디스크에는 쓰지 않습니다)"""
+        with self._lock:
+            for calendar_year, terms in terms_by_year.items():
+                if terms:
+                    self._put_memory(calendar_year, terms)
+        return len(terms_by_year)
+
+    def cached_years(self):
+        """메모리에 절기 정보가 있는 (성공한) 연도 목록을 반환합니다."""
+        with self._lock:
+            return sorted(calendar_year for calendar_year, (terms, _) in self._entries.items() if terms)
+
+    def forget(self, calendar_year):
+        """해당 연도를 메모리 캐시에서 지웁니다. (기억된 실패를 유효 시간 전에 다시 시도할 때)"""
+        with self._lock:
+            self._entries.pop(calendar_year, None)
+
+    def clear(self):
+        """메모리 캐시를 비웁니다. (디스크 캐시는 그대로 둡니다)"""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self):
+        with self._lock:
+            return {**self._stats, "size": len(self._entries), "max_years": self.max_years, "db_path": self.db_path}
+
+    def __contains__(self, calendar_year):
+        with self._lock:
+            return self._get_memory(calendar_year) is not None
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+def _terms_to_dict(terms):
+    return {term_name: dt.isoformat() for term_name, dt in terms.items()}
+
+def _terms_from_dict(data):
+    return {term_name: datetime.datetime.fromisoformat(value) for term_name, value in data.items()}
+
+def _terms_to_json(terms):
+    return json.dumps(_terms_to_dict(terms), ensure_ascii=False)
+
+def _terms_from_json(text):
+    return _terms_from_dict(json.loads(text))
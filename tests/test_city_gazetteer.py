@@ -0,0 +1,28 @@
+"""내장 도시 지명 사전(city_gazetteer.find_city)의 국가코드 처리를 확인합니다."""
+import pytest
+
+from city_gazetteer import find_city
+from sajumentor import get_saju_analysis_for_api, prepare_engine_inputs
+
+
+@pytest.mark.parametrize("query,country,timezone", [
+    ("London, GB", "GB", "Europe/London"),
+    ("Birmingham, US", "US", "America/Chicago"),
+    ("Birmingham, GB", "GB", "Europe/London"),
+    ("Londn, GB", "GB", "Europe/London"), # 오타 허용
+    ("Seoul, Korea", "KR", "Asia/Seoul"), # 국가코드가 아닌 덧붙임은 무시
+])
+def test_find_city_with_country(query, country, timezone):
+    city = find_city(query)
+    assert (city.country, city.timezone) == (country, timezone)
+
+
+@pytest.mark.parametrize("query", ["London, CA", "Londn, CA"])
+def test_unmatched_country_code_returns_none(query):
+    assert find_city(query) is None
+
+
+def test_unmatched_country_code_is_an_input_error():
+    with pytest.raises(ValueError, match="도시 정보를 찾을 수 없습니다"):
+        prepare_engine_inputs("양", "19900101", "1230", "남", False, False, True, "London, CA")
+    assert "error" in get_saju_analysis_for_api("양", "19900101", "1230", "남", False, False, True, "London, CA")
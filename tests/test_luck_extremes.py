@@ -0,0 +1,95 @@
+"""
+행운강도 정규화에 쓰는 이론적 최대/최소 점수 조회(get_theoretical_extremes)가
+예전의 60x60 전수 조사와 같은 값을 내는지, 그리고 행운강도 곡선이 예전 연도별 계산과 같은지 확인합니다.
+"""
+import itertools
+import random
+
+import pytest
+
+import sajumentor
+from sajumentor import (
+    COMPLEX_INTERACTION_TABLE, ELEMENTS, LUCK_WEIGHTS_FACTOR, adjust_needed_elements_for_haps, analyze_static_pillars,
+    calculate_yearly_luck_final, get_base_value_for_score, get_theoretical_extremes, get_yearly_daewoon_list, get_yearly_gapja,
+    saju_reverse_element_mapping, valid_60_gapja_list,
+)
+
+# (1순위, 2순위) 필요오행 쌍: 5 x (5 + 없음) = 30가지
+ELEMENT_PAIRS = list(itertools.product(ELEMENTS, ELEMENTS + [None]))
+
+
+def reference_score(ch, pos_key, primary_el, secondary_el):
+    """예전 calculate_yearly_luck_final 안의 score_extreme / score_yearly_final_inner와 같은 계산"""
+    el = saju_reverse_element_mapping.get(ch)
+    if not el:
+        return 0
+    base = get_base_value_for_score(ch, pos_key, el, primary_el, 12.0, secondary_el, 10.0)
+    return base * COMPLEX_INTERACTION_TABLE.get(primary_el, {}).get(el, 0.0) * LUCK_WEIGHTS_FACTOR[pos_key]
+
+
+def reference_extremes(primary_el, secondary_el):
+    """예전 구현: 대운 60갑자 x 연운 60갑자 전체 조합의 최대/최소 합계 (글자 점수만 미리 계산)"""
+    score = {
+        (ch, pos_key): reference_score(ch, pos_key, primary_el, secondary_el)
+        for pos_key in LUCK_WEIGHTS_FACTOR for gapja in valid_60_gapja_list for ch in gapja
+    }
+    max_total, min_total = float('-inf'), float('inf')
+    for dg, dj in valid_60_gapja_list:
+        for yg, yj in valid_60_gapja_list:
+            total = sum([score[dg, '대운_천간'], score[dj, '대운_지지'], score[yg, '연운_천간'], score[yj, '연운_지지']])
+            max_total = max(max_total, total)
+            min_total = min(min_total, total)
+    return (max_total, min_total)
+
+
+def reference_luck_curve(birth_year_solar, saju_8_chars, keyword_char, sorted_needed_elements, auto_luck_amount, daewoon_list_val):
+    """예전 calculate_yearly_luck_final: 해마다 필요오행을 조정하고 네 글자 점수를 더해 정규화합니다."""
+    primary_el = sorted_needed_elements[0][0]
+    secondary_el = sorted_needed_elements[1][0] if len(sorted_needed_elements) >= 2 else None
+    max_effect, min_effect = reference_extremes(primary_el, secondary_el)
+    results = []
+    for age in range(101):
+        year = birth_year_solar + age
+        y_gan, y_ji = get_yearly_gapja(year)
+        daewoon = next((d for d in daewoon_list_val if d['start'] <= year <= d['end']), None)
+        if not daewoon:
+            continue
+        pne1, pne2, was_adjusted = adjust_needed_elements_for_haps(saju_8_chars, keyword_char, sorted_needed_elements, daewoon['ji'], y_ji)
+        total = sum([
+            reference_score(daewoon['gan'], '대운_천간', pne1, pne2), reference_score(daewoon['ji'], '대운_지지', pne1, pne2),
+            reference_score(y_gan, '연운_천간', pne1, pne2), reference_score(y_ji, '연운_지지', pne1, pne2),
+        ])
+        effective_score = 0.0
+        if total > 0 and max_effect != 0:
+            effective_score = total / max_effect
+        elif total < 0 and min_effect != 0:
+            effective_score = total / abs(min_effect)
+        luck_strength = (effective_score * auto_luck_amount) / 10.0
+        if was_adjusted:
+            luck_strength /= 10.0
+        results.append({"나이": age, "연도": year, "행운강도": round(luck_strength, 3), "대운천간": daewoon['gan'], "대운지지": daewoon['ji'], "연운천간": y_gan, "연운지지": y_ji, "대운시작": daewoon['start'], "대운종료": daewoon['end']})
+    return results, max_effect, min_effect
+
+
+@pytest.mark.parametrize("primary_el,secondary_el", ELEMENT_PAIRS)
+def test_theoretical_extremes_match_exhaustive_search(primary_el, secondary_el):
+    sajumentor.THEORETICAL_EXTREMES_CACHE.clear()
+    expected = reference_extremes(primary_el, secondary_el)
+    assert get_theoretical_extremes(primary_el, secondary_el) == expected
+    assert get_theoretical_extremes(primary_el, secondary_el) == expected # 캐시에서 읽은 값
+
+
+def _sample_charts(count, seed=20260101):
+    rng = random.Random(seed)
+    for _ in range(count):
+        pillar_key = tuple(ch for _ in range(4) for ch in valid_60_gapja_list[rng.randrange(60)])
+        yield pillar_key, rng.randint(1920, 2030), rng.randint(1, 10), rng.random() < 0.5
+
+
+@pytest.mark.parametrize("pillar_key,birth_year,daewoon_su,forward", list(_sample_charts(40)))
+def test_luck_curve_matches_per_year_reference(pillar_key, birth_year, daewoon_su, forward):
+    static_results = analyze_static_pillars(pillar_key)
+    saju_8_chars = dict(zip(sajumentor.PILLAR_POSITIONS, pillar_key))
+    daewoon_list_val = get_yearly_daewoon_list(birth_year, saju_8_chars["월간"], saju_8_chars["월지"], daewoon_su, forward)
+    args = (birth_year, saju_8_chars, static_results["keyword_char"], static_results["sorted_elements"], static_results["auto_luck_amount"], daewoon_list_val)
+    assert calculate_yearly_luck_final(*args) == reference_luck_curve(*args)
@@ -0,0 +1,61 @@
+"""
+내장 음력 표(lunar_calendar)를 공공데이터 음양력 정보(getLunCalInfo) 응답 형식의 대응표
+(tests/fixtures/lunar_api_answers.json)와 양방향으로 비교합니다. 윤달(2020 윤4월, 2023 윤2월, 2033 윤11월 등)을 포함합니다.
+"""
+import datetime
+import json
+import os
+
+import pytest
+
+from lunar_calendar import lunar_to_solar, solar_to_lunar
+from sajumentor import parse_lunar_api_response
+
+FIXTURE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "lunar_api_answers.json")
+
+with open(FIXTURE_PATH, encoding="utf-8") as f:
+    API_ITEMS = json.load(f)["items"]
+
+
+def _case_id(item):
+    return f"{item['lunYear']}-{item['lunLeapmonth']}{item['lunMonth']}-{item['lunDay']}"
+
+
+def _solar_date(item):
+    return parse_lunar_api_response({"response": {"header": {"resultCode": "00"}, "body": {"items": {"item": item}}}})
+
+
+@pytest.mark.parametrize("item", API_ITEMS, ids=_case_id)
+def test_lunar_to_solar_matches_api(item):
+    is_leap = item["lunLeapmonth"] == "윤"
+    assert lunar_to_solar(int(item["lunYear"]), int(item["lunMonth"]), int(item["lunDay"]), is_leap) == _solar_date(item)
+
+
+@pytest.mark.parametrize("item", API_ITEMS, ids=_case_id)
+def test_solar_to_lunar_matches_api(item):
+    is_leap = item["lunLeapmonth"] == "윤"
+    assert solar_to_lunar(_solar_date(item)) == (int(item["lunYear"]), int(item["lunMonth"]), int(item["lunDay"]), is_leap)
+
+
+def test_fixture_covers_required_leap_months():
+    leap_months = {(int(item["lunYear"]), int(item["lunMonth"])) for item in API_ITEMS if item["lunLeapmonth"] == "윤"}
+    assert {(2020, 4), (2023, 2), (2033, 11)} <= leap_months
+
+
+@pytest.mark.parametrize("l_year,l_month,l_day,is_leap", [
+    (2021, 4, 1, True),   # 윤달이 없는 해
+    (2020, 5, 1, True),   # 윤달이 아닌 달
+    (2020, 4, 30, True),  # 윤4월은 29일까지
+    (1899, 1, 1, False),  # 표 범위 밖
+    (2101, 1, 1, False),
+])
+def test_lunar_to_solar_rejects_nonexistent_dates(l_year, l_month, l_day, is_leap):
+    assert lunar_to_solar(l_year, l_month, l_day, is_leap) is None
+
+
+def test_round_trip_over_table_range():
+    day = datetime.date(1900, 1, 31)
+    while day <= datetime.date(2100, 12, 31):
+        lunar = solar_to_lunar(day)
+        assert lunar is not None and lunar_to_solar(*lunar) == day, day
+        day += datetime.timedelta(days=1)
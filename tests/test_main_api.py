@@ -0,0 +1,31 @@
+"""main.app의 HTTP 동작(일괄 분석 입력 처리, 응답 헤더)을 확인합니다."""
+import json
+
+from fastapi.testclient import TestClient
+
+import main
+
+client = TestClient(main.app)
+
+
+def test_batch_reports_non_object_lines_as_parse_errors():
+    body = '{"birth": "19900101", "gender": "남"}\n[1]\n{bad\n\n"text"\n'
+    response = client.post("/analysis/batch", content=body.encode("utf-8"))
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert len(lines) == 4
+    assert "error" not in lines[0]
+    assert all(line["error"] == "JSON 파싱 오류" for line in lines[1:])
+    assert lines[1]["details"] == lines[3]["details"] == "한 줄에 JSON 객체 하나가 있어야 합니다."
+    assert response.headers["X-Batch-Errors"] == "3"
+
+
+def test_analysis_cache_hit_sends_same_header_set_as_miss():
+    main.ANALYSIS_RESPONSE_CACHE.clear()
+    params = {"birth": "19900101", "gender": "여", "time": "0930"}
+    miss = client.get("/analysis", params=params)
+    hit = client.get("/analysis", params=params)
+    assert (miss.headers["X-Response-Cache"], hit.headers["X-Response-Cache"]) == ("miss", "hit")
+    assert hit.content == miss.content
+    assert hit.headers["X-Response-Bytes"] == miss.headers["X-Response-Bytes"]
+    assert hit.headers["X-Encode-Ms"] == "0.000"
+    assert float(miss.headers["X-Encode-Ms"]) >= 0
@@ -0,0 +1,144 @@
+"""
+관계 행렬(십성/천간합/지지 육합·충·반합/합에 의한 필요오행 조정) 조회표가
+예전의 딕셔너리·분기 기반 구현과 가능한 모든 입력 조합에서 같은 결과를 내는지 확인합니다.
+"""
+import itertools
+from collections import Counter
+
+import pytest
+
+from sajumentor import (
+    CHEONGAN, JIJI, CHEONGAN_YIN_YANG, JIJI_ELEMENTS_PRIMARY, JIJI_YIN_YANG_FUNCTIONAL,
+    CHEONGAN_HAP_PAIRS, JIJI_YUKHAP_PAIRS, JIJI_CHUNG_PAIRS, JIJI_SAMHAP_LIST,
+    SHENG_RELATIONS, KE_RELATIONS, saju_sheng_in, saju_ke_in, saju_reverse_element_mapping,
+    get_sipseong, get_sipseong_cheongan, find_cheongan_hap, find_jiji_yukhap, find_all_jiji_interactions, adjust_needed_elements_for_haps,
+)
+
+
+# --- 예전 구현 (비교용) ---
+
+def sipseong_reference(base_element, base_yinyang, target_element, target_yinyang):
+    if base_element == target_element:
+        return "비견" if base_yinyang == target_yinyang else "겁재"
+    elif SHENG_RELATIONS.get(base_element) == target_element:
+        return "식신" if base_yinyang == target_yinyang else "상관"
+    elif saju_sheng_in.get(base_element) == target_element:
+        return "편인" if base_yinyang == target_yinyang else "정인"
+    elif KE_RELATIONS.get(base_element) == target_element:
+        return "편재" if base_yinyang == target_yinyang else "정재"
+    elif saju_ke_in.get(base_element) == target_element:
+        return "편관" if base_yinyang == target_yinyang else "정관"
+    return ""
+
+def get_sipseong_reference(day_master_char, target_jiji_char):
+    if day_master_char not in CHEONGAN or target_jiji_char not in JIJI: return ""
+    return sipseong_reference(saju_reverse_element_mapping.get(day_master_char), CHEONGAN_YIN_YANG.get(day_master_char),
+                              JIJI_ELEMENTS_PRIMARY.get(target_jiji_char), JIJI_YIN_YANG_FUNCTIONAL.get(target_jiji_char))
+
+def get_sipseong_cheongan_reference(base_cheongan_char, target_cheongan_char):
+    if base_cheongan_char not in CHEONGAN or target_cheongan_char not in CHEONGAN: return ""
+    return sipseong_reference(saju_reverse_element_mapping.get(base_cheongan_char), CHEONGAN_YIN_YANG.get(base_cheongan_char),
+                              saju_reverse_element_mapping.get(target_cheongan_char), CHEONGAN_YIN_YANG.get(target_cheongan_char))
+
+def find_cheongan_hap_reference(saju_8_chars):
+    results = []
+    for p1_key, p2_key in [("연간", "월간"), ("월간", "일간"), ("일간", "시간")]:
+        c1, c2 = saju_8_chars.get(p1_key), saju_8_chars.get(p2_key)
+        if c1 and c2 and (c1, c2) in CHEONGAN_HAP_PAIRS:
+            results.append(f"{CHEONGAN_HAP_PAIRS[(c1, c2)]} ({p1_key} {c1} - {p2_key} {c2})")
+    return list(set(results))
+
+def find_all_jiji_interactions_reference(saju_8_chars):
+    names = {'연지': '연', '월지': '월', '일지': '일', '시지': '시'}
+    found = []
+    for pos1_key, pos2_key in [('시지', '일지'), ('일지', '월지'), ('월지', '연지')]:
+        jiji1, jiji2 = saju_8_chars.get(pos1_key), saju_8_chars.get(pos2_key)
+        if not jiji1 or not jiji2 or jiji1 == jiji2:
+            continue
+        pos_str = f"({names[pos1_key]}-{names[pos2_key]})"
+        if (jiji1, jiji2) in JIJI_CHUNG_PAIRS:
+            found.append(f"{JIJI_CHUNG_PAIRS[(jiji1, jiji2)]}{pos_str}")
+        if (jiji1, jiji2) in JIJI_YUKHAP_PAIRS:
+            found.append(f"{JIJI_YUKHAP_PAIRS[(jiji1, jiji2)]}{pos_str}")
+        for required_jijis, hap_name in JIJI_SAMHAP_LIST:
+            if jiji1 in required_jijis and jiji2 in required_jijis:
+                if required_jijis[1] in (jiji1, jiji2):
+                    found.append(f"{jiji1}{jiji2} {hap_name.replace('삼합','반합')}{pos_str}")
+                    break
+    return sorted(list(set(found)))
+
+def adjust_needed_elements_for_haps_reference(saju_8_chars, keyword_char, original_pne_list, daewoon_ji, yeonwoon_ji):
+    pne1, pne2, pne3 = (original_pne_list[k][0] if len(original_pne_list) > k else None for k in range(3))
+    if keyword_char not in ["인", "신", "사", "해", "진", "술", "축", "미"]:
+        return pne1, pne2, False
+    if daewoon_ji not in ["자", "오", "묘", "유"] and yeonwoon_ji not in ["자", "오", "묘", "유"]:
+        return pne1, pne2, False
+    hap_combos = [
+        ((("인", "술"), "오"), ["인", "술"]), ((("인", "진"), "묘"), ["인", "진"]),
+        ((("사", "축"), "유"), ["사", "축"]), ((("사", "미"), "오"), ["사", "미"]),
+        ((("신", "진"), "자"), ["신", "진"]), ((("신", "술"), "유"), ["신", "술"]),
+        ((("해", "미"), "묘"), ["해", "미"]), ((("해", "축"), "자"), ["해", "축"]),
+    ]
+    adjacent_pairs = [(saju_8_chars.get("연지"), saju_8_chars.get("월지")), (saju_8_chars.get("월지"), saju_8_chars.get("일지")), (saju_8_chars.get("일지"), saju_8_chars.get("시지"))]
+    for (natal_pair, luck_char), hap_members in hap_combos:
+        if daewoon_ji == luck_char or yeonwoon_ji == luck_char:
+            for pair in adjacent_pairs:
+                if Counter(pair) == Counter(natal_pair) and keyword_char in hap_members:
+                    return pne2, pne3, True
+    return pne1, pne2, False
+
+
+def find_jiji_yukhap_reference(saju_8_chars):
+    results = []
+    for p1_key, p2_key, pos_key in [("연지", "월지", "연-월"), ("월지", "일지", "월-일"), ("일지", "시지", "일-시")]:
+        j1, j2 = saju_8_chars.get(p1_key), saju_8_chars.get(p2_key)
+        if j1 and j2 and (j1, j2) in JIJI_YUKHAP_PAIRS:
+            results.append(f"{JIJI_YUKHAP_PAIRS[(j1, j2)]} ({pos_key})")
+    return list(set(results))
+
+
+def chart_with(stems=("갑",) * 4, branches=("자",) * 4):
+    return {"연간": stems[0], "연지": branches[0], "월간": stems[1], "월지": branches[1],
+            "일간": stems[2], "일지": branches[2], "시간": stems[3], "시지": branches[3]}
+
+
+INVALID_CHARS = ["", None, "甲"]
+
+
+@pytest.mark.parametrize("base", CHEONGAN + INVALID_CHARS)
+def test_sipseong_matches_reference(base):
+    for target in CHEONGAN + JIJI + INVALID_CHARS:
+        assert get_sipseong_cheongan(base, target) == get_sipseong_cheongan_reference(base, target), (base, target)
+        assert get_sipseong(base, target) == get_sipseong_reference(base, target), (base, target)
+
+
+def test_cheongan_hap_matches_reference():
+    for stems in itertools.product(CHEONGAN, repeat=4):
+        chart = chart_with(stems=stems)
+        assert find_cheongan_hap(chart) == sorted(find_cheongan_hap_reference(chart)), stems
+
+
+def test_jiji_interactions_match_reference():
+    for branches in itertools.product(JIJI, repeat=4):
+        chart = chart_with(branches=branches)
+        assert find_jiji_yukhap(chart) == sorted(find_jiji_yukhap_reference(chart)), branches
+        assert find_all_jiji_interactions(chart) == find_all_jiji_interactions_reference(chart), branches
+
+
+# 합에 의한 조정은 인접한 지지 쌍 하나로 결정되므로, 세 인접 위치 각각에 모든 지지 쌍을 놓아 봅니다.
+# 키워드는 지지 12글자와 지지 이름이 아닌 글자 하나, 운의 지지는 합을 완성하는 글자(자오묘유)가
+# 대운/세운 어느 쪽에 오는 경우와 오지 않는 경우를 모두 봅니다.
+LUCK_CASES = [(ji, "인") for ji in ["자", "오", "묘", "유"]] + [("인", ji) for ji in ["자", "오", "묘", "유"]] + [("인", "인")]
+
+
+@pytest.mark.parametrize("k", range(3))
+def test_hap_adjustment_matches_reference(k):
+    pne_list = [("목", 0.5), ("화", 0.4), ("토", 0.3)]
+    for pair in itertools.product(JIJI, repeat=2):
+        branches = ["자"] * 4
+        branches[k:k + 2] = pair
+        chart = chart_with(branches=branches)
+        for keyword_char in JIJI + ["갑"]:
+            for daewoon_ji, yeonwoon_ji in LUCK_CASES:
+                assert adjust_needed_elements_for_haps(chart, keyword_char, pne_list, daewoon_ji, yeonwoon_ji) == \
+                    adjust_needed_elements_for_haps_reference(chart, keyword_char, pne_list, daewoon_ji, yeonwoon_ji), (branches, keyword_char, daewoon_ji, yeonwoon_ji)
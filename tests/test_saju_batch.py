@@ -0,0 +1,30 @@
+"""일괄 분석(saju_batch)이 단건 경로와 같은 결과를 내는지, 연도가 멀리 떨어진 입력도 빨리 끝나는지 확인합니다."""
+import time
+
+import numpy as np
+
+from saju_batch import build_jeolgi_boundary_arrays_for_years, get_saju_analysis_batch
+from sajumentor import get_saju_analysis_for_api
+
+
+def _without_traceback(result):
+    return {key: value for key, value in result.items() if key != "traceback"}
+
+
+def test_boundaries_cover_only_requested_years():
+    boundary_times, boundary_astro_years, _ = build_jeolgi_boundary_arrays_for_years([1990, 2990])
+    assert sorted(set(boundary_astro_years.tolist())) == [1989, 1990, 2989, 2990]
+    assert np.all(np.diff(boundary_times.astype(np.int64)) > 0)
+
+
+def test_far_apart_years_finish_quickly_and_match_single_path():
+    births = ["19900101", "29900101", "00020301", "99980101", "00010102", "99991231"]
+    started = time.perf_counter()
+    batch = get_saju_analysis_batch([{"birth": birth, "gender": "남"} for birth in births])
+    elapsed = time.perf_counter() - started
+    # 예전에는 최소~최대 연도 사이 전체의 절기를 계산해 1990/2990년 두 건에도 수 초가 걸렸습니다.
+    assert elapsed < 2.0
+    for birth, result in zip(births, batch["results"]):
+        expected = get_saju_analysis_for_api("양", birth, "1230", "남", False, False, False)
+        assert _without_traceback(result) == _without_traceback(expected), birth
+    assert batch["stats"]["errors"] == 2 # 0001년 1월, 9999년 12월은 단건 경로에서도 오류입니다.